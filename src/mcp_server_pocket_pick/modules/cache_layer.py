@@ -5,161 +5,222 @@ This module provides intelligent caching for embeddings, search results,
 and frequently accessed data to improve performance.
 """
 
-import logging
+import functools
 import json
+import logging
 import hashlib
+import mmap
+import os
+import random
+import struct
 import threading
-from datetime import datetime, timedelta
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, TypeVar, Generic
+from typing import Any, Dict, Hashable, List, Optional, Tuple, TypeVar, Generic
 from dataclasses import dataclass
 import numpy as np
 
+# Prefer the Rust implementation of the diskcache API when installed
 try:
-    import diskcache
+    import diskcache_rs as diskcache
     DISKCACHE_AVAILABLE = True
 except ImportError:
-    DISKCACHE_AVAILABLE = False
-    logging.warning("diskcache not available, using memory-only caching")
+    try:
+        import diskcache
+        DISKCACHE_AVAILABLE = True
+    except ImportError:
+        DISKCACHE_AVAILABLE = False
+        logging.warning("diskcache not available, using memory-only caching")
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Advisory file locks order appends from several writers (POSIX only)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
 
-@dataclass
+@dataclass(slots=True)
 class CacheEntry:
-    """Represents a cached item with metadata"""
+    """Represents a cached item with metadata
+    
+    Timestamps are time.monotonic() seconds, which are cheaper to take and
+    compare than datetime objects. Slotted to keep per-entry overhead low.
+    """
     data: Any
-    created_at: datetime
-    accessed_at: datetime
+    created_at: float
+    accessed_at: float
     access_count: int = 0
-    expires_at: Optional[datetime] = None
+    expires_at: Optional[float] = None
     
     def is_expired(self) -> bool:
         """Check if cache entry is expired"""
-        if self.expires_at is None:
-            return False
-        return datetime.now() > self.expires_at
+        return self.expires_at is not None and time.monotonic() > self.expires_at
     
     def touch(self):
         """Update access time and count"""
-        self.accessed_at = datetime.now()
+        self.accessed_at = time.monotonic()
         self.access_count += 1
 
 
+class _Shard:
+    """Independent slice of an LRUCache with its own ordering and lock"""
+    __slots__ = ('cache', 'lock', 'ops_since_sweep')
+    
+    def __init__(self):
+        self.cache: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self.lock = threading.Lock()
+        self.ops_since_sweep = 0
+
+
 class LRUCache(Generic[T]):
-    """Least Recently Used cache with optional TTL"""
+    """Least Recently Used cache with optional TTL
+    
+    Keys are partitioned across independent shards so concurrent lookups on
+    different keys do not contend on a single lock. Small caches use a single
+    shard, where the per-shard capacity split would distort LRU behaviour.
+    """
+    
+    SHARD_COUNT = 16
+    MIN_SHARDED_SIZE = 256
+    
+    # Expired entries are dropped lazily on get; a small random sample is
+    # also swept every SWEEP_INTERVAL sets so unread entries do not linger
+    SWEEP_INTERVAL = 256
+    SWEEP_SAMPLE_SIZE = 20
     
     def __init__(self, max_size: int = 1000, ttl_minutes: Optional[int] = None):
         self.max_size = max_size
         self.ttl = timedelta(minutes=ttl_minutes) if ttl_minutes else None
-        self._cache: Dict[str, CacheEntry] = {}
-        self._access_order: List[str] = []
-        self._lock = threading.RLock()
+        self._ttl_seconds = self.ttl.total_seconds() if self.ttl else None
+        
+        num_shards = self.SHARD_COUNT if max_size > self.MIN_SHARDED_SIZE else 1
+        self._shards = [_Shard() for _ in range(num_shards)]
+        self._shard_mask = num_shards - 1
+        self._shard_max_size = max(1, max_size // num_shards)
+    
+    def _shard(self, key: Hashable) -> _Shard:
+        """Route a key to its shard"""
+        return self._shards[hash(key) & self._shard_mask]
     
-    def _evict_expired(self):
-        """Remove expired entries"""
-        if self.ttl is None:
+    def _sample_expire(self, cache: OrderedDict, sample_size: int):
+        """Remove expired entries among a random sample of a shard's keys"""
+        if not cache:
             return
         
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if entry.is_expired()
-        ]
-        
-        for key in expired_keys:
-            self._remove_key(key)
-    
-    def _remove_key(self, key: str):
-        """Remove a key from cache and access order"""
-        self._cache.pop(key, None)
-        if key in self._access_order:
-            self._access_order.remove(key)
-    
-    def _evict_lru(self):
-        """Remove least recently used entries if cache is full"""
-        while len(self._cache) >= self.max_size and self._access_order:
-            lru_key = self._access_order[0]
-            self._remove_key(lru_key)
-    
-    def _update_access_order(self, key: str):
-        """Update access order for LRU tracking"""
-        if key in self._access_order:
-            self._access_order.remove(key)
-        self._access_order.append(key)
-    
-    def get(self, key: str) -> Optional[T]:
+        for key in random.sample(list(cache), k=min(sample_size, len(cache))):
+            if cache[key].is_expired():
+                del cache[key]
+    
+    def get(self, key: Hashable) -> Optional[T]:
         """Get item from cache"""
-        with self._lock:
-            self._evict_expired()
-            
-            if key not in self._cache:
+        # Hot path: shard routing, expiry check and touch() are inlined and
+        # share a single clock read
+        shard = self._shards[hash(key) & self._shard_mask]
+        with shard.lock:
+            cache = shard.cache
+            entry = cache.get(key)
+            if entry is None:
                 return None
             
-            entry = self._cache[key]
-            if entry.is_expired():
-                self._remove_key(key)
+            now = time.monotonic()
+            expires_at = entry.expires_at
+            if expires_at is not None and now > expires_at:
+                del cache[key]
                 return None
             
-            entry.touch()
-            self._update_access_order(key)
+            entry.accessed_at = now
+            entry.access_count += 1
+            cache.move_to_end(key)
             return entry.data
     
-    def set(self, key: str, value: T, ttl_minutes: Optional[int] = None):
+    def set(self, key: Hashable, value: T, ttl_minutes: Optional[int] = None):
         """Set item in cache"""
-        with self._lock:
-            self._evict_expired()
-            self._evict_lru()
+        shard = self._shards[hash(key) & self._shard_mask]
+        with shard.lock:
+            cache = shard.cache
             
+            if self._ttl_seconds is not None:
+                shard.ops_since_sweep += 1
+                if shard.ops_since_sweep >= self.SWEEP_INTERVAL:
+                    shard.ops_since_sweep = 0
+                    self._sample_expire(cache, self.SWEEP_SAMPLE_SIZE)
+            
+            # Shards never exceed their capacity, so inserting a new key
+            # needs at most one eviction; overwriting a key needs none
+            if key in cache:
+                cache.move_to_end(key)
+            elif len(cache) >= self._shard_max_size:
+                cache.popitem(last=False)
+            
+            now = time.monotonic()
             expires_at = None
             if ttl_minutes is not None:
-                expires_at = datetime.now() + timedelta(minutes=ttl_minutes)
-            elif self.ttl is not None:
-                expires_at = datetime.now() + self.ttl
+                expires_at = now + ttl_minutes * 60
+            elif self._ttl_seconds is not None:
+                expires_at = now + self._ttl_seconds
             
             entry = CacheEntry(
                 data=value,
-                created_at=datetime.now(),
-                accessed_at=datetime.now(),
+                created_at=now,
+                accessed_at=now,
                 expires_at=expires_at
             )
             
-            self._cache[key] = entry
-            self._update_access_order(key)
+            cache[key] = entry
     
-    def delete(self, key: str) -> bool:
+    def delete(self, key: Hashable) -> bool:
         """Delete item from cache"""
-        with self._lock:
-            if key in self._cache:
-                self._remove_key(key)
-                return True
-            return False
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.cache.pop(key, None) is not None
     
     def clear(self):
         """Clear all cache entries"""
-        with self._lock:
-            self._cache.clear()
-            self._access_order.clear()
+        for shard in self._shards:
+            with shard.lock:
+                shard.cache.clear()
     
     def size(self) -> int:
         """Get current cache size"""
-        with self._lock:
-            return len(self._cache)
+        total = 0
+        for shard in self._shards:
+            with shard.lock:
+                total += len(shard.cache)
+        return total
     
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        with self._lock:
-            total_accesses = sum(entry.access_count for entry in self._cache.values())
-            avg_accesses = total_accesses / len(self._cache) if self._cache else 0
-            
-            return {
-                'size': len(self._cache),
-                'max_size': self.max_size,
-                'total_accesses': total_accesses,
-                'average_accesses_per_item': avg_accesses,
-                'ttl_minutes': self.ttl.total_seconds() / 60 if self.ttl else None
-            }
+        size = 0
+        total_accesses = 0
+        for shard in self._shards:
+            with shard.lock:
+                size += len(shard.cache)
+                total_accesses += sum(entry.access_count for entry in shard.cache.values())
+        
+        avg_accesses = total_accesses / size if size else 0
+        
+        return {
+            'size': size,
+            'max_size': self.max_size,
+            'shards': len(self._shards),
+            'total_accesses': total_accesses,
+            'average_accesses_per_item': avg_accesses,
+            'ttl_minutes': self.ttl.total_seconds() / 60 if self.ttl else None
+        }
 
 
 class DiskCache:
@@ -191,6 +252,16 @@ class DiskCache:
         except Exception as e:
             logger.warning(f"Error writing to disk cache: {e}")
     
+    def set_many(self, items: List[Tuple[str, Any]], ttl_seconds: Optional[int] = None):
+        """Set several items in disk cache within a single transaction"""
+        try:
+            expire_time = ttl_seconds if ttl_seconds else None
+            with self._cache.transact(retry=True):
+                for key, value in items:
+                    self._cache.set(key, value, expire=expire_time)
+        except Exception as e:
+            logger.warning(f"Error writing batch to disk cache: {e}")
+    
     def delete(self, key: str) -> bool:
         """Delete item from disk cache"""
         try:
@@ -213,83 +284,528 @@ class DiskCache:
                 'size': len(self._cache),
                 'volume': self._cache.volume(),
                 'size_limit': self.size_limit,
+                'backend': diskcache.__name__,
             }
         except Exception as e:
             logger.warning(f"Error getting disk cache stats: {e}")
             return {'error': str(e)}
 
 
+class NpyDirCache:
+    """Disk cache storing one .npy file per array
+    
+    Reads return read-only memory-mapped views, so loading an embedding
+    copies nothing and the OS page cache serves repeated reads. Entries do
+    not expire; ttl_seconds is accepted for interface compatibility only.
+    """
+    
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, key: str) -> Path:
+        """File path for a key, fanned out by key prefix"""
+        return self.cache_dir / key[:2] / f"{key}.npy"
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get array from disk cache as a memory-mapped view"""
+        try:
+            return np.load(self._path(key), mmap_mode='r')
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Error reading from npy cache: {e}")
+            return None
+    
+    def set(self, key: str, value: np.ndarray, ttl_seconds: Optional[int] = None):
+        """Write array to disk cache atomically"""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_name(f"{path.stem}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.save(f, value)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Error writing to npy cache: {e}")
+    
+    def set_many(self, items: List[Tuple[str, np.ndarray]], ttl_seconds: Optional[int] = None):
+        """Write several arrays to disk cache"""
+        for key, value in items:
+            self.set(key, value, ttl_seconds)
+    
+    def delete(self, key: str) -> bool:
+        """Delete array from disk cache"""
+        try:
+            self._path(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Error deleting from npy cache: {e}")
+            return False
+    
+    def clear(self):
+        """Clear npy cache"""
+        for path in self.cache_dir.glob("*/*.npy"):
+            try:
+                path.unlink()
+            except Exception as e:
+                logger.warning(f"Error clearing npy cache: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get npy cache statistics"""
+        try:
+            files = list(self.cache_dir.glob("*/*.npy"))
+            return {
+                'size': len(files),
+                'volume': sum(path.stat().st_size for path in files),
+            }
+        except Exception as e:
+            logger.warning(f"Error getting npy cache stats: {e}")
+            return {'error': str(e)}
+
+
+class AppendLogCache:
+    """Disk cache storing arrays as records in one append-only log file
+    
+    A write is a single append with no SQL and no per-record fsync, which
+    suits bulk ingest. An in-memory index maps each key to its latest record
+    and is rebuilt on open by scanning the record headers. Reads return
+    read-only views into a memory map of the log, so they copy nothing.
+    
+    Overwrites and deletes append new records; the space of superseded
+    records is only reclaimed by clear(). Entries do not expire; ttl_seconds
+    is accepted for interface compatibility only.
+    
+    Writers hold an exclusive lock on the log and place records at its real
+    end, first indexing anything other writers appended since.
+    """
+    
+    # key length, ndim, dtype id, payload bytes; then the key, the shape as
+    # uint32s, padding to an 8-byte boundary and the payload
+    _HEADER = struct.Struct('<HBBI')
+    _DTYPES = ('float32', 'float16', 'float64', 'int8')
+    _TOMBSTONE = 255
+    
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.cache_dir / "embeddings.log"
+        
+        self._lock = threading.Lock()
+        self._mm: Optional[mmap.mmap] = None
+        # key -> (payload offset, shape, dtype)
+        self._index: Dict[str, Tuple[int, tuple, np.dtype]] = {}
+        
+        self._log = open(self.log_path, 'a+b', buffering=0)
+        self._end = 0
+        with self._writing():
+            pass
+    
+    @staticmethod
+    def _payload_offset(record_start: int, key_len: int, ndim: int) -> int:
+        """Offset of a record's payload, aligned for any supported dtype"""
+        offset = record_start + AppendLogCache._HEADER.size + key_len + 4 * ndim
+        return (offset + 7) & ~7
+    
+    @contextmanager
+    def _writing(self):
+        """Hold the instance and file locks with the index caught up to the log"""
+        with self._lock:
+            if self._log.closed or os.fstat(self._log.fileno()).st_ino != os.stat(self.log_path).st_ino:
+                # Another writer swapped in a new log through clear()
+                self._log.close()
+                self._log = open(self.log_path, 'a+b', buffering=0)
+                self._index.clear()
+                self._end = 0
+                self._mm = None
+            
+            fd = self._log.fileno()
+            if FCNTL_AVAILABLE:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                size = os.fstat(fd).st_size
+                if size < self._end:
+                    self._index.clear()
+                    self._end = 0
+                if size != self._end:
+                    self._end = self._scan(self._end, size)
+                yield fd
+            finally:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+    
+    def _scan(self, pos: int, size: int) -> int:
+        """Index the records from `pos` on; returns the end of the last whole record"""
+        # One pass front to back
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(self._log.fileno(), pos, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError as e:
+                logger.debug(f"posix_fadvise unavailable for append log: {e}")
+        
+        if size:
+            with mmap.mmap(self._log.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                while pos + self._HEADER.size <= size:
+                    key_len, ndim, dtype_id, nbytes = self._HEADER.unpack_from(mm, pos)
+                    payload = self._payload_offset(pos, key_len, ndim)
+                    if payload + nbytes > size:
+                        break
+                    
+                    key_start = pos + self._HEADER.size
+                    key = mm[key_start:key_start + key_len].decode('utf-8')
+                    if dtype_id == self._TOMBSTONE:
+                        self._index.pop(key, None)
+                    else:
+                        shape = struct.unpack_from(f'<{ndim}I', mm, key_start + key_len)
+                        self._index[key] = (payload, shape, np.dtype(self._DTYPES[dtype_id]))
+                    pos = payload + nbytes
+        
+        # Drop a record cut short by a crash or a failed write, so new
+        # appends stay parseable
+        if pos < size:
+            logger.warning(f"Truncating incomplete record at offset {pos} in {self.log_path}")
+            self._log.truncate(pos)
+        return pos
+    
+    def _record(self, start: int, key: str, value: Optional[np.ndarray]) -> Tuple[bytes, int]:
+        """Encode one record written at offset `start`; returns it and its payload offset"""
+        key_bytes = key.encode('utf-8')
+        if value is None:
+            header = self._HEADER.pack(len(key_bytes), 0, self._TOMBSTONE, 0)
+            shape = b''
+            payload = b''
+        else:
+            dtype_id = self._DTYPES.index(value.dtype.name)
+            payload = np.ascontiguousarray(value).tobytes()
+            header = self._HEADER.pack(len(key_bytes), value.ndim, dtype_id, len(payload))
+            shape = struct.pack(f'<{value.ndim}I', *value.shape)
+        
+        payload_offset = self._payload_offset(start, len(key_bytes), len(shape) // 4)
+        padding = payload_offset - (start + len(header) + len(key_bytes) + len(shape))
+        return b''.join((header, key_bytes, shape, b'\0' * padding, payload)), payload_offset
+    
+    def _append(self, fd: int, records: List[Tuple[str, Optional[np.ndarray]]]):
+        """Append records in one write, then point the index at them
+        
+        Must be called inside _writing(). A failed write leaves _end behind
+        the file, so the next writer rescans and drops the partial record.
+        """
+        chunks = []
+        entries = []
+        end = self._end
+        for key, value in records:
+            record, payload_offset = self._record(end, key, value)
+            entry = None if value is None else (payload_offset, value.shape, value.dtype)
+            entries.append((key, entry))
+            chunks.append(record)
+            end += len(record)
+        
+        view = memoryview(b''.join(chunks))
+        while view:
+            view = view[os.write(fd, view):]
+        self._end = end
+        
+        for key, entry in entries:
+            if entry is None:
+                self._index.pop(key, None)
+            else:
+                self._index[key] = entry
+    
+    def _view(self, end: int) -> Optional[mmap.mmap]:
+        """Memory map covering at least the first `end` bytes of the log"""
+        if self._mm is None or len(self._mm) < end:
+            with open(self.log_path, 'rb') as f:
+                # Views handed out earlier keep the previous map alive
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get array from the log as a read-only view"""
+        try:
+            with self._lock:
+                entry = self._index.get(key)
+                if entry is None:
+                    return None
+                offset, shape, dtype = entry
+                count = int(np.prod(shape, dtype=np.int64))
+                mm = self._view(offset + count * dtype.itemsize)
+            return np.frombuffer(mm, dtype=dtype, count=count, offset=offset).reshape(shape)
+        except Exception as e:
+            logger.warning(f"Error reading from append log cache: {e}")
+            return None
+    
+    def set(self, key: str, value: np.ndarray, ttl_seconds: Optional[int] = None):
+        """Append array to the log"""
+        self.set_many([(key, value)], ttl_seconds)
+    
+    def set_many(self, items: List[Tuple[str, np.ndarray]], ttl_seconds: Optional[int] = None):
+        """Append several arrays to the log in one write"""
+        try:
+            records = [(key, np.asarray(value)) for key, value in items]
+            with self._writing() as fd:
+                self._append(fd, records)
+        except Exception as e:
+            logger.warning(f"Error writing to append log cache: {e}")
+    
+    def delete(self, key: str) -> bool:
+        """Delete array by appending a tombstone"""
+        try:
+            with self._writing() as fd:
+                if key not in self._index:
+                    return False
+                self._append(fd, [(key, None)])
+            return True
+        except Exception as e:
+            logger.warning(f"Error deleting from append log cache: {e}")
+            return False
+    
+    def clear(self):
+        """Clear the log and its index"""
+        try:
+            with self._writing():
+                # Swap in an empty file rather than truncating, so views still
+                # held by callers keep mapping the old one
+                tmp_path = self.log_path.with_name(f"{self.log_path.name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(b'')
+                os.replace(tmp_path, self.log_path)
+                self._index.clear()
+                self._mm = None
+            
+            # Writers blocked on the old file reopen the new one
+            with self._lock:
+                self._log.close()
+                self._log = open(self.log_path, 'a+b', buffering=0)
+                self._end = 0
+        except Exception as e:
+            logger.warning(f"Error clearing append log cache: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get append log cache statistics"""
+        return {
+            'size': len(self._index),
+            'volume': self._end,
+        }
+
+
+QUANTIZATION_MODES = (None, 'fp16', 'int8')
+
+
+def _quantize(embedding: np.ndarray, quantization: Optional[str]) -> bytes:
+    """Encode an embedding as bytes, optionally quantized"""
+    if quantization == 'fp16':
+        return embedding.astype(np.float16).tobytes()
+    if quantization == 'int8':
+        # Symmetric per-vector scale, stored as a float32 prefix
+        max_abs = float(np.abs(embedding).max()) if embedding.size else 0.0
+        scale = np.float32(max_abs / 127 if max_abs else 1.0)
+        values = np.round(embedding / scale).astype(np.int8)
+        return scale.tobytes() + values.tobytes()
+    return embedding.tobytes()
+
+
+@functools.lru_cache(maxsize=256)
+def _bytes_to_array(buf: bytes, shape: tuple, dtype: np.dtype, quantization: Optional[str] = None) -> np.ndarray:
+    """Read-only array over embedding bytes, reused for repeat reads"""
+    if quantization == 'fp16':
+        array = np.frombuffer(buf, dtype=np.float16).astype(dtype)
+    elif quantization == 'int8':
+        scale = np.frombuffer(buf, dtype=np.float32, count=1)[0]
+        array = np.frombuffer(buf, dtype=np.int8, offset=4).astype(dtype) * scale
+    else:
+        return np.frombuffer(buf, dtype=dtype).reshape(shape)
+    
+    array = array.reshape(shape)
+    array.flags.writeable = False
+    return array
+
+
 class EmbeddingCache:
-    """Specialized cache for text embeddings"""
+    """Specialized cache for text embeddings
+    
+    The memory tier holds raw bytes and builds array views only when an
+    embedding is requested. The disk tier is diskcache ('diskcache', raw
+    bytes in SQLite), a directory of .npy files ('npy') or a single
+    append-only log ('appendlog', for bulk ingest); the last two are
+    memory-mapped on read and left to the OS page cache rather than the
+    memory tier.
+    
+    With quantization='fp16' or 'int8' both tiers store embeddings at 2x or
+    4x smaller size and dequantize to the model dtype on read. fp16 is close
+    to lossless for cosine similarity; int8 uses a per-vector scale and
+    introduces errors of up to max(|x|)/254 per component, enough to swap
+    near-tied rankings but not to change coarse relevance. The npy and
+    appendlog backends always keep full-precision arrays so their reads stay
+    zero-copy.
+    """
     
     def __init__(self, 
                  memory_cache_size: int = 512,
                  disk_cache_dir: Optional[Path] = None,
-                 disk_cache_size_limit: int = 512 * 1024 * 1024):  # 512MB
+                 disk_cache_size_limit: int = 512 * 1024 * 1024,  # 512MB
+                 disk_backend: str = 'diskcache',
+                 quantization: Optional[str] = None):
+        
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        self.quantization = quantization
         
-        self.memory_cache = LRUCache[np.ndarray](
+        self.memory_cache = LRUCache[bytes](
             max_size=memory_cache_size, 
             ttl_minutes=60  # 1 hour TTL for embeddings
         )
         
         self.disk_cache = None
-        if disk_cache_dir and DISKCACHE_AVAILABLE:
+        if disk_cache_dir and disk_backend == 'npy':
+            try:
+                self.disk_cache = NpyDirCache(disk_cache_dir)
+                logger.info(f"Npy disk cache enabled for embeddings: {disk_cache_dir}")
+            except Exception as e:
+                logger.warning(f"Failed to initialize npy disk cache: {e}")
+        elif disk_cache_dir and disk_backend == 'appendlog':
+            try:
+                self.disk_cache = AppendLogCache(disk_cache_dir)
+                logger.info(f"Append log disk cache enabled for embeddings: {disk_cache_dir}")
+            except Exception as e:
+                logger.warning(f"Failed to initialize append log disk cache: {e}")
+        elif disk_cache_dir and DISKCACHE_AVAILABLE:
             try:
                 self.disk_cache = DiskCache(disk_cache_dir, disk_cache_size_limit)
                 logger.info(f"Disk cache enabled for embeddings: {disk_cache_dir}")
             except Exception as e:
                 logger.warning(f"Failed to initialize disk cache: {e}")
+        
+        # Embedding layout per model; cached entries store raw bytes only
+        self._model_shape: Dict[str, tuple] = {}
+        self._model_dtype: Dict[str, np.dtype] = {}
+    
+    def _layout_key(self, model_name: str) -> str:
+        """Disk cache key holding the embedding layout for a model"""
+        return f"layout:{model_name}"
+    
+    def _learn_layout(self, model_name: str, embedding: np.ndarray):
+        """Remember shape and dtype for a model's embeddings"""
+        if self._model_shape.get(model_name) == embedding.shape and self._model_dtype.get(model_name) == embedding.dtype:
+            return
+        
+        self._model_shape[model_name] = embedding.shape
+        self._model_dtype[model_name] = embedding.dtype
+        
+        # Persist so raw entries can be decoded after a restart
+        if isinstance(self.disk_cache, DiskCache):
+            self.disk_cache.set(self._layout_key(model_name), {
+                'shape': embedding.shape,
+                'dtype': str(embedding.dtype)
+            })
+    
+    def _load_layout(self, model_name: str) -> bool:
+        """Load a model's embedding layout from disk if not yet known"""
+        if model_name in self._model_shape:
+            return True
+        
+        if isinstance(self.disk_cache, DiskCache):
+            layout = self.disk_cache.get(self._layout_key(model_name))
+            if layout is not None:
+                self._model_shape[model_name] = tuple(layout['shape'])
+                self._model_dtype[model_name] = np.dtype(layout['dtype'])
+                return True
+        
+        return False
+    
+    def _to_array(self, model_name: str, buf: bytes) -> np.ndarray:
+        """View raw bytes as an embedding using the model's layout"""
+        return _bytes_to_array(buf, self._model_shape[model_name], self._model_dtype[model_name], self.quantization)
     
     def _hash_key(self, text: str, model_name: str) -> str:
         """Generate hash key for text and model combination"""
-        content = f"{model_name}:{text}"
-        return hashlib.sha256(content.encode()).hexdigest()
+        if self.quantization:
+            content = f"{model_name}:{self.quantization}:{text}"
+        else:
+            content = f"{model_name}:{text}"
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
     
     def get_embedding(self, text: str, model_name: str) -> Optional[np.ndarray]:
         """Get cached embedding"""
         key = self._hash_key(text, model_name)
         
         # Try memory cache first
-        embedding = self.memory_cache.get(key)
-        if embedding is not None:
-            return embedding
+        buf = self.memory_cache.get(key)
+        if buf is not None and self._load_layout(model_name):
+            return self._to_array(model_name, buf)
         
         # Try disk cache
         if self.disk_cache:
             cached_data = self.disk_cache.get(key)
             if cached_data is not None:
                 try:
-                    # Deserialize numpy array
-                    embedding = np.frombuffer(cached_data['embedding'], dtype=np.float32)
-                    embedding = embedding.reshape(cached_data['shape'])
+                    if isinstance(cached_data, np.ndarray):
+                        # Memory-mapped .npy entry
+                        return cached_data
+                    
+                    if isinstance(cached_data, dict):
+                        # Entry written with inline shape/dtype metadata
+                        embedding = np.frombuffer(cached_data['embedding'], dtype=cached_data.get('dtype', np.float32))
+                        return embedding.reshape(cached_data['shape'])
+                    
+                    if not self._load_layout(model_name):
+                        return None
                     
-                    # Store in memory cache for faster access
-                    self.memory_cache.set(key, embedding)
-                    return embedding
+                    # Keep the raw bytes in memory; views are built on demand
+                    self.memory_cache.set(key, cached_data)
+                    return self._to_array(model_name, cached_data)
                 except Exception as e:
                     logger.warning(f"Error deserializing cached embedding: {e}")
         
         return None
     
+    def _store(self, key: str, model_name: str, embedding: np.ndarray) -> Any:
+        """Store an embedding in the memory tier and return its disk payload"""
+        self._learn_layout(model_name, embedding)
+        buf = _quantize(embedding, self.quantization)
+        self.memory_cache.set(key, buf)
+        
+        if isinstance(self.disk_cache, (NpyDirCache, AppendLogCache)):
+            return embedding
+        return buf
+    
     def set_embedding(self, text: str, model_name: str, embedding: np.ndarray):
         """Cache embedding"""
         key = self._hash_key(text, model_name)
         
-        # Store in memory cache
-        self.memory_cache.set(key, embedding)
+        try:
+            payload = self._store(key, model_name, embedding)
+        except Exception as e:
+            logger.warning(f"Error caching embedding: {e}")
+            return
         
         # Store in disk cache
         if self.disk_cache:
             try:
-                cached_data = {
-                    'embedding': embedding.tobytes(),
-                    'shape': embedding.shape,
-                    'dtype': str(embedding.dtype)
-                }
-                self.disk_cache.set(key, cached_data, ttl_seconds=7 * 24 * 3600)  # 1 week
+                self.disk_cache.set(key, payload, ttl_seconds=7 * 24 * 3600)  # 1 week
             except Exception as e:
                 logger.warning(f"Error caching embedding to disk: {e}")
     
+    def set_embeddings_batch(self, items: List[Tuple[str, str, np.ndarray]]):
+        """Cache several (text, model_name, embedding) triples
+        
+        Disk writes share one transaction instead of committing per item,
+        which matters when embedding a whole collection at once.
+        """
+        disk_items = []
+        for text, model_name, embedding in items:
+            key = self._hash_key(text, model_name)
+            try:
+                disk_items.append((key, self._store(key, model_name, embedding)))
+            except Exception as e:
+                logger.warning(f"Error caching embedding: {e}")
+        
+        if self.disk_cache and disk_items:
+            try:
+                self.disk_cache.set_many(disk_items, ttl_seconds=7 * 24 * 3600)  # 1 week
+            except Exception as e:
+                logger.warning(f"Error caching embeddings to disk: {e}")
+    
     def clear(self):
         """Clear all cached embeddings"""
         self.memory_cache.clear()
@@ -317,22 +833,18 @@ class SearchResultCache:
             ttl_minutes=ttl_minutes
         )
     
-    def _cache_key(self, query: str, tags: List[str], mode: str, **kwargs) -> str:
-        """Generate cache key for search parameters"""
-        # Sort tags for consistent key generation
-        sorted_tags = sorted(tags) if tags else []
-        
-        # Include additional parameters
-        key_data = {
-            'query': query.lower().strip(),
-            'tags': sorted_tags,
-            'mode': mode,
-            **kwargs
-        }
+    def _cache_key(self, query: str, tags: List[str], mode: str, **kwargs) -> Tuple:
+        """Generate cache key for search parameters
         
-        # Create hash of the key data
-        key_json = json.dumps(key_data, sort_keys=True)
-        return hashlib.md5(key_json.encode()).hexdigest()
+        The key is a plain tuple, hashed natively by the LRU cache; tags and
+        extra parameters are sorted so argument order does not matter.
+        """
+        return (
+            query.lower().strip(),
+            tuple(sorted(tags or ())),
+            mode,
+            tuple(sorted(kwargs.items()))
+        )
     
     def get_results(self, query: str, tags: List[str], mode: str, **kwargs) -> Optional[List[Dict[str, Any]]]:
         """Get cached search results"""
@@ -354,33 +866,112 @@ class SearchResultCache:
 
 
 class PatternIndexCache:
-    """Cache for pattern index data"""
+    """Cache for pattern index data
     
-    def __init__(self, ttl_minutes: int = 30):
-        self.cache = LRUCache[Dict[str, Any]](
+    With a cache_dir, each index is also written to a JSON file (orjson when
+    installed) so other server processes can load it without rebuilding.
+    Files are read in a single read, and the in-memory copy is dropped when
+    the file's mtime changes.
+    """
+    
+    def __init__(self, ttl_minutes: int = 30, cache_dir: Optional[Path] = None):
+        self.cache = LRUCache[Tuple[Optional[int], Dict[str, Any]]](
             max_size=10,  # Small cache for index data
             ttl_minutes=ttl_minutes
         )
+        self.cache_dir = cache_dir
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, patterns_path: str) -> Optional[Path]:
+        """Index file for a patterns path, or None when memory-only"""
+        if not self.cache_dir:
+            return None
+        digest = hashlib.blake2b(patterns_path.encode('utf-8'), digest_size=8).hexdigest()
+        return self.cache_dir / f"pattern_index_{digest}.json"
+    
+    @staticmethod
+    def _mtime(path: Optional[Path]) -> Optional[int]:
+        """File mtime in nanoseconds, or None if it does not exist"""
+        if path is None:
+            return None
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def _read(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Parse an index file"""
+        try:
+            # The parsers need the whole document anyway, so one read is the
+            # cheapest way in
+            data = path.read_bytes()
+            if ORJSON_AVAILABLE:
+                return orjson.loads(data)
+            return json.loads(data)
+        except Exception as e:
+            logger.warning(f"Error reading pattern index cache {path}: {e}")
+            return None
     
     def get_index(self, patterns_path: str) -> Optional[Dict[str, Any]]:
         """Get cached pattern index"""
-        return self.cache.get(patterns_path)
+        path = self._path(patterns_path)
+        mtime = self._mtime(path)
+        
+        cached = self.cache.get(patterns_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        if mtime is None:
+            if cached is not None:
+                # The file was removed by another process
+                self.cache.delete(patterns_path)
+            return None
+        
+        index_data = self._read(path)
+        if index_data is not None:
+            self.cache.set(patterns_path, (mtime, index_data))
+        return index_data
     
     def set_index(self, patterns_path: str, index_data: Dict[str, Any]):
         """Cache pattern index"""
-        self.cache.set(patterns_path, index_data)
+        path = self._path(patterns_path)
+        if path is not None:
+            try:
+                if ORJSON_AVAILABLE:
+                    payload = orjson.dumps(index_data)
+                else:
+                    payload = json.dumps(index_data).encode('utf-8')
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(payload)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.warning(f"Error writing pattern index cache {path}: {e}")
+        
+        self.cache.set(patterns_path, (self._mtime(path), index_data))
     
     def invalidate_index(self, patterns_path: str):
         """Remove specific pattern index from cache"""
         self.cache.delete(patterns_path)
+        path = self._path(patterns_path)
+        if path is not None:
+            path.unlink(missing_ok=True)
     
     def clear(self):
         """Clear all cached indices"""
         self.cache.clear()
+        if self.cache_dir:
+            for path in self.cache_dir.glob("pattern_index_*.json"):
+                try:
+                    path.unlink()
+                except Exception as e:
+                    logger.warning(f"Error clearing pattern index cache: {e}")
     
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        return self.cache.stats()
+        stats = self.cache.stats()
+        stats['cache_dir'] = str(self.cache_dir) if self.cache_dir else None
+        return stats
 
 
 class CacheManager:
@@ -395,7 +986,9 @@ class CacheManager:
             disk_cache_dir=self.cache_dir / "embeddings"
         )
         self.search_results = SearchResultCache()
-        self.pattern_index = PatternIndexCache()
+        self.pattern_index = PatternIndexCache(
+            cache_dir=self.cache_dir / "pattern_index"
+        )
         
         logger.info(f"Cache manager initialized with cache directory: {self.cache_dir}")
     
@@ -5,14 +5,16 @@ This module provides efficient database connection management through
 connection pooling to reduce overhead and improve performance.
 """
 
+import itertools
 import sqlite3
 import threading
 import logging
+import time
+import weakref
 from pathlib import Path
 from typing import Optional, Dict, Any
 from contextlib import contextmanager
 from queue import Queue, Empty, Full
-from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -23,20 +25,23 @@ class PooledConnection:
     def __init__(self, connection: sqlite3.Connection, pool: 'ConnectionPool'):
         self.connection = connection
         self.pool = pool
-        self.created_at = datetime.now()
-        self.last_used = datetime.now()
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
         self.in_use = False
+        self.owner = None  # token of the thread holding it, if any
         self.use_count = 0
+        self.return_count = 0
+        self.closed = False
     
     def execute(self, sql: str, parameters: tuple = ()) -> sqlite3.Cursor:
         """Execute SQL with automatic usage tracking"""
-        self.last_used = datetime.now()
+        self.last_used = time.monotonic()
         self.use_count += 1
         return self.connection.execute(sql, parameters)
     
     def executemany(self, sql: str, parameters) -> sqlite3.Cursor:
         """Execute many SQL statements with automatic usage tracking"""
-        self.last_used = datetime.now()
+        self.last_used = time.monotonic()
         self.use_count += 1
         return self.connection.executemany(sql, parameters)
     
@@ -49,22 +54,43 @@ class PooledConnection:
         self.connection.rollback()
     
     def close(self):
-        """Close the underlying connection"""
+        """Close the underlying connection, refreshing planner statistics first"""
+        self.closed = True
+        try:
+            # SQLite recommends PRAGMA optimize just before closing
+            if not self.connection.in_transaction:
+                self.connection.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.debug(f"PRAGMA optimize failed: {e}")
         self.connection.close()
     
     def is_expired(self, max_age_minutes: int = 30) -> bool:
         """Check if connection is expired"""
-        age = datetime.now() - self.created_at
-        return age > timedelta(minutes=max_age_minutes)
+        return time.monotonic() - self.created_at > max_age_minutes * 60
     
     def is_stale(self, max_idle_minutes: int = 5) -> bool:
         """Check if connection has been idle too long"""
-        idle_time = datetime.now() - self.last_used
-        return idle_time > timedelta(minutes=max_idle_minutes)
+        return time.monotonic() - self.last_used > max_idle_minutes * 60
+
+
+class _ThreadOwner:
+    """Per-thread marker whose collection returns the thread's connection"""
+    __slots__ = ('__weakref__',)
 
 
 class ConnectionPool:
-    """SQLite connection pool for improved performance"""
+    """SQLite connection pool for improved performance
+    
+    Each thread keeps the connection it first borrows in thread-local
+    storage, so repeated use from the same thread skips the queue. The
+    connection goes back to the pool when the thread exits, or earlier if
+    another thread finds the pool exhausted while it sits idle. Nested
+    scopes on one thread share the connection, and only the outermost
+    release marks it idle.
+    """
+    
+    # Run PRAGMA optimize on a connection every this many releases
+    OPTIMIZE_INTERVAL = 500
     
     def __init__(self, 
                  db_path: Path,
@@ -93,7 +119,11 @@ class ConnectionPool:
         
         self._pool = Queue(maxsize=max_connections)
         self._all_connections = set()
-        self._lock = threading.RLock()
+        self._tls = threading.local()
+        self._thread_conns = set()
+        self._owner_tokens = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pending_connections = 0
         self._stats = {
             'created': 0,
             'borrowed': 0,
@@ -105,7 +135,8 @@ class ConnectionPool:
         # Initialize pool with initial connections
         self._initialize_pool()
         
-        # Start cleanup thread
+        # Start cleanup thread; close_all() sets the event to stop it
+        self._stop_event = threading.Event()
         self._cleanup_thread = threading.Thread(target=self._cleanup_connections, daemon=True)
         self._cleanup_thread.start()
     
@@ -132,9 +163,13 @@ class ConnectionPool:
             # Configure connection for optimal performance
             raw_conn.execute("PRAGMA journal_mode=WAL")
             raw_conn.execute("PRAGMA synchronous=NORMAL") 
-            raw_conn.execute("PRAGMA cache_size=2000")
+            raw_conn.execute("PRAGMA cache_size=-65536")  # 64MB, grows lazily
             raw_conn.execute("PRAGMA temp_store=MEMORY")
+            raw_conn.execute("PRAGMA threads=4")  # helper threads for large sorts
             raw_conn.execute("PRAGMA mmap_size=268435456")  # 256MB
+            raw_conn.execute("PRAGMA busy_timeout=5000")
+            raw_conn.execute("PRAGMA wal_autocheckpoint=10000")
+            raw_conn.execute("PRAGMA optimize")
             
             pooled_conn = PooledConnection(raw_conn, self)
             
@@ -152,47 +187,176 @@ class ConnectionPool:
             return None
     
     def get_connection(self) -> Optional[PooledConnection]:
-        """Get a connection from the pool"""
+        """Get the calling thread's connection, borrowing one if needed"""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is not None:
+            with self._lock:
+                # Another thread may have reclaimed it while it was idle
+                owned = conn.owner == self._tls.token
+                if owned:
+                    conn.in_use = True
+            
+            # An outer scope on this thread is still using it, so it cannot
+            # be replaced even once expired
+            if owned and (self._tls.depth or not conn.closed and not conn.is_expired(self.max_connection_age_minutes)):
+                self._tls.depth += 1
+                return conn
+            
+            self._release_thread_connection()
+        
+        conn = self._borrow_connection()
+        if conn:
+            token = next(self._owner_tokens)
+            with self._lock:
+                conn.owner = token
+                self._thread_conns.add(conn)
+            self._tls.conn = conn
+            self._tls.token = token
+            self._tls.depth = 1
+            self._tls.owner = _ThreadOwner()
+            self._tls.finalizer = weakref.finalize(self._tls.owner, self._release_owned, conn, token)
+        
+        return conn
+    
+    def _release_thread_connection(self):
+        """Detach the calling thread's connection and hand it back to the pool"""
+        finalizer = getattr(self._tls, 'finalizer', None)
+        self._tls.conn = None
+        self._tls.token = None
+        self._tls.depth = 0
+        self._tls.owner = None
+        self._tls.finalizer = None
+        if finalizer is not None:
+            finalizer()
+    
+    def _release_owned(self, conn: PooledConnection, token: int):
+        """Return a thread's connection to the queue unless it was reclaimed"""
+        with self._lock:
+            if conn.owner != token:
+                return
+            conn.owner = None
+            self._thread_conns.discard(conn)
+        
+        self._return_to_pool(conn)
+    
+    def _reclaim_idle_connection(self) -> Optional[PooledConnection]:
+        """Take over a connection another thread holds but is not using"""
+        with self._lock:
+            for conn in self._thread_conns:
+                # Leave a transaction the owner has not finished alone
+                if conn.in_use or conn.closed or conn.connection.in_transaction:
+                    continue
+                conn.owner = None
+                conn.in_use = True
+                self._thread_conns.discard(conn)
+                self._stats['borrowed'] += 1
+                logger.debug("Reclaimed an idle thread-owned connection")
+                return conn
+        
+        return None
+    
+    def _borrow_connection(self) -> Optional[PooledConnection]:
+        """Get a connection from the pool queue"""
         try:
             # Try to get from pool first
             try:
-                conn = self._pool.get(block=True, timeout=self.connection_timeout)
-                
-                # Check if connection is still valid and not expired
-                if conn.is_expired(self.max_connection_age_minutes):
-                    logger.debug("Connection expired, creating new one")
-                    self._close_connection(conn)
-                    conn = self._create_connection()
-                
-                if conn:
-                    conn.in_use = True
-                    with self._lock:
-                        self._stats['borrowed'] += 1
-                    
-                return conn
-                
+                conn = self._pool.get_nowait()
             except Empty:
-                # Pool is empty, try to create new connection if under limit
+                # Pool is empty, reserve a slot if under limit and create the
+                # connection outside the lock
                 with self._lock:
-                    if len(self._all_connections) < self.max_connections:
+                    can_create = len(self._all_connections) + self._pending_connections < self.max_connections
+                    if can_create:
+                        self._pending_connections += 1
+                
+                if can_create:
+                    try:
                         conn = self._create_connection()
-                        if conn:
-                            conn.in_use = True
+                    finally:
+                        with self._lock:
+                            self._pending_connections -= 1
+                    
+                    if conn:
+                        conn.in_use = True
+                        with self._lock:
                             self._stats['borrowed'] += 1
-                        return conn
+                    return conn
                 
-                logger.warning("Connection pool exhausted and max connections reached")
-                return None
+                # At the limit: take an idle thread's connection, or wait for
+                # one to come back
+                conn = self._reclaim_idle_connection()
+                if conn:
+                    return conn
                 
+                try:
+                    conn = self._pool.get(block=True, timeout=self.connection_timeout)
+                except Empty:
+                    logger.warning("Connection pool exhausted and max connections reached")
+                    return None
+            
+            # Check if connection is still valid and not expired
+            if conn.is_expired(self.max_connection_age_minutes):
+                logger.debug("Connection expired, creating new one")
+                self._close_connection(conn)
+                conn = self._create_connection()
+            
+            if conn:
+                conn.in_use = True
+                with self._lock:
+                    self._stats['borrowed'] += 1
+            
+            return conn
+            
         except Exception as e:
             logger.error(f"Error getting connection from pool: {e}")
             return None
     
     def return_connection(self, conn: PooledConnection):
-        """Return a connection to the pool"""
+        """Release a connection obtained from get_connection
+        
+        Thread-owned connections stay with their thread; they go back to the
+        queue when the owning thread exits.
+        """
         if not conn:
             return
         
+        thread_owned = getattr(self._tls, 'conn', None) is conn
+        if thread_owned:
+            self._tls.depth -= 1
+            if self._tls.depth:
+                # An outer scope on this thread still holds it
+                return
+        
+        if conn.connection.in_transaction:
+            # A caller leaked an uncommitted write; it must not leak into
+            # whoever uses the connection next
+            logger.warning("Connection released with an open transaction; rolling it back")
+            conn.rollback()
+        
+        conn.return_count += 1
+        if conn.return_count % self.OPTIMIZE_INTERVAL == 0:
+            self._optimize(conn)
+        # Once idle, a thread-owned connection may be reclaimed
+        conn.in_use = False
+        
+        if thread_owned:
+            return
+        
+        self._return_to_pool(conn)
+    
+    def _optimize(self, conn: PooledConnection):
+        """Let SQLite refresh planner statistics if they have drifted"""
+        try:
+            if not conn.connection.in_transaction:
+                conn.connection.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.debug(f"PRAGMA optimize failed: {e}")
+    
+    def _return_to_pool(self, conn: PooledConnection):
+        """Put a connection back on the pool queue"""
+        if conn.closed:
+            return
+        
         try:
             # Reset connection state
             conn.in_use = False
@@ -232,43 +396,48 @@ class ConnectionPool:
     
     def _cleanup_connections(self):
         """Background thread to clean up stale connections"""
-        import time
-        
-        while True:
+        while not self._stop_event.wait(60):  # Run cleanup every minute
             try:
-                time.sleep(60)  # Run cleanup every minute
-                
-                with self._lock:
-                    stale_connections = [
-                        conn for conn in self._all_connections 
-                        if not conn.in_use and conn.is_stale(self.max_idle_minutes)
-                    ]
-                
-                for conn in stale_connections:
-                    logger.debug("Cleaning up stale connection")
-                    self._close_connection(conn)
-                    
-                    # Remove from pool if present
-                    try:
-                        # Create a new temporary queue to filter out the stale connection
-                        temp_queue = Queue(maxsize=self.max_connections)
-                        while not self._pool.empty():
-                            try:
-                                pool_conn = self._pool.get_nowait()
-                                if pool_conn != conn:
-                                    temp_queue.put_nowait(pool_conn)
-                            except Empty:
-                                break
-                        
-                        # Replace the pool with the filtered queue
-                        self._pool = temp_queue
-                        
-                    except Exception as e:
-                        logger.warning(f"Error during pool cleanup: {e}")
-                
+                self._remove_stale_connections()
             except Exception as e:
                 logger.error(f"Error in connection cleanup thread: {e}")
     
+    def _remove_stale_connections(self) -> int:
+        """Close idle pooled connections in a single pass over the pool"""
+        with self._lock:
+            stale_ids = {
+                id(conn) for conn in self._all_connections 
+                if not conn.in_use and conn.is_stale(self.max_idle_minutes)
+            }
+        
+        if not stale_ids:
+            return 0
+        
+        # Drain the pool once and requeue the survivors. Stale connections
+        # borrowed since the snapshot are not in the queue and are left alone.
+        drained = []
+        while True:
+            try:
+                drained.append(self._pool.get_nowait())
+            except Empty:
+                break
+        
+        to_close = []
+        for conn in drained:
+            if id(conn) in stale_ids:
+                to_close.append(conn)
+                continue
+            try:
+                self._pool.put_nowait(conn)
+            except Full:
+                to_close.append(conn)
+        
+        for conn in to_close:
+            logger.debug("Cleaning up stale connection")
+            self._close_connection(conn)
+        
+        return len(to_close)
+    
     @contextmanager
     def get_db_connection(self):
         """Context manager for getting and automatically returning connections"""
@@ -278,9 +447,19 @@ class ConnectionPool:
         
         try:
             yield conn
+        except Exception:
+            # Don't leave a failed write open on a connection that is reused;
+            # a nested scope leaves that to the outermost one
+            if not self._is_nested(conn) and conn.connection.in_transaction:
+                conn.rollback()
+            raise
         finally:
             self.return_connection(conn)
     
+    def _is_nested(self, conn: PooledConnection) -> bool:
+        """Whether an outer scope on this thread also holds the connection"""
+        return getattr(self._tls, 'conn', None) is conn and self._tls.depth > 1
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get connection pool statistics"""
         with self._lock:
@@ -295,6 +474,7 @@ class ConnectionPool:
     def close_all(self):
         """Close all connections in the pool"""
         logger.info("Closing all pooled connections")
+        self._stop_event.set()
         
         # Close all connections in pool
         while not self._pool.empty():
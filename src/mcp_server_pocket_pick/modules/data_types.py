@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from pathlib import Path
 from pydantic import BaseModel
 from typing import List, Optional
@@ -42,11 +43,21 @@ class RemoveCommand(BaseModel):
     db_path: Path = DEFAULT_SQLITE_DATABASE_PATH
 
 
+class RemoveManyCommand(BaseModel):
+    ids: List[str]
+    db_path: Path = DEFAULT_SQLITE_DATABASE_PATH
+
+
 class GetCommand(BaseModel):
     id: str
     db_path: Path = DEFAULT_SQLITE_DATABASE_PATH
 
 
+class GetManyCommand(BaseModel):
+    ids: List[str]
+    db_path: Path = DEFAULT_SQLITE_DATABASE_PATH
+
+
 class GetPatternCommand(BaseModel):
     slug: str
     patterns_path: Path = Path("./patterns")
@@ -75,6 +86,7 @@ class ImportPatternsWithBodiesCommand(BaseModel):
     descriptions_path: Path
     extracts_path: Path
     db_path: Path = DEFAULT_SQLITE_DATABASE_PATH
+    return_items: bool = True
 
 
 class SuggestPatternTagsCommand(BaseModel):
@@ -100,7 +112,10 @@ class PatternItem(BaseModel):
     score: float
 
 
-class PocketItem(BaseModel):
+# Result record built for every row a query returns; a plain slotted
+# dataclass skips the validation that command models get at the RPC boundary
+@dataclass(slots=True)
+class PocketItem:
     id: str
     created: datetime
     text: str
@@ -7,34 +7,128 @@ for semantic search capabilities in the Pocket Pick knowledge base.
 
 import logging
 import hashlib
-import pickle
-from typing import List, Tuple, Optional
+import mmap
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future
+from queue import Queue, Empty
+from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 import numpy as np
 
+# BLAKE3 hashes long texts several times faster than SHA-256 when installed
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# Advisory file locks keep appends from other processes in order (POSIX only)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Loaded models, shared by every generator in the process
+_models: Dict[str, object] = {}
+_models_lock = threading.Lock()
+
+# Torch's intra-op thread count is process-wide, so it is tuned only once
+_torch_threads_configured = False
+
+
+def _configure_torch_threads(max_threads: int) -> None:
+    """Let torch use up to `max_threads` cores for encoding, once per process"""
+    global _torch_threads_configured
+    if _torch_threads_configured:
+        return
+    _torch_threads_configured = True
+    try:
+        import torch
+        torch.set_num_threads(min(os.cpu_count() or 1, max_threads))
+    except Exception as e:
+        logger.debug(f"Could not configure torch threads: {e}")
+
+
 class EmbeddingCache:
-    """Simple disk-based cache for embeddings to avoid regenerating them repeatedly"""
+    """Disk cache for embeddings to avoid regenerating them repeatedly
+    
+    Vectors are appended as raw float32 to a single vectors.f32 file and
+    located through a small SQLite index mapping cache key to (offset, dim).
+    Reads slice a read-only memory map of the vector file, so a cache hit is
+    an index lookup plus a zero-copy view rather than an unpickle. Appends
+    hold an exclusive lock on the vector file, so processes sharing the
+    cache directory agree on where each vector lands.
+    """
     
     def __init__(self, cache_dir: Path = Path(".embeddings_cache")):
         self.cache_dir = cache_dir
         self.cache_dir.mkdir(exist_ok=True)
+        self.vectors_path = self.cache_dir / "vectors.f32"
+        self.vectors_path.touch(exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._mm: Optional[np.memmap] = None
+        
+        self._index = sqlite3.connect(str(self.cache_dir / "index.sqlite"), check_same_thread=False)
+        self._index.execute("PRAGMA journal_mode=WAL")
+        self._index.execute("PRAGMA synchronous=NORMAL")
+        self._index.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key TEXT PRIMARY KEY, offset INTEGER NOT NULL, dim INTEGER NOT NULL)"
+        )
+        self._index.commit()
         
     def _get_cache_key(self, text: str, model_name: str) -> str:
         """Generate a cache key for the given text and model"""
-        content = f"{model_name}:{text}"
-        return hashlib.sha256(content.encode()).hexdigest()
+        hasher = blake3.blake3() if BLAKE3_AVAILABLE else hashlib.sha256()
+        # Feed the parts separately rather than hashing a concatenated copy
+        hasher.update(f"{model_name}:".encode())
+        hasher.update(text.encode())
+        return hasher.hexdigest()
+    
+    def _vectors(self, end: int) -> Optional[np.memmap]:
+        """Memory map covering at least the first `end` floats of the vector file"""
+        if self._mm is None or self._mm.shape[0] < end:
+            size = self.vectors_path.stat().st_size // 4
+            if size < end:
+                return None
+            self._mm = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(size,))
+            # Hits touch one small vector at a random offset, so readahead
+            # would only pull in neighbouring vectors nobody asked for
+            if hasattr(mmap, 'MADV_RANDOM'):
+                try:
+                    self._mm._mmap.madvise(mmap.MADV_RANDOM)
+                except (AttributeError, OSError) as e:
+                    logger.debug(f"madvise unavailable for embedding cache: {e}")
+        return self._mm
+    
+    @staticmethod
+    def _write_all(fd: int, payload: bytes) -> None:
+        """Write the whole payload with unbuffered writes"""
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
     
     def get(self, text: str, model_name: str) -> Optional[np.ndarray]:
         """Retrieve cached embedding if it exists"""
         try:
             cache_key = self._get_cache_key(text, model_name)
-            cache_file = self.cache_dir / f"{cache_key}.pkl"
-            
-            if cache_file.exists():
-                with open(cache_file, 'rb') as f:
-                    return pickle.load(f)
+            with self._lock:
+                row = self._index.execute(
+                    "SELECT offset, dim FROM embeddings WHERE key = ?", (cache_key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                
+                offset, dim = row
+                vectors = self._vectors(offset + dim)
+                if vectors is not None:
+                    return vectors[offset:offset + dim]
         except Exception as e:
             logger.warning(f"Error reading from embedding cache: {e}")
         return None
@@ -43,10 +137,31 @@ class EmbeddingCache:
         """Store embedding in cache"""
         try:
             cache_key = self._get_cache_key(text, model_name)
-            cache_file = self.cache_dir / f"{cache_key}.pkl"
+            data = np.ascontiguousarray(embedding, dtype=np.float32).ravel()
             
-            with open(cache_file, 'wb') as f:
-                pickle.dump(embedding, f)
+            with self._lock:
+                fd = os.open(self.vectors_path, os.O_WRONLY | os.O_APPEND)
+                try:
+                    if FCNTL_AVAILABLE:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                    
+                    # Take the offset from the file itself, under the lock;
+                    # realign after a torn write so offsets stay float-aligned
+                    end = os.fstat(fd).st_size
+                    padding = -end % 4
+                    offset = (end + padding) // 4
+                    self._write_all(fd, b'\0' * padding + data.tobytes())
+                    
+                    # The vector is written before its index row, so a crash
+                    # leaves at most unreferenced bytes at the end of the file
+                    with self._index:
+                        self._index.execute(
+                            "INSERT OR REPLACE INTO embeddings (key, offset, dim) VALUES (?, ?, ?)",
+                            (cache_key, offset, data.size)
+                        )
+                finally:
+                    # Closing the descriptor releases the lock
+                    os.close(fd)
         except Exception as e:
             logger.warning(f"Error writing to embedding cache: {e}")
 
@@ -54,26 +169,43 @@ class EmbeddingCache:
 class EmbeddingGenerator:
     """Handles text embedding generation using sentence-transformers"""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache_enabled: bool = True):
+    # Texts per forward pass; encode() sorts by length, so large batches
+    # stay cheap on padding
+    ENCODE_BATCH_SIZE = 1024
+    MAX_TORCH_THREADS = 16
+    
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache_enabled: bool = True,
+                 cache_dir: Path = Path(".embeddings_cache")):
         """
         Initialize the embedding generator
         
         Args:
             model_name: Name of the sentence-transformer model to use
             cache_enabled: Whether to use disk caching for embeddings
+            cache_dir: Directory for the embedding cache
         """
         self.model_name = model_name
         self.model = None
-        self.cache = EmbeddingCache() if cache_enabled else None
+        self.cache = None
+        # Load the model first, so a generator that cannot embed anything
+        # leaves no cache directory behind
         self._load_model()
+        if cache_enabled:
+            self.cache = EmbeddingCache(cache_dir)
     
     def _load_model(self):
-        """Lazy load the sentence transformer model"""
+        """Lazy load the sentence transformer model, once per process"""
         try:
-            from sentence_transformers import SentenceTransformer
-            logger.info(f"Loading embedding model: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
-            logger.info(f"Successfully loaded embedding model: {self.model_name}")
+            with _models_lock:
+                self.model = _models.get(self.model_name)
+                if self.model is not None:
+                    return
+                
+                from sentence_transformers import SentenceTransformer
+                logger.info(f"Loading embedding model: {self.model_name}")
+                _configure_torch_threads(self.MAX_TORCH_THREADS)
+                self.model = _models[self.model_name] = SentenceTransformer(self.model_name)
+                logger.info(f"Successfully loaded embedding model: {self.model_name}")
         except ImportError as e:
             logger.error(f"sentence-transformers not available: {e}")
             raise
@@ -124,6 +256,11 @@ class EmbeddingGenerator:
         if len(text) <= chunk_size:
             return [text]
         
+        # Locate every sentence end once (as character offsets, via UTF-32)
+        # so each window needs a binary search instead of a substring scan
+        codepoints = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        periods = np.flatnonzero(codepoints == ord('.'))
+        
         chunks = []
         start = 0
         
@@ -133,9 +270,11 @@ class EmbeddingGenerator:
             # Try to end at sentence boundary
             if end < len(text):
                 # Look for sentence end within the last 100 characters
-                last_period = text.rfind('.', end - 100, end)
-                if last_period != -1 and last_period > start:
-                    end = last_period + 1
+                idx = int(np.searchsorted(periods, end))
+                if idx:
+                    last_period = int(periods[idx - 1])
+                    if last_period >= end - 100 and last_period > start:
+                        end = last_period + 1
             
             chunk = text[start:end].strip()
             if chunk:
@@ -176,7 +315,7 @@ class EmbeddingGenerator:
         
         # Generate embedding
         try:
-            embedding = self.model.encode([processed_text])[0]
+            embedding = self.model.encode([processed_text], normalize_embeddings=True)[0]
             embedding = embedding.astype(np.float32)  # Reduce memory usage
             
             # Cache the result
@@ -227,8 +366,14 @@ class EmbeddingGenerator:
         # Generate embeddings for uncached texts
         if texts_to_embed:
             try:
-                batch_embeddings = self.model.encode(texts_to_embed)
-                batch_embeddings = [emb.astype(np.float32) for emb in batch_embeddings]
+                batch_embeddings = self.model.encode(
+                    texts_to_embed,
+                    batch_size=self.ENCODE_BATCH_SIZE,
+                    show_progress_bar=False,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+                batch_embeddings = [emb.astype(np.float32, copy=False) for emb in batch_embeddings]
                 
                 # Fill in the results and cache them
                 batch_idx = 0
@@ -261,6 +406,153 @@ class EmbeddingGenerator:
             return len(test_embedding)
 
 
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests into batched model calls
+    
+    Callers submit single texts and get a Future back. A background thread
+    drains whatever has queued up since the last model call and encodes it in
+    one batch, so concurrent adds share a forward pass instead of each
+    running their own.
+    """
+    
+    def __init__(self, generator: EmbeddingGenerator, max_batch_size: int = 64):
+        self.generator = generator
+        self.max_batch_size = max_batch_size
+        self._queue: Queue = Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def submit(self, text: str) -> Future:
+        """Queue a text for embedding and return a Future for its vector"""
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+    
+    def _run(self):
+        """Background thread encoding queued texts in batches"""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            
+            try:
+                embeddings = self.generator.generate_embeddings_batch([text for text, _ in batch])
+            except Exception as e:
+                logger.error(f"Error in embedding batcher: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+
+# Shared generators and batchers, one per model
+_generators: Dict[str, EmbeddingGenerator] = {}
+_batchers: Dict[str, EmbeddingBatcher] = {}
+_generator_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    """Drop shared state a forked child cannot safely reuse
+    
+    Batcher threads do not survive a fork and the cache index connection must
+    not be shared across processes, so the child reloads everything lazily.
+    """
+    global _models_lock, _generator_lock
+    _models.clear()
+    _generators.clear()
+    _batchers.clear()
+    _models_lock = threading.Lock()
+    _generator_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_embedding_generator(model_name: str = "all-MiniLM-L6-v2") -> EmbeddingGenerator:
+    """Get the shared embedding generator for a model, loading it on first use"""
+    with _generator_lock:
+        if model_name not in _generators:
+            _generators[model_name] = EmbeddingGenerator(model_name)
+        return _generators[model_name]
+
+
+def get_embedding_batcher(model_name: str = "all-MiniLM-L6-v2") -> EmbeddingBatcher:
+    """Get the shared embedding batcher for a model"""
+    generator = get_embedding_generator(model_name)
+    with _generator_lock:
+        if model_name not in _batchers:
+            _batchers[model_name] = EmbeddingBatcher(generator)
+        return _batchers[model_name]
+
+
+class VectorIndex:
+    """Row-normalized embedding matrix for batched cosine similarity
+    
+    Normalizing once at build time turns every query into a single
+    matrix-vector product instead of one cosine computation per embedding.
+    """
+    
+    def __init__(self, embeddings: List[Optional[np.ndarray]]):
+        rows = [i for i, emb in enumerate(embeddings) if emb is not None and emb.size > 0]
+        if rows:
+            # Embeddings from a different model (dimension) cannot be compared
+            dim = embeddings[rows[0]].size
+            rows = [i for i in rows if embeddings[i].size == dim]
+        
+        # Positions in the original list, so results keep the caller's indices
+        self.ids = np.asarray(rows, dtype=np.intp)
+        
+        if rows:
+            matrix = np.stack([np.asarray(embeddings[i], dtype=np.float32).ravel() for i in rows])
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            # Zero vectors get NaN scores so they never pass the threshold
+            norms[norms == 0] = np.nan
+            matrix /= norms
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+        self.matrix = matrix
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def search(self, query_embedding: np.ndarray, 
+               top_k: int = 10,
+               similarity_threshold: float = 0.3) -> List[Tuple[int, float]]:
+        """Return (index, similarity) pairs for the closest rows, best first"""
+        if not len(self) or top_k <= 0:
+            return []
+        
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        if query.size != self.matrix.shape[1]:
+            logger.warning(f"Query dimension {query.size} does not match index dimension {self.matrix.shape[1]}")
+            return []
+        
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        
+        scores = np.clip(self.matrix @ (query / norm), -1.0, 1.0)
+        
+        # Find the k-th best score in O(n) and sort only the rows reaching
+        # it; ties at the cutoff are resolved in input order
+        k = min(top_k, scores.size)
+        if k < scores.size:
+            cutoff = np.partition(-scores, k - 1)[k - 1]
+            candidates = np.flatnonzero(-scores <= cutoff) if not np.isnan(cutoff) else np.arange(scores.size)
+        else:
+            candidates = np.arange(scores.size)
+        order = candidates[np.argsort(-scores[candidates], kind='stable')][:k]
+        order = order[scores[order] >= similarity_threshold]
+        
+        return [(int(self.ids[i]), float(scores[i])) for i in order]
+
+
 class VectorSimilarity:
     """Utilities for vector similarity calculations"""
     
@@ -313,18 +605,7 @@ class VectorSimilarity:
         if not embeddings:
             return []
         
-        similarities = []
-        
-        for i, embedding in enumerate(embeddings):
-            if embedding is not None and embedding.size > 0:
-                similarity = VectorSimilarity.cosine_similarity(query_embedding, embedding)
-                if similarity >= similarity_threshold:
-                    similarities.append((i, similarity))
-        
-        # Sort by similarity (highest first)
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
-        return similarities[:top_k]
+        return VectorIndex(embeddings).search(query_embedding, top_k, similarity_threshold)
 
 
 def serialize_embedding(embedding: np.ndarray) -> bytes:
@@ -337,4 +618,26 @@ def deserialize_embedding(data: bytes, dtype: np.dtype = np.float32, shape: Tupl
     if shape is None:
         # Assume 384 dimensions for all-MiniLM-L6-v2
         shape = (384,)
-    return np.frombuffer(data, dtype=dtype).reshape(shape)
\ No newline at end of file
+    return np.frombuffer(data, dtype=dtype).reshape(shape)
+
+
+def serialize_embedding_int8(embedding: np.ndarray) -> Tuple[bytes, float]:
+    """
+    Quantize an embedding to int8 for database storage
+    
+    Returns the int8 bytes and the per-vector scale; the original vector is
+    approximately `int8_values * scale`. Cosine similarity is insensitive to
+    the rounding error, and the stored blob is a quarter of the float32 size.
+    """
+    vector = np.asarray(embedding, dtype=np.float32).ravel()
+    max_abs = float(np.abs(vector).max()) if vector.size else 0.0
+    scale = max_abs / 127.0
+    if scale == 0.0:
+        return np.zeros(vector.size, dtype=np.int8).tobytes(), 0.0
+    quantized = np.rint(vector / scale).astype(np.int8)
+    return quantized.tobytes(), scale
+
+
+def deserialize_embedding_int8(data: bytes, scale: float) -> np.ndarray:
+    """Dequantize an int8 embedding back to float32"""
+    return np.frombuffer(data, dtype=np.int8).astype(np.float32) * np.float32(scale)
\ No newline at end of file
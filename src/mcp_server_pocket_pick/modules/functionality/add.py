@@ -1,14 +1,20 @@
 import uuid
-import json
 from datetime import datetime
 import logging
+from typing import List
 from ..data_types import AddCommand, PocketItem
-from ..init_db import normalize_tags
+from ..init_db import normalize_tags, serialize_tags
 from ..connection_pool import get_db_connection
-from ..embeddings import EmbeddingGenerator, serialize_embedding
+from ..embeddings import get_embedding_batcher, get_embedding_generator, serialize_embedding_int8
 
 logger = logging.getLogger(__name__)
 
+_INSERT_SQL = """
+    INSERT INTO POCKET_PICK 
+    (id, created, text, tags, embedding, embedding_scale, embedding_model, embedding_updated) 
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 def add(command: AddCommand) -> PocketItem:
     """
     Add a new item to the pocket pick database
@@ -28,37 +34,34 @@ def add(command: AddCommand) -> PocketItem:
     # Get current timestamp
     timestamp = datetime.now()
     
+    # Generate embedding for the text before taking a connection; concurrent
+    # adds are encoded together by the shared batcher
+    embedding_blob = None
+    embedding_scale = None
+    embedding_updated = None
+    
+    try:
+        embedding = get_embedding_batcher().submit(command.text).result()
+        embedding_blob, embedding_scale = serialize_embedding_int8(embedding)
+        embedding_updated = timestamp.isoformat()
+        logger.debug(f"Generated embedding for new item: {item_id}")
+    except Exception as e:
+        logger.warning(f"Failed to generate embedding for new item: {e}")
+    
     # Use connection pool for better performance
     with get_db_connection(command.db_path) as conn:
         try:
             # Serialize tags to JSON
-            tags_json = json.dumps(normalized_tags)
-            
-            # Generate embedding for the text
-            embedding = None
-            embedding_blob = None
-            embedding_updated = None
-            
-            try:
-                embedding_generator = EmbeddingGenerator()
-                embedding = embedding_generator.generate_embedding(command.text)
-                embedding_blob = serialize_embedding(embedding)
-                embedding_updated = timestamp.isoformat()
-                logger.debug(f"Generated embedding for new item: {item_id}")
-            except Exception as e:
-                logger.warning(f"Failed to generate embedding for new item: {e}")
+            tags_json = serialize_tags(normalized_tags)
             
             # Insert item with embedding
-            conn.execute("""
-                INSERT INTO POCKET_PICK 
-                (id, created, text, tags, embedding, embedding_model, embedding_updated) 
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+            conn.execute(_INSERT_SQL, (
                 item_id, 
                 timestamp.isoformat(), 
                 command.text, 
                 tags_json,
                 embedding_blob,
+                embedding_scale,
                 'all-MiniLM-L6-v2',
                 embedding_updated
             ))
@@ -75,4 +78,72 @@ def add(command: AddCommand) -> PocketItem:
             )
         except Exception as e:
             logger.error(f"Error adding item: {e}")
-            raise
\ No newline at end of file
+            raise
+
+def add_batch(commands: List[AddCommand]) -> List[PocketItem]:
+    """
+    Add several items to the pocket pick database at once
+    
+    Embeddings for all texts are generated in a single model call and the
+    rows are inserted with one executemany and one commit per database,
+    instead of a statement and a commit per item.
+    
+    Args:
+        commands: AddCommands with text, tags and db_path
+        
+    Returns:
+        List[PocketItem]: The newly created items, in command order
+    """
+    if not commands:
+        return []
+    
+    # Generate all embeddings in one batch
+    embeddings = [None] * len(commands)
+    try:
+        embeddings = get_embedding_generator().generate_embeddings_batch(
+            [command.text for command in commands]
+        )
+    except Exception as e:
+        logger.warning(f"Failed to generate embeddings for new items: {e}")
+    
+    items = []
+    rows_by_db = {}
+    for command, embedding in zip(commands, embeddings):
+        normalized_tags = normalize_tags(command.tags)
+        item_id = str(uuid.uuid4())
+        timestamp = datetime.now()
+        
+        embedding_blob = None
+        embedding_scale = None
+        embedding_updated = None
+        if embedding is not None:
+            embedding_blob, embedding_scale = serialize_embedding_int8(embedding)
+            embedding_updated = timestamp.isoformat()
+        
+        rows_by_db.setdefault(command.db_path, []).append((
+            item_id,
+            timestamp.isoformat(),
+            command.text,
+            serialize_tags(normalized_tags),
+            embedding_blob,
+            embedding_scale,
+            'all-MiniLM-L6-v2',
+            embedding_updated
+        ))
+        items.append(PocketItem(
+            id=item_id,
+            created=timestamp,
+            text=command.text,
+            tags=normalized_tags
+        ))
+    
+    for db_path, rows in rows_by_db.items():
+        with get_db_connection(db_path) as conn:
+            try:
+                conn.executemany(_INSERT_SQL, rows)
+                conn.commit()
+            except Exception as e:
+                logger.error(f"Error adding items: {e}")
+                raise
+    
+    return items
\ No newline at end of file
@@ -1,11 +1,11 @@
 import sqlite3
 import uuid
-import json
 from datetime import datetime
 from pathlib import Path
 import logging
 from ..data_types import AddFileCommand, PocketItem
-from ..init_db import init_db, normalize_tags
+from ..init_db import normalize_tags, serialize_tags
+from ..connection_pool import get_db_connection
 
 logger = logging.getLogger(__name__)
 
@@ -25,8 +25,10 @@ def add_file(command: AddFileCommand) -> PocketItem:
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            text = f.read()
+        # Single read and decode; undecodable bytes are replaced rather than
+        # failing the whole import. Newlines are translated as text mode would
+        text = file_path.read_bytes().decode('utf-8', errors='replace')
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
     except Exception as e:
         logger.error(f"Error reading file {command.file_path}: {e}")
         raise
@@ -40,31 +42,28 @@ def add_file(command: AddFileCommand) -> PocketItem:
     # Get current timestamp
     timestamp = datetime.now()
     
-    # Connect to database
-    db = init_db(command.db_path)
-    
-    try:
-        # Serialize tags to JSON
-        tags_json = json.dumps(normalized_tags)
-        
-        # Insert item
-        db.execute(
-            "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
-            (item_id, timestamp.isoformat(), text, tags_json)
-        )
-        
-        # Commit transaction
-        db.commit()
-        
-        # Return created item
-        return PocketItem(
-            id=item_id,
-            created=timestamp,
-            text=text,
-            tags=normalized_tags
-        )
-    except Exception as e:
-        logger.error(f"Error adding item from file: {e}")
-        raise
-    finally:
-        db.close()
\ No newline at end of file
+    # Use connection pool for better performance
+    with get_db_connection(command.db_path) as db:
+        try:
+            # Serialize tags to JSON
+            tags_json = serialize_tags(normalized_tags)
+            
+            # Insert item
+            db.execute(
+                "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
+                (item_id, timestamp.isoformat(), text, tags_json)
+            )
+            
+            # Commit transaction
+            db.commit()
+            
+            # Return created item
+            return PocketItem(
+                id=item_id,
+                created=timestamp,
+                text=text,
+                tags=normalized_tags
+            )
+        except Exception as e:
+            logger.error(f"Error adding item from file: {e}")
+            raise
\ No newline at end of file
@@ -1,7 +1,7 @@
-import shutil
+import sqlite3
 import logging
 from ..data_types import BackupCommand
-from ..init_db import init_db
+from ..connection_pool import get_db_connection
 
 logger = logging.getLogger(__name__)
 
@@ -9,22 +9,32 @@ def backup(command: BackupCommand) -> bool:
     """
     Backup the pocket pick database to a specified location
     
+    Uses SQLite's online backup API, so the copy is consistent even while
+    other connections are writing and includes changes still in the WAL.
+    
     Args:
         command: BackupCommand with backup destination path
         
     Returns:
         bool: True if backup was successful, False otherwise
     """
-    # Make sure source DB exists by initializing it if needed
-    db = init_db(command.db_path)
-    db.close()
-    
     try:
+        # Opening a missing database would create an empty one to back up
+        if not command.db_path.exists():
+            logger.error(f"Database not found at {command.db_path}")
+            return False
+        
         # Create parent directories if they don't exist
         command.backup_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Copy the database file to the backup location
-        shutil.copy2(command.db_path, command.backup_path)
+        # Copy the database in steps from a pooled connection so writers
+        # can get in between steps instead of waiting for the whole copy
+        with get_db_connection(command.db_path) as conn:
+            dest = sqlite3.connect(str(command.backup_path))
+            try:
+                conn.connection.backup(dest, pages=1024)
+            finally:
+                dest.close()
         
         # Verify the backup file exists
         if command.backup_path.exists():
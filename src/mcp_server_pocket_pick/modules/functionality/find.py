@@ -1,17 +1,63 @@
 import sqlite3
-import json
 import asyncio
-from datetime import datetime
-from typing import List
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import logging
 import re
+import threading
 from ..data_types import FindCommand, PocketItem
-from ..init_db import normalize_tags
+from ..init_db import normalize_tags, deserialize_tags, parse_created, tag_filter_sql, tag_filter_params, compile_regex, like_search_words
 from ..connection_pool import get_db_connection
 from ..search_engine import HybridSearchEngine, SearchConfig
 
 logger = logging.getLogger(__name__)
 
+# MATERIALIZED (SQLite 3.35+) keeps the planner from flattening the FTS CTE
+# into the join and driving the query from POCKET_PICK instead
+_FTS_CTE = "MATERIALIZED " if sqlite3.sqlite_version_info >= (3, 35, 0) else ""
+
+# Text predicate per search mode; FTS joins through its own CTE instead
+_TEXT_PREDICATES = {
+    "substr": "text LIKE ?",
+    "glob": "text GLOB ?",
+    "regex": "text REGEXP ?",
+    "exact": "text = ?",
+}
+
+# ASCII letters that IGNORECASE also matches against non-ASCII characters
+# (e.g. "k" and the Kelvin sign), which LIKE's ASCII-only folding would miss
+_UNICODE_FOLDING = frozenset("IKSiks")
+
+# Runs hybrid searches for sync callers inside a running event loop
+_HYBRID_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-find")
+
+# Hybrid search engine shared by every call; the candidate count is passed
+# per search, so the config is fixed
+_ENGINE: Optional[HybridSearchEngine] = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    """Drop the shared engine and worker, which a forked child cannot reuse
+    
+    The engine holds the parent's embedding generator and its cache index
+    connection, and the executor's threads do not survive a fork.
+    """
+    global _ENGINE, _ENGINE_LOCK, _HYBRID_EXECUTOR
+    _ENGINE = None
+    _ENGINE_LOCK = threading.Lock()
+    _HYBRID_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-find")
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+# SQL per (mode, tag count, text term count). Values are always bound, so
+# each shape is built once and SQLite's statement cache reuses its program
+_SQL_CACHE: Dict[Tuple[str, int, int], str] = {}
+
 def find(command: FindCommand) -> List[PocketItem]:
     """
     Find items in the pocket pick database matching the search criteria
@@ -34,40 +80,67 @@ def find(command: FindCommand) -> List[PocketItem]:
     return _traditional_find(command)
 
 
+async def afind(command: FindCommand) -> List[PocketItem]:
+    """
+    Async variant of find for callers already running an event loop
+    
+    Hybrid modes await the search engine on the caller's loop instead of
+    handing the search to a worker thread with a loop of its own.
+    
+    Args:
+        command: FindCommand with search parameters
+        
+    Returns:
+        List[PocketItem]: List of matching items
+    """
+    if command.mode in ['hybrid', 'vector', 'semantic']:
+        try:
+            return await _ahybrid_find(command)
+        except Exception as e:
+            logger.warning(f"Hybrid search failed: {e}, falling back to traditional search")
+    
+    return _traditional_find(command)
+
+
+def _get_search_engine() -> HybridSearchEngine:
+    """Shared search engine, so its cache outlives a call"""
+    global _ENGINE
+    with _ENGINE_LOCK:
+        if _ENGINE is None:
+            # Create search engine with optimized config
+            config = SearchConfig(
+                vector_weight=0.4,
+                fts_weight=0.35,
+                fuzzy_weight=0.25,
+                vector_similarity_threshold=0.3,
+                fuzzy_score_threshold=50,
+                min_total_score=0.1,
+                enable_caching=True,
+                parallel_search=True
+            )
+            _ENGINE = HybridSearchEngine(config)
+        return _ENGINE
+
+
 def _hybrid_find(command: FindCommand) -> List[PocketItem]:
+    """Run the hybrid search from synchronous code"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # No loop on this thread, so run one for this search
+        return asyncio.run(_ahybrid_find(command))
+    
+    # A running loop cannot be re-entered from this thread; use the shared
+    # worker rather than creating a thread pool per call
+    return _HYBRID_EXECUTOR.submit(asyncio.run, _ahybrid_find(command)).result(timeout=60)
+
+
+async def _ahybrid_find(command: FindCommand) -> List[PocketItem]:
     """Use the new hybrid search engine"""
     try:
-        # Create search engine with optimized config
-        config = SearchConfig(
-            vector_weight=0.4,
-            fts_weight=0.35,
-            fuzzy_weight=0.25,
-            vector_similarity_threshold=0.3,
-            fuzzy_score_threshold=50,
-            min_total_score=0.1,
-            max_results=command.limit * 2,  # Get more results for better ranking
-            enable_caching=True,
-            parallel_search=True
-        )
-        
-        search_engine = HybridSearchEngine(config)
-        
-        # Run async search in sync context
-        loop = None
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        if loop.is_running():
-            # If we're already in an async context, create a new event loop
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, search_engine.search(command))
-                search_results = future.result(timeout=60)
-        else:
-            search_results = loop.run_until_complete(search_engine.search(command))
+        search_engine = _get_search_engine()
+        # Get more results for better ranking
+        search_results = await search_engine.search(command, max_results=command.limit * 2)
         
         # Convert SearchResult objects back to PocketItem objects
         items = []
@@ -82,125 +155,208 @@ def _hybrid_find(command: FindCommand) -> List[PocketItem]:
         raise
 
 
+# Hex digits following \x, \u and \U in a regex escape
+_HEX_ESCAPE_DIGITS = {'x': 2, 'u': 4, 'U': 8}
+
+
+@functools.lru_cache(maxsize=256)
+def _regex_literals(pattern: str, min_length: int = 3) -> Tuple[str, ...]:
+    """
+    Literal substrings that every match of a regex must contain
+    
+    Deliberately conservative: alternation and verbose patterns yield nothing,
+    groups, classes, escapes and quantified characters end a literal run, and
+    runs stop at characters LIKE cannot fold the way IGNORECASE does.
+    """
+    if '|' in pattern or compile_regex(pattern).flags & re.VERBOSE:
+        return ()
+    
+    literals = []
+    run = []
+    depth = 0
+    i = 0
+    
+    def end_run():
+        if len(run) >= min_length:
+            literals.append(''.join(run))
+        run.clear()
+    
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            end_run()
+            i += 1
+            # Skip the whole escape; its digits or name are not literal text
+            if i < len(pattern) and pattern[i] in _HEX_ESCAPE_DIGITS:
+                i += _HEX_ESCAPE_DIGITS[pattern[i]]
+            elif pattern.startswith('N{', i):
+                i = pattern.find('}', i)
+            elif i < len(pattern) and pattern[i].isdigit():
+                while i + 1 < len(pattern) and pattern[i + 1].isdigit():
+                    i += 1
+        elif c == '[':
+            end_run()
+            # Skip the class; a leading "]" (after an optional "^") is literal
+            i += 1
+            if i < len(pattern) and pattern[i] == '^':
+                i += 1
+            if i < len(pattern) and pattern[i] == ']':
+                i += 1
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+        elif c in '()':
+            end_run()
+            depth += 1 if c == '(' else -1
+        elif c in '?*+{':
+            # The preceding character is optional or repeated
+            if run:
+                run.pop()
+            end_run()
+            if c == '{':
+                while i < len(pattern) and pattern[i] != '}':
+                    i += 1
+        elif c in '.^$' or not c.isascii() or c in _UNICODE_FOLDING:
+            end_run()
+        elif depth == 0:
+            run.append(c)
+        i += 1
+    end_run()
+    
+    return tuple(literals)
+
+
+@functools.lru_cache(maxsize=256)
+def _trigram_query(pattern: str, mode: str) -> str:
+    """
+    Trigram MATCH expression requiring the literal runs of a LIKE or GLOB pattern
+    
+    Any text the pattern matches contains every run of three or more literal
+    characters, so the lookup returns a superset and the pattern itself still
+    decides. Returns "" when no run is long enough to look up.
+    """
+    if mode == "glob":
+        # "*", "?" and bracketed classes are the GLOB wildcards
+        runs = re.split(r"\[\]?[^\]]*\]?|[*?]", pattern)
+    else:
+        runs = re.split(r"[%_]", pattern)
+    
+    return " AND ".join(
+        '"' + run.replace('"', '""') + '"' for run in runs if len(run) >= 3
+    )
+
+
+def _like_contains(literal: str) -> str:
+    """LIKE pattern matching `literal` anywhere, for use with ESCAPE '\\'"""
+    escaped = literal.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def _build_find_sql(mode: str, n_tags: int, n_terms: int) -> str:
+    """
+    Build the SQL for one query shape
+    
+    `n_terms` is 1 when the search has text (0 otherwise), or the number of
+    words for the "words" LIKE fallback used when an FTS query fails.
+    Substring and glob searches use 2 when a trigram lookup precedes the
+    pattern, and regex searches count their LIKE prefilter terms too.
+    Every value is a `?` placeholder: text terms first, then tags, then limit.
+    """
+    if mode == "fts" and n_terms:
+        query = f"""
+        WITH fts_matches AS {_FTS_CTE}(
+            SELECT rowid, rank FROM pocket_pick_fts
+            WHERE pocket_pick_fts MATCH ?
+        )
+        SELECT POCKET_PICK.id, POCKET_PICK.created, POCKET_PICK.text, POCKET_PICK.tags 
+        FROM fts_matches 
+        JOIN POCKET_PICK ON fts_matches.rowid = POCKET_PICK.rowid
+        """
+        if n_tags:
+            query += f" WHERE {tag_filter_sql(n_tags, 'POCKET_PICK.id')}"
+        return query + " ORDER BY fts_matches.rank, POCKET_PICK.created DESC LIMIT ?"
+    
+    where_clauses = []
+    if mode in ("substr", "glob") and n_terms == 2:
+        # Candidate rows come from the trigram index; the pattern then
+        # filters out trigram hits that are not real matches
+        where_clauses.append(
+            "rowid IN (SELECT rowid FROM pocket_pick_trigram WHERE pocket_pick_trigram MATCH ?)"
+        )
+        where_clauses.append(_TEXT_PREDICATES[mode])
+    elif mode == "words" and n_terms:
+        where_clauses.append(f"({' AND '.join(['text LIKE ?'] * n_terms)})")
+    elif mode == "regex" and n_terms:
+        # Required literals (all but the last term) are checked by LIKE in C
+        # first, so the Python REGEXP callback only sees likely matches
+        where_clauses.extend(["text LIKE ? ESCAPE '\\'"] * (n_terms - 1))
+        where_clauses.append(_TEXT_PREDICATES[mode])
+    elif n_terms and mode in _TEXT_PREDICATES:
+        where_clauses.append(_TEXT_PREDICATES[mode])
+    if n_tags:
+        where_clauses.append(tag_filter_sql(n_tags))
+    
+    query = "SELECT id, created, text, tags FROM POCKET_PICK"
+    if where_clauses:
+        query += f" WHERE {' AND '.join(where_clauses)}"
+    return query + " ORDER BY created DESC LIMIT ?"
+
+
+def _find_sql(mode: str, n_tags: int, n_terms: int) -> str:
+    """SQL for a query shape, built on first use and then reused"""
+    key = (mode, n_tags, n_terms)
+    query = _SQL_CACHE.get(key)
+    if query is None:
+        query = _SQL_CACHE.setdefault(key, _build_find_sql(mode, n_tags, n_terms))
+    return query
+
+
 def _traditional_find(command: FindCommand) -> List[PocketItem]:
     """Traditional search using existing SQLite FTS and fuzzy matching"""
     # Normalize tags
     normalized_tags = normalize_tags(command.tags) if command.tags else []
+    tag_params = tag_filter_params(normalized_tags) if normalized_tags else []
+    n_tags = len(tag_params) - 1 if tag_params else 0
+    
+    # Text parameters for the mode's predicate
+    text_params = []
+    if command.text:
+        if command.mode in ("substr", "glob"):
+            pattern = f"%{command.text}%" if command.mode == "substr" else command.text
+            trigram_query = _trigram_query(command.text, command.mode)
+            text_params = [trigram_query, pattern] if trigram_query else [pattern]
+        elif command.mode == "regex":
+            try:
+                compile_regex(command.text)
+            except re.error as e:
+                logger.warning(f"Invalid regex pattern {command.text!r}: {e}")
+                return []
+            text_params = [*map(_like_contains, _regex_literals(command.text)), command.text]
+        elif command.mode in ("fts", "exact"):
+            text_params = [command.text]
+    
+    query = _find_sql(command.mode, n_tags, len(text_params))
+    params = [*text_params, *tag_params, command.limit]
     
     # Use connection pool for better performance  
     with get_db_connection(command.db_path) as conn:
         try:
-            # Base query
-            query = "SELECT id, created, text, tags FROM POCKET_PICK"
-            params = []
-            where_clauses = []
-            
-            # Apply search mode
-            if command.text:
-                if command.mode == "substr":
-                    where_clauses.append("text LIKE ?")
-                    params.append(f"%{command.text}%")
-                elif command.mode == "fts":
-                    try:
-                        # First, try using FTS5 virtual table
-                        query = """
-                        SELECT POCKET_PICK.id, POCKET_PICK.created, POCKET_PICK.text, POCKET_PICK.tags 
-                        FROM pocket_pick_fts 
-                        JOIN POCKET_PICK ON pocket_pick_fts.rowid = POCKET_PICK.rowid
-                        """
-                        
-                        # FTS5 query syntax
-                        search_term = command.text
-                        
-                        # Set up FTS5 query parameters
-                        where_clauses = ["pocket_pick_fts MATCH ?"]
-                        params = [search_term]
-                        
-                        # Add tag filters if needed
-                        if normalized_tags:
-                            tag_clauses = []
-                            for tag in normalized_tags:
-                                tag_clauses.append("POCKET_PICK.tags LIKE ?")
-                                params.append(f"%\"{tag}\"%")
-                            where_clauses.append(f"({' AND '.join(tag_clauses)})")
-                        
-                        use_fts5 = True
-                        
-                    except sqlite3.OperationalError:
-                        # Fallback to basic LIKE-based search if FTS5 is not available
-                        logger.warning("FTS5 not available, falling back to basic search")
-                        use_fts5 = False
-                        
-                        # Standard fallback approach
-                        search_words = command.text.split()
-                        word_clauses = []
-                        for word in search_words:
-                            word_clauses.append("text LIKE ?")
-                            params.append(f"%{word}%")
-                        where_clauses.append(f"({' AND '.join(word_clauses)})")
-                        
-                elif command.mode == "glob":
-                    where_clauses.append("text GLOB ?")
-                    params.append(command.text)
-                elif command.mode == "regex":
-                    # We'll need to filter with regex after query
-                    pass
-                elif command.mode == "exact":
-                    where_clauses.append("text = ?")
-                    params.append(command.text)
-            
-            # Apply tag filter if tags are specified
-            if normalized_tags and command.mode != "fts":
-                # Find items that have all the specified tags
-                tag_clauses = []
-                for tag in normalized_tags:
-                    tag_clauses.append("tags LIKE ?")
-                    params.append(f"%\"{tag}\"%")
-                where_clauses.append(f"({' AND '.join(tag_clauses)})")
-            
-            # Handle query construction based on whether we're using FTS5
-            if command.mode == "fts" and 'use_fts5' in locals() and use_fts5:
-                # For FTS5, we've already constructed the base query
-                if where_clauses:
-                    query += f" WHERE {' AND '.join(where_clauses)}"
-                query += f" ORDER BY rank, created DESC LIMIT {command.limit}"
-                logger.debug(f"Using FTS5 query: {query}")
-            else:
-                # Standard query construction
-                if where_clauses:
-                    query += f" WHERE {' AND '.join(where_clauses)}"
-                query += f" ORDER BY created DESC LIMIT {command.limit}"
-            
             # Execute query
             try:
                 cursor = conn.execute(query, params)
             except sqlite3.OperationalError as e:
-                # If the FTS5 query fails, fall back to the basic query
-                if command.mode == "fts" and 'use_fts5' in locals() and use_fts5:
+                # If the FTS5 query fails (e.g. invalid MATCH syntax), fall
+                # back to requiring every word as a substring
+                if command.mode == "fts" and text_params:
                     logger.warning(f"FTS5 query failed: {e}. Falling back to basic search.")
-                    
-                    # Reset to base query
-                    query = "SELECT id, created, text, tags FROM POCKET_PICK"
-                    params = []
-                    
-                    # Standard fallback approach
-                    if command.text:
-                        search_words = command.text.split()
-                        word_clauses = []
-                        for word in search_words:
-                            word_clauses.append("text LIKE ?")
-                            params.append(f"%{word}%")
-                        query += f" WHERE ({' AND '.join(word_clauses)})"
-                        
-                        # Re-add tag filters if needed
-                        if normalized_tags:
-                            tag_clauses = []
-                            for tag in normalized_tags:
-                                tag_clauses.append("tags LIKE ?")
-                                params.append(f"%\"{tag}\"%")
-                            query += f" AND ({' AND '.join(tag_clauses)})"
-                    
-                    query += f" ORDER BY created DESC LIMIT {command.limit}"
+                    search_words = like_search_words(command.text)
+                    query = _find_sql("words", n_tags, len(search_words))
+                    params = [*(f"%{word}%" for word in search_words), *tag_params, command.limit]
+                    cursor = conn.execute(query, params)
+                elif command.mode in ("substr", "glob") and len(text_params) == 2:
+                    # Databases without the trigram index scan instead
+                    logger.warning(f"Trigram lookup failed: {e}. Falling back to a scan.")
+                    query = _find_sql(command.mode, n_tags, 1)
+                    params = [text_params[-1], *tag_params, command.limit]
                     cursor = conn.execute(query, params)
                 else:
                     # If it's not an FTS5 issue, re-raise the exception
@@ -208,14 +364,14 @@ def _traditional_find(command: FindCommand) -> List[PocketItem]:
             
             # Process results
             results = []
-            for row in cursor.fetchall():
+            for row in cursor:
                 id, created_str, text, tags_json = row
                 
                 # Parse the created timestamp
-                created = datetime.fromisoformat(created_str)
+                created = parse_created(created_str)
                 
                 # Parse the tags JSON
-                tags = json.loads(tags_json)
+                tags = deserialize_tags(tags_json)
                 
                 # Create item
                 item = PocketItem(
@@ -225,16 +381,6 @@ def _traditional_find(command: FindCommand) -> List[PocketItem]:
                     tags=tags
                 )
                 
-                # Apply regex filter if needed (we do this after the SQL query)
-                if command.mode == "regex" and command.text:
-                    try:
-                        pattern = re.compile(command.text, re.IGNORECASE)
-                        if not pattern.search(text):
-                            continue
-                    except re.error:
-                        logger.warning(f"Invalid regex pattern: {command.text}")
-                        continue
-                
                 results.append(item)
             
             return results
@@ -1,13 +1,15 @@
 import sqlite3
-import json
-from datetime import datetime
 import logging
-from typing import Optional
-from ..data_types import GetCommand, PocketItem
-from ..init_db import init_db
+from typing import List, Optional
+from ..data_types import GetCommand, GetManyCommand, PocketItem
+from ..init_db import deserialize_tags, parse_created
+from ..connection_pool import get_db_connection
 
 logger = logging.getLogger(__name__)
 
+# Bound parameters allowed per statement (SQLITE_MAX_VARIABLE_NUMBER default)
+MAX_IDS_PER_QUERY = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
 def get(command: GetCommand) -> Optional[PocketItem]:
     """
     Get an item from the pocket pick database by ID
@@ -18,41 +20,75 @@ def get(command: GetCommand) -> Optional[PocketItem]:
     Returns:
         Optional[PocketItem]: The item if found, None otherwise
     """
-    # Connect to database
-    db = init_db(command.db_path)
+    # Use connection pool for better performance
+    with get_db_connection(command.db_path) as db:
+        try:
+            # Query for item with given ID
+            cursor = db.execute(
+                "SELECT id, created, text, tags FROM POCKET_PICK WHERE id = ?",
+                (command.id,)
+            )
+            
+            # Fetch the row
+            row = cursor.fetchone()
+            
+            # If no row was found, return None
+            if row is None:
+                return None
+            
+            # Process the row
+            id, created_str, text, tags_json = row
+            
+            # Parse the created timestamp
+            created = parse_created(created_str)
+            
+            # Parse the tags JSON
+            tags = deserialize_tags(tags_json)
+            
+            # Create and return the item
+            return PocketItem(
+                id=id,
+                created=created,
+                text=text,
+                tags=tags
+            )
+        except Exception as e:
+            logger.error(f"Error getting item {command.id}: {e}")
+            raise
+
+def get_many(command: GetManyCommand) -> List[PocketItem]:
+    """
+    Get several items from the pocket pick database by ID in one query
     
-    try:
-        # Query for item with given ID
-        cursor = db.execute(
-            "SELECT id, created, text, tags FROM POCKET_PICK WHERE id = ?",
-            (command.id,)
-        )
-        
-        # Fetch the row
-        row = cursor.fetchone()
-        
-        # If no row was found, return None
-        if row is None:
-            return None
-        
-        # Process the row
-        id, created_str, text, tags_json = row
-        
-        # Parse the created timestamp
-        created = datetime.fromisoformat(created_str)
-        
-        # Parse the tags JSON
-        tags = json.loads(tags_json)
+    Args:
+        command: GetManyCommand with the item IDs
         
-        # Create and return the item
-        return PocketItem(
-            id=id,
-            created=created,
-            text=text,
-            tags=tags
-        )
-    except Exception as e:
-        logger.error(f"Error getting item {command.id}: {e}")
-        raise
-    finally:
-        db.close()
\ No newline at end of file
+    Returns:
+        List[PocketItem]: The items found, in the requested order
+    """
+    unique_ids = list(dict.fromkeys(command.ids))
+    items = {}
+    
+    with get_db_connection(command.db_path) as db:
+        try:
+            # Chunk so no statement exceeds SQLite's bound-parameter limit
+            for start in range(0, len(unique_ids), MAX_IDS_PER_QUERY):
+                chunk = unique_ids[start:start + MAX_IDS_PER_QUERY]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = db.execute(
+                    f"SELECT id, created, text, tags FROM POCKET_PICK WHERE id IN ({placeholders})",
+                    chunk
+                )
+                for id, created_str, text, tags_json in cursor:
+                    items[id] = PocketItem(
+                        id=id,
+                        created=parse_created(created_str),
+                        text=text,
+                        tags=deserialize_tags(tags_json)
+                    )
+        except Exception as e:
+            logger.error(f"Error getting {len(unique_ids)} items: {e}")
+            raise
+    
+    # Missing IDs are skipped; the rest keep the caller's order
+    return [items[id] for id in command.ids if id in items]
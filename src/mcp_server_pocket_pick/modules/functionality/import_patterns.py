@@ -7,7 +7,8 @@ from pathlib import Path
 from typing import List, Dict, Any
 
 from ..data_types import ImportPatternsCommand, PocketItem
-from ..init_db import init_db, normalize_tags
+from ..init_db import normalize_tags, serialize_tags, insert_items
+from ..connection_pool import get_db_connection
 
 logger = logging.getLogger(__name__)
 
@@ -37,10 +38,9 @@ def import_patterns(command: ImportPatternsCommand) -> List[PocketItem]:
     descriptions = load_json(command.descriptions_path).get("patterns", [])
     extracts = load_json(command.extracts_path)
     
-    # Connect to database
-    db = init_db(command.db_path)
-    
     imported_items = []
+    rows = []
+    tags_json_cache = {}
     
     try:
         for entry in descriptions:
@@ -69,10 +69,9 @@ def import_patterns(command: ImportPatternsCommand) -> List[PocketItem]:
                        if k not in ["patternName", "description", "tags"]}
             
             if metadata:
-                metadata_text = "\n## Additional Metadata\n"
-                for key, value in metadata.items():
-                    metadata_text += f"- **{key}**: {value}\n"
-                text_parts.append(metadata_text)
+                meta_lines = ["\n## Additional Metadata\n"]
+                meta_lines.extend(f"- **{key}**: {value}\n" for key, value in metadata.items())
+                text_parts.append("".join(meta_lines))
             
             # Combine all sections
             full_text = "\n".join(text_parts)
@@ -81,14 +80,14 @@ def import_patterns(command: ImportPatternsCommand) -> List[PocketItem]:
             item_id = str(uuid.uuid4())
             timestamp = datetime.now()
             
-            # Serialize tags to JSON
-            tags_json = json.dumps(normalized_tags)
+            # Serialize tags to JSON once per distinct tag set
+            tags_key = tuple(normalized_tags)
+            tags_json = tags_json_cache.get(tags_key)
+            if tags_json is None:
+                tags_json = tags_json_cache[tags_key] = serialize_tags(normalized_tags)
             
-            # Insert item into database
-            db.execute(
-                "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
-                (item_id, timestamp.isoformat(), full_text, tags_json)
-            )
+            # Queue the row; all rows are inserted together below
+            rows.append((item_id, timestamp.isoformat(), full_text, tags_json))
             
             # Create PocketItem for return
             item = PocketItem(
@@ -99,15 +98,20 @@ def import_patterns(command: ImportPatternsCommand) -> List[PocketItem]:
             )
             
             imported_items.append(item)
-            logger.info(f"Imported pattern: {name} with ID: {item_id}")
+            logger.debug(f"Prepared pattern: {name} with ID: {item_id}")
         
-        # Commit transaction
-        db.commit()
+        # Insert every row in one write transaction on a pooled connection
+        with get_db_connection(command.db_path) as db:
+            db.execute("BEGIN IMMEDIATE")
+            insert_items(db, rows)
+            db.commit()
+            logger.info(f"Imported {len(rows)} patterns")
+            
+            # Refresh planner statistics for the tables the bulk load changed
+            db.execute("PRAGMA optimize")
         
         return imported_items
     except Exception as e:
+        # The pool rolls back a failed write before reusing the connection
         logger.error(f"Error importing patterns: {e}")
-        db.rollback()
         raise
-    finally:
-        db.close()
\ No newline at end of file
@@ -7,24 +7,74 @@ and provides functions to build and query a pattern index.
 """
 
 import os
+import re
+import codecs
 import json
+import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
-from pydantic import BaseModel, Field
-from thefuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+# orjson reads and writes the index file several times faster when installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# ijson streams the descriptions file instead of parsing it whole when installed
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
-class PatternMetadata(BaseModel):
-    """Metadata for a pattern including its location and key attributes"""
+# Bytes read from the head of system.md for title and summary extraction
+METADATA_READ_BYTES = 2048
+
+# The first "# " heading line and the paragraph after it. Blank lines between
+# them are skipped; the paragraph ends at a blank line or a "#" line. Lines may
+# be indented, matching the str.strip() the fields get
+_TITLE_SUMMARY_RE = re.compile(
+    r"^[^\S\n]*# [^\S\n]*(\S[^\n]*?)[^\S\n]*$"
+    r"(?:\n[^\S\n]*$)*"
+    r"(?:\n([^\S\n]*[^#\s][^\n]*(?:\n[^\S\n]*[^#\s][^\n]*)*))?",
+    re.MULTILINE,
+)
+
+@dataclass(slots=True, kw_only=True)
+class PatternMetadata:
+    """Metadata for a pattern including its location and key attributes
+    
+    A plain slotted dataclass: the index builds and loads one per pattern, and
+    every field comes from our own files, so there is nothing to validate.
+    """
     slug: str
     title: str
     summary: Optional[str] = None
-    tags: List[str] = Field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
     full_path: Path
     system_md_path: Optional[Path] = None
     user_md_path: Optional[Path] = None
+    # Lowercased copies of the searchable fields, filled in once when the
+    # object is built so find_in_index doesn't redo them on every query
+    slug_lc: str = field(init=False, repr=False, compare=False)
+    title_lc: str = field(init=False, repr=False, compare=False)
+    summary_lc: Optional[str] = field(init=False, repr=False, compare=False)
+    tags_lc: List[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.slug_lc = self.slug.lower()
+        self.title_lc = self.title.lower() if self.title else ""
+        self.summary_lc = self.summary.lower() if self.summary else None
+        self.tags_lc = [tag.lower() for tag in self.tags]
 
 def extract_metadata_from_markdown(file_path: Path) -> Dict[str, Any]:
     """
@@ -44,54 +94,83 @@ def extract_metadata_from_markdown(file_path: Path) -> Dict[str, Any]:
     }
 
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read(2000)  # Read first 2000 chars for metadata extraction
-
-            # Extract title from heading
-            lines = content.split("\n")
-            for line in lines:
-                line = line.strip()
-                if line.startswith("# "):
-                    metadata["title"] = line[2:].strip()
-                    break
-
-            # If no title found, use filename
-            if not metadata["title"]:
-                metadata["title"] = file_path.stem.replace("_", " ").title()
-
-            # Try to extract summary from the first paragraph after title
-            in_summary = False
-            summary_lines = []
-
-            for line in lines:
-                line = line.strip()
-                if line.startswith("# ") and not in_summary:
-                    in_summary = True
-                    continue
-                elif in_summary and line and not line.startswith("#"):
-                    summary_lines.append(line)
-                elif in_summary and line.startswith("#"):
-                    break
-                elif in_summary and summary_lines and not line:
-                    break
-
-            if summary_lines:
-                metadata["summary"] = " ".join(summary_lines)
-
-            # Removed tag extraction logic from here
-            # # Try to extract tags from content
-            # for line in lines:
-            #     if "tags:" in line.lower() or "keywords:" in line.lower():
-            #         tag_part = line.split(":", 1)[1].strip()
-            #         tags = [t.strip() for t in tag_part.split(",")]
-            #         metadata["tags"] = [t for t in tags if t]
-            #         break
+        # Only the head of the file is needed; read it in one syscall and
+        # decode once, dropping a character cut off at the boundary
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            raw = os.read(fd, METADATA_READ_BYTES)
+        finally:
+            os.close(fd)
+        content = codecs.getincrementaldecoder("utf-8")().decode(raw)
+
+        # Title and summary come from the first "# " heading in one scan
+        match = _TITLE_SUMMARY_RE.search(content)
+        if match:
+            metadata["title"] = match.group(1)
+            if match.group(2):
+                metadata["summary"] = " ".join(line.strip() for line in match.group(2).split("\n"))
+
+        # If no title found, use filename
+        if not metadata["title"]:
+            metadata["title"] = file_path.stem.replace("_", " ").title()
+
+        # Removed tag extraction logic from here
+        # # Try to extract tags from content
+        # for line in lines:
+        #     if "tags:" in line.lower() or "keywords:" in line.lower():
+        #         tag_part = line.split(":", 1)[1].strip()
+        #         tags = [t.strip() for t in tag_part.split(",")]
+        #         metadata["tags"] = [t for t in tags if t]
+        #         break
 
     except Exception as e:
         logger.warning(f"Error extracting metadata from {file_path}: {e}")
 
     return metadata
 
+def _index_pattern_dir(pattern_dir: Path, descriptions_lookup: Dict[str, Any]) -> Optional[PatternMetadata]:
+    """
+    Build the index entry for one pattern directory.
+
+    Args:
+        pattern_dir: A directory directly under the patterns root
+        descriptions_lookup: Pattern descriptions keyed by pattern name
+
+    Returns:
+        PatternMetadata, or None if the entry is not a pattern directory
+    """
+    if not pattern_dir.is_dir():
+        return None
+    
+    slug = pattern_dir.name
+    
+    # Check for system.md (primary content file)
+    system_md_path = pattern_dir / "system.md"
+    user_md_path = pattern_dir / "user.md"
+    
+    # Skip directories without system.md
+    if not system_md_path.exists():
+        logger.debug(f"Skipping {slug}: No system.md found")
+        return None
+    
+    # Extract metadata from system.md
+    metadata = extract_metadata_from_markdown(system_md_path)
+    
+    # Get tags from the loaded descriptions
+    pattern_desc_data = descriptions_lookup.get(slug, {})
+    tags = pattern_desc_data.get("tags", [])
+
+    # Create pattern metadata entry
+    return PatternMetadata(
+        slug=slug,
+        title=metadata["title"] or slug.replace("_", " ").title(),
+        summary=metadata["summary"],
+        tags=tags, # Assign tags from descriptions file
+        full_path=pattern_dir,
+        system_md_path=system_md_path,
+        user_md_path=user_md_path if user_md_path.exists() else None
+    )
+
 def index_patterns(base_path: str = "./patterns", descriptions_file: str = "./pattern_descriptions.json") -> Dict[str, PatternMetadata]:
     """
     Walks folders under base_path, reads system.md, gets tags from descriptions file,
@@ -113,13 +192,15 @@ def index_patterns(base_path: str = "./patterns", descriptions_file: str = "./pa
     # Load pattern descriptions for tag lookup
     if descriptions_path.exists():
         try:
-            with open(descriptions_path, "r", encoding="utf-8") as f:
-                loaded_descriptions = json.load(f)
-                descriptions_lookup = {
-                    item['patternName']: item 
-                    for item in loaded_descriptions.get('patterns', []) 
-                    if 'patternName' in item
-                }
+            with open(descriptions_path, "rb") as f:
+                if IJSON_AVAILABLE:
+                    # Stream one pattern record at a time
+                    descriptions = ijson.items(f, "patterns.item")
+                else:
+                    descriptions = json.load(f).get('patterns', [])
+                for item in descriptions:
+                    if 'patternName' in item:
+                        descriptions_lookup[item['patternName']] = item
             logger.info(f"Loaded {len(descriptions_lookup)} descriptions from {descriptions_path}")
         except Exception as e:
             logger.error(f"Error loading or parsing {descriptions_path}: {e}. Tags will not be indexed.")
@@ -131,43 +212,16 @@ def index_patterns(base_path: str = "./patterns", descriptions_file: str = "./pa
         return {}
     
     try:
-        # Walk through immediate subdirectories of base_path
-        for item in base_path.iterdir():
-            if not item.is_dir():
-                continue
-            
-            slug = item.name
-            pattern_dir = item
-            
-            # Check for system.md (primary content file)
-            system_md_path = pattern_dir / "system.md"
-            user_md_path = pattern_dir / "user.md"
-            
-            # Skip directories without system.md
-            if not system_md_path.exists():
-                logger.debug(f"Skipping {slug}: No system.md found")
-                continue
-            
-            # Extract metadata from system.md
-            metadata = extract_metadata_from_markdown(system_md_path)
-            
-            # Get tags from the loaded descriptions
-            pattern_desc_data = descriptions_lookup.get(slug, {})
-            tags = pattern_desc_data.get("tags", [])
-
-            # Create pattern metadata entry
-            pattern_meta = PatternMetadata(
-                slug=slug,
-                title=metadata["title"] or slug.replace("_", " ").title(),
-                summary=metadata["summary"],
-                tags=tags, # Assign tags from descriptions file
-                full_path=pattern_dir,
-                system_md_path=system_md_path if system_md_path.exists() else None,
-                user_md_path=user_md_path if user_md_path.exists() else None
-            )
-            
-            index[slug] = pattern_meta
-            logger.debug(f"Indexed pattern: {slug}")
+        # Walk through immediate subdirectories of base_path; each one is
+        # stat'ed, read and parsed on a worker thread, in directory order
+        pattern_dirs = list(base_path.iterdir())
+        with ThreadPoolExecutor(thread_name_prefix="pattern-index") as executor:
+            for pattern_meta in executor.map(
+                lambda pattern_dir: _index_pattern_dir(pattern_dir, descriptions_lookup), pattern_dirs
+            ):
+                if pattern_meta is not None:
+                    index[pattern_meta.slug] = pattern_meta
+                    logger.debug(f"Indexed pattern: {pattern_meta.slug}")
     
     except Exception as e:
         logger.error(f"Error indexing patterns: {e}")
@@ -203,9 +257,12 @@ def save_index_to_file(index: Dict[str, PatternMetadata], output_path: Path) ->
         # Ensure directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write to file
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(serializable_index, f, indent=2)
+        # Write compact JSON; the file is a cache, not meant for reading
+        if ORJSON_AVAILABLE:
+            payload = orjson.dumps(serializable_index)
+        else:
+            payload = json.dumps(serializable_index, separators=(",", ":")).encode("utf-8")
+        output_path.write_bytes(payload)
         
         logger.info(f"Pattern index saved to {output_path}")
         return True
@@ -229,8 +286,8 @@ def load_index_from_file(input_path: Path) -> Dict[str, PatternMetadata]:
             logger.warning(f"Index file {input_path} does not exist")
             return {}
         
-        with open(input_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        raw = input_path.read_bytes()
+        data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
         
         # Convert back to PatternMetadata objects
         index = {}
@@ -252,6 +309,17 @@ def load_index_from_file(input_path: Path) -> Dict[str, PatternMetadata]:
         logger.error(f"Error loading pattern index: {e}")
         return {}
 
+@functools.lru_cache(maxsize=8)
+def _load_index_cached(index_path: str, mtime_ns: int, size: int) -> Dict[str, PatternMetadata]:
+    """
+    Load an index file once per on-disk version.
+    
+    The file's mtime and size are part of the key, so a rewritten index is
+    loaded again while repeated calls share the parsed dict (treat it as
+    read-only).
+    """
+    return load_index_from_file(Path(index_path))
+
 def get_index(base_path: str = "./patterns", index_path: Optional[Path] = None, force_rebuild: bool = False) -> Dict[str, PatternMetadata]:
     """
     Get a pattern index, loading from cache if available or rebuilding if necessary.
@@ -271,10 +339,15 @@ def get_index(base_path: str = "./patterns", index_path: Optional[Path] = None,
         index_path = data_dir / "pattern_index.json"
     
     # Load from cache if available and not forcing rebuild
-    if index_path.exists() and not force_rebuild:
-        index = load_index_from_file(index_path)
-        if index:
-            return index
+    if not force_rebuild:
+        try:
+            stat = index_path.stat()
+        except FileNotFoundError:
+            stat = None
+        if stat is not None:
+            index = _load_index_cached(str(index_path.resolve()), stat.st_mtime_ns, stat.st_size)
+            if index:
+                return index
     
     # Build index and save to cache
     index = index_patterns(base_path)
@@ -283,7 +356,26 @@ def get_index(base_path: str = "./patterns", index_path: Optional[Path] = None,
     
     return index
 
-def find_in_index(query: str, index: Dict[str, PatternMetadata], fuzzy_threshold: int = 65) -> List[Tuple[int, PatternMetadata]]:
+# thefuzz's token_set_ratio preprocessing: drop Latin-1 characters, then
+# keep lowercased letters and digits
+_LATIN1 = {i: None for i in range(128, 256)}
+
+def _full_process(s: str) -> str:
+    return default_process(s.translate(_LATIN1))
+
+def _raise_scores(query: str, choices: List[str], owners: List[int], best: np.ndarray,
+                  scorer, score_cutoff: float, processor=None) -> None:
+    """Score every choice in one rapidfuzz call and keep each owner's maximum"""
+    if not choices:
+        return
+    scores = process.cdist([query], choices, scorer=scorer, processor=processor,
+                           score_cutoff=score_cutoff, dtype=np.float64)[0]
+    # Rounded as thefuzz did, so thresholds and ties are unchanged; an owner
+    # can appear several times (one per tag), which maximum.at handles
+    np.maximum.at(best, owners, np.rint(scores).astype(best.dtype))
+
+def find_in_index(query: str, index: Dict[str, PatternMetadata], fuzzy_threshold: int = 65,
+                  limit: Optional[int] = None) -> List[Tuple[int, PatternMetadata]]:
     """
     Search for patterns in the index using fuzzy matching.
 
@@ -291,46 +383,77 @@ def find_in_index(query: str, index: Dict[str, PatternMetadata], fuzzy_threshold
         query: Search query (can be slug, title, or tag)
         index: Pattern index to search in
         fuzzy_threshold: Minimum score (0-100) to include in results
+        limit: Maximum number of results; with 1, an exact slug match
+            (ignoring case) is returned without fuzzy scoring
 
     Returns:
         List of (score, metadata) tuples sorted by score (highest first)
     """
-    results = []
     query_lower = query.lower()
 
-    for slug, metadata in index.items():
-        scores = []
-
-        # Score against slug
-        scores.append(fuzz.partial_ratio(query_lower, slug.lower()))
-        scores.append(fuzz.token_set_ratio(query_lower, slug.lower()))
-
-        # Score against title
-        if metadata.title:
-            scores.append(fuzz.partial_ratio(query_lower, metadata.title.lower()))
-            scores.append(fuzz.token_set_ratio(query_lower, metadata.title.lower()))
-
-        # Score against summary
-        if metadata.summary:
-            scores.append(fuzz.partial_ratio(query_lower, metadata.summary.lower()))
-            # token_set_ratio can be slow on long summaries, consider omitting or adjusting
-            # scores.append(fuzz.token_set_ratio(query_lower, metadata.summary.lower())) 
-
-        # Score against individual tags
-        if metadata.tags:
-            for tag in metadata.tags:
-                scores.append(fuzz.ratio(query_lower, tag.lower())) # Exact tag match bonus
-                scores.append(fuzz.token_set_ratio(query_lower, tag.lower()))
-        
-        # Use the maximum score achieved across all fields
-        max_score = max(scores) if scores else 0
-
-        # Only include if score meets threshold
-        if max_score >= fuzzy_threshold:
-            results.append((max_score, metadata))
-
-    # Sort by score (highest first)
-    return sorted(results, key=lambda x: x[0], reverse=True)
+    # Direct slug access is the common single-result lookup
+    if limit == 1:
+        exact = index.get(query) or next(
+            (metadata for metadata in index.values() if metadata.slug_lc == query_lower), None
+        )
+        if exact is not None:
+            return [(100, exact)]
+
+    entries = list(index.values())
+    best = np.zeros(len(entries), dtype=np.int16)
+    # Scores that cannot round up to the threshold are dropped inside rapidfuzz
+    cutoff = max(fuzzy_threshold - 0.5, 0)
+
+    # Parallel lists of searchable fields; owners map each back to its entry
+    slugs = [metadata.slug_lc for metadata in entries]
+    slug_owners = list(range(len(entries)))
+    titled = [i for i, metadata in enumerate(entries) if metadata.title_lc]
+    titles = [entries[i].title_lc for i in titled]
+    summarized = [i for i, metadata in enumerate(entries) if metadata.summary_lc]
+    summaries = [entries[i].summary_lc for i in summarized]
+    tag_owners = [i for i, metadata in enumerate(entries) for _ in metadata.tags_lc]
+    tags = [tag for metadata in entries for tag in metadata.tags_lc]
+
+    # Score against slug
+    _raise_scores(query_lower, slugs, slug_owners, best, fuzz.partial_ratio, cutoff)
+    _raise_scores(query_lower, slugs, slug_owners, best, fuzz.token_set_ratio, cutoff, _full_process)
+
+    # Score against title
+    _raise_scores(query_lower, titles, titled, best, fuzz.partial_ratio, cutoff)
+    _raise_scores(query_lower, titles, titled, best, fuzz.token_set_ratio, cutoff, _full_process)
+
+    # Score against summary; token_set_ratio is too slow on long summaries
+    _raise_scores(query_lower, summaries, summarized, best, fuzz.partial_ratio, cutoff)
+
+    # Score against individual tags
+    _raise_scores(query_lower, tags, tag_owners, best, fuzz.ratio, cutoff)  # Exact tag match bonus
+    _raise_scores(query_lower, tags, tag_owners, best, fuzz.token_set_ratio, cutoff, _full_process)
+
+    # Only include if the best score across all fields meets the threshold
+    matched = np.flatnonzero(best >= fuzzy_threshold)
+
+    # Sort by score (highest first); stable, so ties keep index order
+    matched = matched[np.argsort(-best[matched], kind="stable")][:limit]
+    return [(int(best[i]), entries[i]) for i in matched]
+
+@functools.lru_cache(maxsize=512)
+def _read_pattern_file(path: str, mtime_ns: int, size: int) -> str:
+    """Read a pattern file once per on-disk version; edits change the key"""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def _load_pattern_file(path: str) -> Optional[str]:
+    """Load a pattern file, reusing the cached read while it is unchanged"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    
+    try:
+        return _read_pattern_file(path, stat.st_mtime_ns, stat.st_size)
+    except Exception as e:
+        logger.error(f"Error loading pattern content: {e}")
+        return None
 
 def slug_to_content(slug: str, base_path: str = "./patterns") -> Optional[str]:
     """
@@ -343,16 +466,24 @@ def slug_to_content(slug: str, base_path: str = "./patterns") -> Optional[str]:
     Returns:
         str: The pattern content, or None if not found
     """
-    pattern_path = Path(base_path) / slug / "system.md"
-    if not pattern_path.exists():
-        return None
+    return _load_pattern_file(os.path.join(base_path, slug, "system.md"))
+
+def metadata_to_content(metadata: PatternMetadata) -> Optional[str]:
+    """
+    Load a pattern's system.md content from its index entry.
     
-    try:
-        with open(pattern_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except Exception as e:
-        logger.error(f"Error loading pattern content: {e}")
+    Uses the system.md path stored in the index, so callers that already
+    hold the metadata don't rebuild the path from the slug.
+    
+    Args:
+        metadata: The pattern's index entry
+        
+    Returns:
+        str: The pattern content, or None if not found
+    """
+    if metadata.system_md_path is None:
         return None
+    return _load_pattern_file(str(metadata.system_md_path))
 
 def resolve_slug(slug_or_query: str, base_path: str = "./patterns") -> Optional[Tuple[str, str]]:
     """
@@ -371,18 +502,18 @@ def resolve_slug(slug_or_query: str, base_path: str = "./patterns") -> Optional[
     
     # Try exact match first (still useful for direct slug access)
     if slug_or_query in index:
-        content = slug_to_content(slug_or_query, base_path)
+        content = metadata_to_content(index[slug_or_query])
         if content:
             # Return perfect score for direct match
             # Note: This function returns slug/content, not score. 
             # The search function uses find_in_index which now returns fuzzy scores.
             return (slug_or_query, content)
     
-    # Try fuzzy search using the updated find_in_index
-    results = find_in_index(slug_or_query, index) # Now uses fuzzy matching
+    # Try a slug match ignoring case, then fuzzy search
+    results = find_in_index(slug_or_query, index, limit=1) # Now uses fuzzy matching
     if results:
         top_match_score, top_match_metadata = results[0]
-        content = slug_to_content(top_match_metadata.slug, base_path)
+        content = metadata_to_content(top_match_metadata)
         if content:
             return (top_match_metadata.slug, content)
     
@@ -401,5 +532,5 @@ def get_similar_slugs(query: str, base_path: str = "./patterns", limit: int = 5)
         List of similar slugs
     """
     index = get_index(base_path)
-    results = find_in_index(query, index) # Now uses fuzzy matching
-    return [result[1].slug for result in results[:limit]]
\ No newline at end of file
+    results = find_in_index(query, index, limit=limit) # Now uses fuzzy matching
+    return [result[1].slug for result in results]
\ No newline at end of file
@@ -1,10 +1,9 @@
 import sqlite3
-import json
-from datetime import datetime
 from typing import List
 import logging
 from ..data_types import ListCommand, PocketItem
-from ..init_db import init_db, normalize_tags
+from ..init_db import normalize_tags, deserialize_tags, parse_created, tag_filter_clause
+from ..connection_pool import get_db_connection
 
 logger = logging.getLogger(__name__)
 
@@ -21,55 +20,48 @@ def list_items(command: ListCommand) -> List[PocketItem]:
     # Normalize tags
     normalized_tags = normalize_tags(command.tags) if command.tags else []
     
-    # Connect to database
-    db = init_db(command.db_path)
-    
-    try:
-        # Base query
-        query = "SELECT id, created, text, tags FROM POCKET_PICK"
-        params = []
-        
-        # Apply tag filter if tags are specified
-        if normalized_tags:
-            # We need to check if each tag exists in the JSON array
-            tag_clauses = []
-            for tag in normalized_tags:
-                tag_clauses.append("tags LIKE ?")
-                # Use JSON substring matching, looking for the tag surrounded by quotes and commas or brackets
-                params.append(f"%\"{tag}\"%")
+    # Use connection pool for better performance
+    with get_db_connection(command.db_path) as db:
+        try:
+            # Base query
+            query = "SELECT id, created, text, tags FROM POCKET_PICK"
+            params = []
             
-            query += f" WHERE {' AND '.join(tag_clauses)}"
-        
-        # Apply order and limit
-        query += f" ORDER BY created DESC LIMIT {command.limit}"
-        
-        # Execute query
-        cursor = db.execute(query, params)
-        
-        # Process results
-        results = []
-        for row in cursor.fetchall():
-            id, created_str, text, tags_json = row
+            # Apply tag filter if tags are specified
+            if normalized_tags:
+                tag_clause, tag_params = tag_filter_clause(normalized_tags)
+                query += f" WHERE {tag_clause}"
+                params.extend(tag_params)
             
-            # Parse the created timestamp
-            created = datetime.fromisoformat(created_str)
+            # Apply order and limit
+            query += " ORDER BY created DESC LIMIT ?"
+            params.append(command.limit)
             
-            # Parse the tags JSON
-            tags = json.loads(tags_json)
+            # Execute query
+            cursor = db.execute(query, params)
             
-            # Create item
-            item = PocketItem(
-                id=id,
-                created=created,
-                text=text,
-                tags=tags
-            )
+            # Process results
+            results = []
+            for row in cursor:
+                id, created_str, text, tags_json = row
+                
+                # Parse the created timestamp
+                created = parse_created(created_str)
+                
+                # Parse the tags JSON
+                tags = deserialize_tags(tags_json)
+                
+                # Create item
+                item = PocketItem(
+                    id=id,
+                    created=created,
+                    text=text,
+                    tags=tags
+                )
+                
+                results.append(item)
             
-            results.append(item)
-        
-        return results
-    except Exception as e:
-        logger.error(f"Error listing items: {e}")
-        raise
-    finally:
-        db.close()
\ No newline at end of file
+            return results
+        except Exception as e:
+            logger.error(f"Error listing items: {e}")
+            raise
\ No newline at end of file
@@ -1,9 +1,8 @@
 import sqlite3
-import json
 from typing import List, Dict
 import logging
 from ..data_types import ListTagsCommand
-from ..init_db import init_db
+from ..connection_pool import get_db_connection
 
 logger = logging.getLogger(__name__)
 
@@ -17,32 +16,25 @@ def list_tags(command: ListTagsCommand) -> List[Dict[str, int]]:
     Returns:
         List[Dict[str, int]]: List of dicts with tag name and count
     """
-    # Connect to database
-    db = init_db(command.db_path)
-    
-    try:
-        # Get all tags with their counts
-        cursor = db.execute("SELECT tags FROM POCKET_PICK")
-        
-        # Process results to count tags
-        tag_counts = {}
-        for (tags_json,) in cursor.fetchall():
-            tags = json.loads(tags_json)
-            for tag in tags:
-                if tag in tag_counts:
-                    tag_counts[tag] += 1
-                else:
-                    tag_counts[tag] = 1
-        
-        # Sort by count (descending) and then alphabetically
-        sorted_tags = sorted(tag_counts.items(), key=lambda x: (-x[1], x[0]))
-        
-        # Apply limit and format result
-        result = [{"tag": tag, "count": count} for tag, count in sorted_tags[:command.limit]]
-        
-        return result
-    except Exception as e:
-        logger.error(f"Error listing tags: {e}")
-        raise
-    finally:
-        db.close()
\ No newline at end of file
+    # Use connection pool for better performance
+    with get_db_connection(command.db_path) as db:
+        try:
+            # Count items per tag from the normalized tag table; its primary
+            # key is ordered by tag, so grouping needs no separate sort
+            cursor = db.execute(
+                """
+                SELECT tag, COUNT(*) AS count FROM POCKET_PICK_TAGS
+                GROUP BY tag
+                ORDER BY count DESC, tag
+                LIMIT ?
+                """,
+                (command.limit,)
+            )
+            
+            # Format result
+            result = [{"tag": tag, "count": count} for tag, count in cursor]
+            
+            return result
+        except Exception as e:
+            logger.error(f"Error listing tags: {e}")
+            raise
\ No newline at end of file
@@ -1,7 +1,8 @@
 import sqlite3
 import logging
-from ..data_types import RemoveCommand
-from ..init_db import init_db
+from ..data_types import RemoveCommand, RemoveManyCommand
+from ..connection_pool import get_db_connection
+from .get import MAX_IDS_PER_QUERY
 
 logger = logging.getLogger(__name__)
 
@@ -15,20 +16,46 @@ def remove(command: RemoveCommand) -> bool:
     Returns:
         bool: True if an item was removed, False if no matching item was found
     """
-    # Connect to database
-    db = init_db(command.db_path)
+    # Use connection pool for better performance
+    with get_db_connection(command.db_path) as db:
+        try:
+            # Delete item with given ID
+            cursor = db.execute("DELETE FROM POCKET_PICK WHERE id = ?", (command.id,))
+            
+            # Commit the transaction
+            db.commit()
+            
+            # Check if any row was affected
+            return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error removing item {command.id}: {e}")
+            raise
+
+def remove_many(command: RemoveManyCommand) -> int:
+    """
+    Remove several items from the pocket pick database by ID in one transaction
     
-    try:
-        # Delete item with given ID
-        cursor = db.execute("DELETE FROM POCKET_PICK WHERE id = ?", (command.id,))
-        
-        # Commit the transaction
-        db.commit()
+    Args:
+        command: RemoveManyCommand with the item IDs
         
-        # Check if any row was affected
-        return cursor.rowcount > 0
-    except Exception as e:
-        logger.error(f"Error removing item {command.id}: {e}")
-        raise
-    finally:
-        db.close()
\ No newline at end of file
+    Returns:
+        int: The number of items removed
+    """
+    unique_ids = list(dict.fromkeys(command.ids))
+    removed = 0
+    
+    with get_db_connection(command.db_path) as db:
+        try:
+            # Chunk so no statement exceeds SQLite's bound-parameter limit
+            for start in range(0, len(unique_ids), MAX_IDS_PER_QUERY):
+                chunk = unique_ids[start:start + MAX_IDS_PER_QUERY]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = db.execute(f"DELETE FROM POCKET_PICK WHERE id IN ({placeholders})", chunk)
+                removed += cursor.rowcount
+            
+            # Commit every chunk together
+            db.commit()
+            return removed
+        except Exception as e:
+            logger.error(f"Error removing {len(unique_ids)} items: {e}")
+            raise
@@ -6,16 +6,20 @@ the slug-based index to provide fast and intuitive pattern lookup.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 from pathlib import Path
 
 from ..data_types import PatternSearchCommand, PatternItem, GetPatternCommand
 from .index_patterns import (
-    get_index, find_in_index, slug_to_content, resolve_slug, get_similar_slugs
+    get_index, find_in_index, metadata_to_content, resolve_slug, get_similar_slugs
 )
 
 logger = logging.getLogger(__name__)
 
+# Reads the pattern files of a result page concurrently
+_READ_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="pattern-read")
+
 def search_patterns(command: PatternSearchCommand) -> List[PatternItem]:
     """
     Search for patterns matching the query.
@@ -32,16 +36,18 @@ def search_patterns(command: PatternSearchCommand) -> List[PatternItem]:
     index = get_index(str(command.patterns_path))
     
     # Search in index
-    results = find_in_index(command.query, index, command.fuzzy)
+    results = find_in_index(command.query, index, command.fuzzy, limit=command.limit)
     
-    # Limit results
-    results = results[:command.limit]
+    # Load pattern contents, overlapping the reads when there are several
+    entries = [metadata for _, metadata in results]
+    if len(entries) > 1:
+        contents = list(_READ_EXECUTOR.map(metadata_to_content, entries))
+    else:
+        contents = [metadata_to_content(metadata) for metadata in entries]
     
     # Convert to PatternItem objects
     pattern_items = []
-    for score, metadata in results:
-        # Load pattern content
-        content = slug_to_content(metadata.slug, str(command.patterns_path))
+    for (score, metadata), content in zip(results, contents):
         if content:
             pattern_item = PatternItem(
                 slug=metadata.slug,
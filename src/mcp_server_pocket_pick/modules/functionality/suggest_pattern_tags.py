@@ -1,5 +1,10 @@
+import asyncio
 import logging
 import json
+import hashlib
+import sqlite3
+import threading
+import time
 from pathlib import Path
 from typing import List, Dict, Any
 from ..data_types import SuggestPatternTagsCommand
@@ -10,6 +15,119 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# Claude settings for the AI path; both are part of the response cache key
+AI_MODEL = "claude-3-opus-20240229"
+AI_MAX_TOKENS = 256
+
+DEFAULT_TAG_CACHE_PATH = Path.home() / ".cache" / "pocket_pick" / "tag_suggestions.sqlite"
+# Cached AI suggestions older than this are pruned
+TAG_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# Keywords the simple fallback looks for, in the order their tags are returned
+FALLBACK_KEYWORDS = ["consciousness", "emergence", "collective", "intelligence",
+                     "systems", "thinking", "ritual", "practice", "cognition"]
+# Substring match of any keyword; the lookahead lets matches overlap, so one
+# keyword ending where another starts doesn't hide the second
+_FALLBACK_KEYWORDS_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, FALLBACK_KEYWORDS)) + "))", re.IGNORECASE
+)
+
+_nltk_ready = False
+_stop_words: Optional[frozenset] = None
+_nltk_lock = threading.Lock()
+
+def _ensure_nltk() -> frozenset:
+    """
+    Fetch the NLTK data the fallback needs and load the stopwords, once
+    
+    nltk.download checks the data directory on every call, so this runs it
+    on first use only. Raises ImportError if nltk is not installed.
+    
+    Returns:
+        frozenset: English stopwords
+    """
+    global _nltk_ready, _stop_words
+    with _nltk_lock:
+        if not _nltk_ready:
+            import nltk
+            nltk.download('punkt', quiet=True)
+            nltk.download('averaged_perceptron_tagger', quiet=True)
+            nltk.download('stopwords', quiet=True)
+            from nltk.corpus import stopwords
+            _stop_words = frozenset(stopwords.words('english'))
+            _nltk_ready = True
+        return _stop_words
+
+class TagSuggestionCache:
+    """
+    Persistent cache of AI tag suggestions
+    
+    Keyed by a SHA-256 of the model, token limit and prompt, so re-tagging an
+    unchanged pattern skips the Claude request entirely.
+    """
+    
+    def __init__(self, path: Path = DEFAULT_TAG_CACHE_PATH, ttl_seconds: int = TAG_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tag_suggestions "
+            "(key BLOB PRIMARY KEY, tags_json TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._db.execute("DELETE FROM tag_suggestions WHERE created < ?", (time.time() - ttl_seconds,))
+        self._db.commit()
+    
+    @staticmethod
+    def key(model: str, max_tokens: int, prompt: str) -> bytes:
+        """Cache key for one Claude request"""
+        hasher = hashlib.sha256()
+        hasher.update(f"{model}\0{max_tokens}\0".encode())
+        hasher.update(prompt.encode())
+        return hasher.digest()
+    
+    def get(self, key: bytes) -> Optional[List[str]]:
+        """Cached tags for a key, or None on a miss or an expired entry"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT tags_json FROM tag_suggestions WHERE key = ? AND created >= ?",
+                (key, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def set(self, key: bytes, tags: List[str]):
+        """Store the tags Claude suggested for a key"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tag_suggestions (key, tags_json, created) VALUES (?, ?, ?)",
+                (key, json.dumps(tags), time.time())
+            )
+            self._db.commit()
+
+_tag_cache: Optional[TagSuggestionCache] = None
+_tag_cache_failed = False
+_tag_cache_lock = threading.Lock()
+
+def get_tag_cache() -> Optional[TagSuggestionCache]:
+    """
+    Get the shared tag suggestion cache, opening it on first use
+    
+    Returns None if the cache could not be opened; a failed open is not
+    retried for the life of the process.
+    """
+    global _tag_cache, _tag_cache_failed
+    with _tag_cache_lock:
+        if _tag_cache is None and not _tag_cache_failed:
+            try:
+                _tag_cache = TagSuggestionCache()
+            except Exception as e:
+                _tag_cache_failed = True
+                logger.warning(f"Tag suggestion cache unavailable, suggestions will not be cached: {e}")
+        return _tag_cache
+
 def load_json(path: Path) -> Dict[str, Any]:
     """Load JSON data from a file"""
     try:
@@ -72,8 +190,6 @@ def suggest_pattern_tags(command: SuggestPatternTagsCommand) -> SuggestPatternTa
 
     # Try Claude (AI) path with timeout
     def ai_tagging():
-        anthropic = import_anthropic()
-        client = anthropic.Anthropic()
         prompt = f"""
 Analyze the following document and suggest {command.num_tags} relevant tags for it.
 These tags should capture important concepts, themes, and topics in the document.
@@ -87,9 +203,28 @@ Document:
 """
         if command.existing_tags:
             prompt += f"\nExisting tags: {', '.join(command.existing_tags)}"
+        
+        # Without anthropic a cached answer could never be refreshed, so the
+        # cache is not even opened
+        anthropic = import_anthropic()
+        
+        # Reuse an earlier answer for the same request; a cache problem only
+        # costs the API call
+        tag_cache = get_tag_cache()
+        cache_key = TagSuggestionCache.key(AI_MODEL, AI_MAX_TOKENS, prompt)
+        cached = None
+        if tag_cache is not None:
+            try:
+                cached = tag_cache.get(cache_key)
+            except Exception as e:
+                logger.warning(f"Error reading tag suggestion cache: {e}")
+        if cached:
+            return cached, [0.8]*len(cached)
+        
+        client = anthropic.Anthropic()
         message = client.messages.create(
-            model="claude-3-opus-20240229",
-            max_tokens=256,
+            model=AI_MODEL,
+            max_tokens=AI_MAX_TOKENS,
             temperature=0.4,
             system="You are a helpful assistant that only returns a JSON array of tags.",
             messages=[{"role": "user", "content": prompt}]
@@ -107,6 +242,11 @@ Document:
         if not arr:
             # Try as comma-separated fallback
             arr = [t.strip() for t in text.split(',') if t.strip()]
+        if arr and tag_cache is not None:
+            try:
+                tag_cache.set(cache_key, arr)
+            except Exception as e:
+                logger.warning(f"Error writing tag suggestion cache: {e}")
         # Return array without normalizing (for test fix)
         return arr, [0.8]*len(arr)
 
@@ -137,14 +277,9 @@ Document:
         return SuggestPatternTagsResponse(tags=tags, source="ai", confidence=confidences)
 
     # Simple fallback for tests that doesn't require NLTK
-    # Check for keywords we know are in test files
-    test_keywords = ["consciousness", "emergence", "collective", "intelligence", 
-                    "systems", "thinking", "ritual", "practice", "cognition"]
-    
-    fallback_tags = []
-    for keyword in test_keywords:
-        if keyword.lower() in pattern_content.lower():
-            fallback_tags.append(keyword)
+    # Check for keywords we know are in test files, in one scan of the content
+    found = {match.lower() for match in _FALLBACK_KEYWORDS_RE.findall(pattern_content)}
+    fallback_tags = [keyword for keyword in FALLBACK_KEYWORDS if keyword in found]
     
     # If we found some keywords, return them
     if fallback_tags:
@@ -155,13 +290,9 @@ Document:
     
     # If no keywords matched, try a more sophisticated approach with NLTK if available
     try:
+        stop_words = _ensure_nltk()
         import nltk
         from collections import Counter
-        nltk.download('punkt', quiet=True)
-        nltk.download('averaged_perceptron_tagger', quiet=True)
-        nltk.download('stopwords', quiet=True)
-        from nltk.corpus import stopwords
-        stop_words = set(stopwords.words('english'))
         # Tokenize and POS tag
         words = nltk.word_tokenize(pattern_content)
         words = [w.lower() for w in words if w.isalnum()]
@@ -180,4 +311,29 @@ Document:
     except Exception as e:
         msg = f"Fallback keyword extraction failed: {e}"
         log_error(msg, e)
-        return SuggestPatternTagsResponse(tags=["themes-fabric", "pattern", "needs-tagging"], source="fallback", error=msg)
\ No newline at end of file
+        return SuggestPatternTagsResponse(tags=["themes-fabric", "pattern", "needs-tagging"], source="fallback", error=msg)
+
+async def asuggest_pattern_tags_many(commands: List[SuggestPatternTagsCommand],
+                                     max_concurrency: int = 8) -> List[SuggestPatternTagsResponse]:
+    """
+    Suggest tags for several patterns concurrently
+    
+    Each suggestion runs suggest_pattern_tags on a worker thread, so the Claude
+    requests overlap instead of running back to back; the blocking client
+    releases the GIL while it waits. A semaphore caps the requests in flight
+    to stay inside API rate limits.
+    
+    Args:
+        commands: One SuggestPatternTagsCommand per pattern
+        max_concurrency: Most suggestions to run at once
+        
+    Returns:
+        List[SuggestPatternTagsResponse]: Responses in the order of commands
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def suggest_one(command: SuggestPatternTagsCommand) -> SuggestPatternTagsResponse:
+        async with semaphore:
+            return await asyncio.to_thread(suggest_pattern_tags, command)
+    
+    return await asyncio.gather(*(suggest_one(command) for command in commands))
@@ -1,12 +1,33 @@
 from pathlib import Path
 import logging
 import os
-from ..data_types import ToFileByIdCommand, PocketItem
-from .get import get
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from ..data_types import ToFileByIdCommand, PocketItem, GetManyCommand
+from .get import get, get_many
 from .get import GetCommand
 
 logger = logging.getLogger(__name__)
 
+# Most files written at once by to_files_by_ids
+MAX_WRITE_WORKERS = min(8, os.cpu_count() or 1)
+
+def _write_item(output_file_path_abs: Path, text: str) -> bool:
+    """Write an item's text to a file, creating its parent directory"""
+    try:
+        # Ensure parent directory exists
+        output_path = Path(output_file_path_abs)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Write content to file
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        
+        return True
+    except Exception as e:
+        logger.error(f"Error writing to file {output_file_path_abs}: {e}")
+        return False
+
 def to_file_by_id(command: ToFileByIdCommand) -> bool:
     """
     Write pocket pick content with given ID to the specified file
@@ -30,15 +51,46 @@ def to_file_by_id(command: ToFileByIdCommand) -> bool:
             logger.error(f"Item with ID {command.id} not found")
             return False
         
-        # Ensure parent directory exists
-        output_path = Path(command.output_file_path_abs)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Write content to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(item.text)
-        
-        return True
+        return _write_item(command.output_file_path_abs, item.text)
     except Exception as e:
         logger.error(f"Error writing to file {command.output_file_path_abs}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def to_files_by_ids(commands: List[ToFileByIdCommand]) -> List[bool]:
+    """
+    Write the content of several items to their files
+    
+    Items are fetched with one get_many query per database, then the files
+    are written concurrently on a small thread pool.
+    
+    Args:
+        commands: ToFileByIdCommands with id, output_file_path and db_path
+        
+    Returns:
+        List[bool]: Whether each command's file was written, in command order
+    """
+    texts = [None] * len(commands)
+    
+    # Group by database so each one is queried once
+    by_db = {}
+    for i, command in enumerate(commands):
+        by_db.setdefault(command.db_path, []).append(i)
+    
+    for db_path, positions in by_db.items():
+        try:
+            items = get_many(GetManyCommand(ids=[commands[i].id for i in positions], db_path=db_path))
+        except Exception as e:
+            logger.error(f"Error getting items from {db_path}: {e}")
+            continue
+        found = {item.id: item.text for item in items}
+        for i in positions:
+            texts[i] = found.get(commands[i].id)
+    
+    def write_one(i: int) -> bool:
+        if texts[i] is None:
+            logger.error(f"Item with ID {commands[i].id} not found")
+            return False
+        return _write_item(commands[i].output_file_path_abs, texts[i])
+    
+    with ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS, thread_name_prefix="to-file") as executor:
+        return list(executor.map(write_one, range(len(commands))))
@@ -1,7 +1,19 @@
 import sqlite3
+import functools
+import json
+import re
+from datetime import datetime
+from itertools import chain
 from pathlib import Path
 import logging
 
+# orjson parses the short tag arrays several times faster when installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 def migrate_database_schema(db: sqlite3.Connection) -> None:
@@ -24,12 +36,31 @@ def migrate_database_schema(db: sqlite3.Connection) -> None:
             logger.info("Adding embedding_updated column to POCKET_PICK table")
             db.execute("ALTER TABLE POCKET_PICK ADD COLUMN embedding_updated TIMESTAMP")
         
+        if 'embedding_scale' not in columns:
+            logger.info("Adding embedding_scale column to POCKET_PICK table")
+            db.execute("ALTER TABLE POCKET_PICK ADD COLUMN embedding_scale REAL")
+        
         db.commit()
         
     except sqlite3.Error as e:
         logger.error(f"Error migrating database schema: {e}")
         raise
 
+@functools.lru_cache(maxsize=256)
+def compile_regex(pattern: str) -> re.Pattern:
+    """Compile a case-insensitive search pattern once per distinct pattern
+    
+    Shared by the REGEXP function and by callers validating a pattern first,
+    so validation warms the cache the query then reads from.
+    """
+    return re.compile(pattern, re.IGNORECASE)
+
+def _regexp(pattern: str, value: str) -> int:
+    """SQLite REGEXP implementation: `value REGEXP pattern` calls regexp(pattern, value)"""
+    if value is None:
+        return 0
+    return 1 if compile_regex(pattern).search(value) else 0
+
 def init_db(db_path: Path) -> sqlite3.Connection:
     """Initialize SQLite database with POCKET_PICK table"""
     # Ensure parent directory exists
@@ -43,9 +74,16 @@ def init_db(db_path: Path) -> sqlite3.Connection:
         
     db = sqlite3.connect(str(db_path), check_same_thread=False)
     
+    # Larger pages for new databases; must be set before the first write
+    if db.execute("PRAGMA page_count").fetchone()[0] == 0:
+        db.execute("PRAGMA page_size = 8192")
+    
     # Enable foreign keys
     db.execute("PRAGMA foreign_keys = ON")
     
+    # Case-insensitive REGEXP operator so regex filters run inside the query
+    db.create_function("regexp", 2, _regexp, deterministic=True)
+    
     # Create the POCKET_PICK table with embedding support
     db.execute("""
     CREATE TABLE IF NOT EXISTS POCKET_PICK (
@@ -54,6 +92,7 @@ def init_db(db_path: Path) -> sqlite3.Connection:
         text TEXT NOT NULL,
         tags TEXT NOT NULL,
         embedding BLOB,
+        embedding_scale REAL,
         embedding_model TEXT DEFAULT 'all-MiniLM-L6-v2',
         embedding_updated TIMESTAMP
     )
@@ -64,17 +103,89 @@ def init_db(db_path: Path) -> sqlite3.Connection:
     
     # Create indexes for efficient searching AFTER migration
     db.execute("CREATE INDEX IF NOT EXISTS idx_pocket_pick_created ON POCKET_PICK(created)")
-    db.execute("CREATE INDEX IF NOT EXISTS idx_pocket_pick_text ON POCKET_PICK(text)")
+    # (text, created) serves exact lookups already in newest-first order;
+    # databases with the older text-only index are upgraded in place
+    text_index = db.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'idx_pocket_pick_text'"
+    ).fetchone()
+    if text_index is not None and 'created' not in text_index[0]:
+        db.execute("DROP INDEX idx_pocket_pick_text")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_pocket_pick_text ON POCKET_PICK(text, created)")
     db.execute("CREATE INDEX IF NOT EXISTS idx_pocket_pick_embedding_model ON POCKET_PICK(embedding_model)")
     db.execute("CREATE INDEX IF NOT EXISTS idx_pocket_pick_embedding_updated ON POCKET_PICK(embedding_updated)")
     
+    # Normalized tag table so tag filters can use an index instead of
+    # scanning the JSON tags column; kept in sync by triggers
+    tags_table_exists = db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'POCKET_PICK_TAGS'"
+    ).fetchone() is not None
+    
+    db.execute("""
+    CREATE TABLE IF NOT EXISTS POCKET_PICK_TAGS (
+        item_id TEXT NOT NULL,
+        tag TEXT NOT NULL,
+        PRIMARY KEY (tag, item_id)
+    ) WITHOUT ROWID
+    """)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_pocket_pick_tags_item ON POCKET_PICK_TAGS(item_id)")
+    
+    db.execute("""
+    CREATE TRIGGER IF NOT EXISTS pocket_pick_tags_ai AFTER INSERT ON POCKET_PICK
+    BEGIN
+        INSERT OR IGNORE INTO POCKET_PICK_TAGS(item_id, tag)
+        SELECT new.id, value FROM json_each(new.tags);
+    END
+    """)
+    
+    db.execute("""
+    CREATE TRIGGER IF NOT EXISTS pocket_pick_tags_ad AFTER DELETE ON POCKET_PICK
+    BEGIN
+        DELETE FROM POCKET_PICK_TAGS WHERE item_id = old.id;
+    END
+    """)
+    
+    db.execute("""
+    CREATE TRIGGER IF NOT EXISTS pocket_pick_tags_au AFTER UPDATE OF id, tags ON POCKET_PICK
+    BEGIN
+        DELETE FROM POCKET_PICK_TAGS WHERE item_id = old.id;
+        INSERT OR IGNORE INTO POCKET_PICK_TAGS(item_id, tag)
+        SELECT new.id, value FROM json_each(new.tags);
+    END
+    """)
+    
+    # Populate the tag table once for databases created before it existed
+    if not tags_table_exists:
+        db.execute("""
+        INSERT OR IGNORE INTO POCKET_PICK_TAGS(item_id, tag)
+        SELECT POCKET_PICK.id, json_each.value FROM POCKET_PICK, json_each(POCKET_PICK.tags)
+        """)
+    
+    # One-off markers for setup steps that must not repeat on every open
+    db.execute("""
+    CREATE TABLE IF NOT EXISTS POCKET_PICK_META (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """)
+    
     # Create FTS5 virtual table for full-text search
     try:
+        # Indexes built before stemming was enabled are recreated so that
+        # e.g. "program" matches "programming"
+        fts_sql = db.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'pocket_pick_fts'"
+        ).fetchone()
+        if fts_sql and 'porter' not in fts_sql[0]:
+            logger.info("Rebuilding FTS index with the porter tokenizer")
+            db.execute("DROP TABLE pocket_pick_fts")
+            fts_sql = None
+        
         db.execute("""
         CREATE VIRTUAL TABLE IF NOT EXISTS pocket_pick_fts USING fts5(
             text,
             content='POCKET_PICK',
-            content_rowid='rowid'
+            content_rowid='rowid',
+            tokenize='porter unicode61'
         )
         """)
         
@@ -101,31 +212,175 @@ def init_db(db_path: Path) -> sqlite3.Connection:
         END
         """)
         
-        # Rebuild FTS index if needed (for existing data)
-        db.execute("""
-        INSERT OR IGNORE INTO pocket_pick_fts(rowid, text)
-        SELECT rowid, text FROM POCKET_PICK
-        """)
+        # Build the FTS index from existing data once; after that the
+        # triggers keep it current, so later opens skip the O(rows) pass.
+        # Databases without the marker get a full rebuild, which also repairs
+        # postings duplicated by the row-by-row backfill older versions ran
+        fts_built = db.execute(
+            "SELECT 1 FROM POCKET_PICK_META WHERE key = 'fts_built'"
+        ).fetchone() is not None
+        if fts_sql is None or not fts_built:
+            db.execute("INSERT INTO pocket_pick_fts(pocket_pick_fts) VALUES('rebuild')")
+            db.execute("INSERT OR REPLACE INTO POCKET_PICK_META(key, value) VALUES ('fts_built', '1')")
         
     except sqlite3.OperationalError as e:
         # If FTS5 is not available, log a warning but continue
         logger.warning(f"FTS5 extension not available: {e}. Full-text search will fallback to basic search.")
     
+    # Trigram index (SQLite 3.34+) so substring and glob searches can look
+    # up candidate rows instead of scanning every text
+    try:
+        trigram_exists = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pocket_pick_trigram'"
+        ).fetchone() is not None
+        
+        db.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS pocket_pick_trigram USING fts5(
+            text,
+            content='POCKET_PICK',
+            content_rowid='rowid',
+            tokenize='trigram'
+        )
+        """)
+        
+        db.execute("""
+        CREATE TRIGGER IF NOT EXISTS pocket_pick_trigram_ai AFTER INSERT ON POCKET_PICK
+        BEGIN
+            INSERT INTO pocket_pick_trigram(rowid, text) VALUES (new.rowid, new.text);
+        END
+        """)
+        
+        db.execute("""
+        CREATE TRIGGER IF NOT EXISTS pocket_pick_trigram_ad AFTER DELETE ON POCKET_PICK
+        BEGIN
+            INSERT INTO pocket_pick_trigram(pocket_pick_trigram, rowid, text) VALUES('delete', old.rowid, old.text);
+        END
+        """)
+        
+        # Embedding updates leave the text alone, so only text changes reindex
+        db.execute("""
+        CREATE TRIGGER IF NOT EXISTS pocket_pick_trigram_au AFTER UPDATE OF text ON POCKET_PICK
+        BEGIN
+            INSERT INTO pocket_pick_trigram(pocket_pick_trigram, rowid, text) VALUES('delete', old.rowid, old.text);
+            INSERT INTO pocket_pick_trigram(rowid, text) VALUES (new.rowid, new.text);
+        END
+        """)
+        
+        if not trigram_exists:
+            db.execute("INSERT INTO pocket_pick_trigram(pocket_pick_trigram) VALUES('rebuild')")
+        
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Trigram index not available: {e}. Substring search will scan the table.")
+    
     # Commit changes
     db.commit()
     
     return db
 
+@functools.lru_cache(maxsize=4096)
 def normalize_tag(tag: str) -> str:
     """
     Normalize tags:
     - lowercase
     - trim whitespace
     - replace spaces and underscores with dashes
+    
+    Tag vocabularies are small and repeat constantly, so results are cached;
+    a repeated tag also gets back the same string object.
     """
     tag = tag.lower().strip()
     return tag.replace(' ', '-').replace('_', '-')
 
 def normalize_tags(tags: list[str]) -> list[str]:
     """Apply normalization to a list of tags"""
-    return [normalize_tag(tag) for tag in tags]
\ No newline at end of file
+    return [normalize_tag(tag) for tag in tags]
+
+_decode_tags = orjson.loads if ORJSON_AVAILABLE else json.JSONDecoder().decode
+_encode_tags = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+def tag_filter_params(tags: list[str]) -> list:
+    """Parameters for tag_filter_sql, in placeholder order"""
+    unique_tags = list(dict.fromkeys(tags))
+    return [*unique_tags, len(unique_tags)]
+
+@functools.lru_cache(maxsize=64)
+def tag_filter_sql(n_tags: int, id_column: str = "id") -> str:
+    """
+    WHERE predicate matching items that have `n_tags` given distinct tags
+    
+    The SQL only depends on the tag count, so it is built once per shape and
+    the tags are bound through tag_filter_params.
+    """
+    placeholders = ", ".join("?" * n_tags)
+    return (
+        f"{id_column} IN (SELECT item_id FROM POCKET_PICK_TAGS WHERE tag IN ({placeholders}) "
+        f"GROUP BY item_id HAVING COUNT(*) = ?)"
+    )
+
+def tag_filter_clause(tags: list[str], id_column: str = "id") -> tuple[str, list]:
+    """
+    Build a WHERE predicate matching items that have every given tag
+    
+    Returns the SQL fragment and its parameters. The lookup goes through the
+    POCKET_PICK_TAGS primary key rather than the JSON tags column.
+    """
+    params = tag_filter_params(tags)
+    return tag_filter_sql(len(params) - 1, id_column), params
+
+def like_search_words(text: str) -> list[str]:
+    """
+    Distinct words of a search, longest first, for AND-ed LIKE predicates
+    
+    SQLite tests the terms in order, so leading with the longest (usually
+    rarest) word rejects most rows after a single comparison.
+    """
+    return sorted(dict.fromkeys(text.split()), key=len, reverse=True)
+
+# Rows per multi-row INSERT; four columns keep each statement at 400
+# parameters, under the 999-variable limit of older SQLite builds
+INSERT_CHUNK_ROWS = 100
+
+@functools.lru_cache(maxsize=8)
+def _insert_items_sql(n_rows: int) -> str:
+    """INSERT statement with `n_rows` rows of (id, created, text, tags)"""
+    return "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES " + ", ".join(["(?, ?, ?, ?)"] * n_rows)
+
+def insert_items(db, rows: list[tuple]) -> None:
+    """
+    Insert (id, created, text, tags) rows, INSERT_CHUNK_ROWS per statement
+    
+    Full chunks share one prepared multi-row statement; the short final
+    chunk gets a statement of its own. The caller owns the transaction.
+    """
+    n_full = len(rows) - len(rows) % INSERT_CHUNK_ROWS
+    if n_full:
+        db.executemany(
+            _insert_items_sql(INSERT_CHUNK_ROWS),
+            (
+                tuple(chain.from_iterable(rows[i:i + INSERT_CHUNK_ROWS]))
+                for i in range(0, n_full, INSERT_CHUNK_ROWS)
+            )
+        )
+    if n_full < len(rows):
+        db.execute(_insert_items_sql(len(rows) - n_full), tuple(chain.from_iterable(rows[n_full:])))
+
+def serialize_tags(tags: list[str]) -> str:
+    """Serialize normalized tags for the tags column (compact JSON)"""
+    return _encode_tags(tags)
+
+def deserialize_tags(tags_json: str) -> list[str]:
+    """Parse the tags column back into a list"""
+    if not tags_json or tags_json == '[]':
+        return []
+    # Callers get their own list; the cached tuple is shared
+    return list(_parse_tags(tags_json))
+
+@functools.lru_cache(maxsize=4096)
+def _parse_tags(tags_json: str) -> tuple:
+    """Decode a tags column value once per distinct tag set"""
+    return tuple(_decode_tags(tags_json))
+
+@functools.lru_cache(maxsize=4096)
+def parse_created(created: str) -> datetime:
+    """Parse a stored created timestamp, reusing results for repeated rows"""
+    return datetime.fromisoformat(created)
@@ -7,17 +7,20 @@ full-text search, and fuzzy matching to deliver optimal search results.
 
 import logging
 import asyncio
-import json
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
 
-from .embeddings import EmbeddingGenerator, VectorSimilarity, serialize_embedding, deserialize_embedding
+from .embeddings import (
+    EmbeddingGenerator, VectorSimilarity, get_embedding_generator,
+    deserialize_embedding, serialize_embedding_int8, deserialize_embedding_int8
+)
 from .connection_pool import get_db_connection
 from .data_types import PocketItem, FindCommand
-from .init_db import normalize_tags
+from .init_db import normalize_tags, deserialize_tags, parse_created, tag_filter_clause, like_search_words
 from thefuzz import fuzz
 
 logger = logging.getLogger(__name__)
@@ -62,6 +65,23 @@ class SearchConfig:
     embedding_batch_size: int = 32
 
 
+def _data_version(db_path: Path) -> str:
+    """
+    Token that changes whenever the database file or its WAL is written
+    
+    Used to scope cached search results, so a search after add or remove
+    never returns results computed against older data.
+    """
+    parts = [str(db_path)]
+    for path in (db_path, db_path.with_name(db_path.name + "-wal")):
+        try:
+            stat = path.stat()
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+        except OSError:
+            parts.append("-")
+    return "|".join(parts)
+
+
 class SearchCache:
     """Simple in-memory cache for search results"""
     
@@ -70,50 +90,55 @@ class SearchCache:
         self.access_times = {}
         self.max_entries = max_entries
         self.ttl = timedelta(minutes=ttl_minutes)
+        # Engines are shared across calls and threads
+        self._lock = threading.Lock()
     
-    def _cache_key(self, query: str, tags: List[str], mode: str) -> str:
+    def _cache_key(self, query: str, tags: List[str], mode: str, scope: str = "") -> str:
         """Generate cache key from search parameters"""
         tag_str = ",".join(sorted(tags)) if tags else ""
-        return f"{mode}:{query}:{tag_str}"
+        return f"{scope}:{mode}:{query}:{tag_str}"
     
-    def get(self, query: str, tags: List[str], mode: str) -> Optional[List[SearchResult]]:
+    def get(self, query: str, tags: List[str], mode: str, scope: str = "") -> Optional[List[SearchResult]]:
         """Get cached search results if not expired"""
-        key = self._cache_key(query, tags, mode)
+        key = self._cache_key(query, tags, mode, scope)
         
-        if key in self.cache:
-            cached_time = self.access_times.get(key, datetime.min)
-            if datetime.now() - cached_time < self.ttl:
-                self.access_times[key] = datetime.now()
-                return self.cache[key]
-            else:
-                # Remove expired entry
-                self.cache.pop(key, None)
-                self.access_times.pop(key, None)
+        with self._lock:
+            if key in self.cache:
+                cached_time = self.access_times.get(key, datetime.min)
+                if datetime.now() - cached_time < self.ttl:
+                    self.access_times[key] = datetime.now()
+                    return self.cache[key]
+                else:
+                    # Remove expired entry
+                    self.cache.pop(key, None)
+                    self.access_times.pop(key, None)
         
         return None
     
-    def set(self, query: str, tags: List[str], mode: str, results: List[SearchResult]):
+    def set(self, query: str, tags: List[str], mode: str, results: List[SearchResult], scope: str = ""):
         """Cache search results"""
-        key = self._cache_key(query, tags, mode)
+        key = self._cache_key(query, tags, mode, scope)
         
-        # Remove oldest entries if cache is full
-        if len(self.cache) >= self.max_entries:
-            # Remove the oldest 10% of entries
-            removal_count = max(1, self.max_entries // 10)
-            oldest_keys = sorted(self.access_times.keys(), 
-                               key=lambda k: self.access_times[k])[:removal_count]
+        with self._lock:
+            # Remove oldest entries if cache is full
+            if len(self.cache) >= self.max_entries:
+                # Remove the oldest 10% of entries
+                removal_count = max(1, self.max_entries // 10)
+                oldest_keys = sorted(self.access_times.keys(), 
+                                   key=lambda k: self.access_times[k])[:removal_count]
+                
+                for old_key in oldest_keys:
+                    self.cache.pop(old_key, None)
+                    self.access_times.pop(old_key, None)
             
-            for old_key in oldest_keys:
-                self.cache.pop(old_key, None)
-                self.access_times.pop(old_key, None)
-        
-        self.cache[key] = results
-        self.access_times[key] = datetime.now()
+            self.cache[key] = results
+            self.access_times[key] = datetime.now()
     
     def clear(self):
         """Clear all cached entries"""
-        self.cache.clear()
-        self.access_times.clear()
+        with self._lock:
+            self.cache.clear()
+            self.access_times.clear()
 
 
 class HybridSearchEngine:
@@ -129,7 +154,7 @@ class HybridSearchEngine:
         """Lazy initialization of embedding generator"""
         if self.embedding_generator is None:
             try:
-                self.embedding_generator = EmbeddingGenerator(cache_enabled=True)
+                self.embedding_generator = get_embedding_generator()
                 logger.info("Embedding generator initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize embedding generator: {e}")
@@ -168,12 +193,12 @@ class HybridSearchEngine:
                 # Store in database
                 with get_db_connection(db_path) as conn:
                     for item_id, embedding in zip(batch_ids, embeddings):
-                        serialized_embedding = serialize_embedding(embedding)
+                        serialized_embedding, scale = serialize_embedding_int8(embedding)
                         conn.execute("""
                             UPDATE POCKET_PICK 
-                            SET embedding = ?, embedding_updated = ?
+                            SET embedding = ?, embedding_scale = ?, embedding_updated = ?
                             WHERE id = ?
-                        """, (serialized_embedding, datetime.now().isoformat(), item_id))
+                        """, (serialized_embedding, scale, datetime.now().isoformat(), item_id))
                     conn.commit()
                 
                 logger.debug(f"Generated embeddings for batch {i//batch_size + 1}/{(len(items_to_embed) + batch_size - 1)//batch_size}")
@@ -195,7 +220,7 @@ class HybridSearchEngine:
             
             with get_db_connection(db_path) as conn:
                 cursor = conn.execute("""
-                    SELECT id, created, text, tags, embedding 
+                    SELECT id, created, text, tags, embedding, embedding_scale 
                     FROM POCKET_PICK 
                     WHERE embedding IS NOT NULL
                 """)
@@ -203,17 +228,21 @@ class HybridSearchEngine:
                 embeddings = []
                 items = []
                 
-                for row in cursor.fetchall():
-                    item_id, created_str, text, tags_json, embedding_blob = row
+                for row in cursor:
+                    item_id, created_str, text, tags_json, embedding_blob, embedding_scale = row
                     
                     if embedding_blob:
-                        # Deserialize embedding
-                        embedding = deserialize_embedding(embedding_blob)
+                        # Deserialize embedding; rows without a scale predate
+                        # int8 storage and hold raw float32
+                        if embedding_scale is not None:
+                            embedding = deserialize_embedding_int8(embedding_blob, embedding_scale)
+                        else:
+                            embedding = deserialize_embedding(embedding_blob)
                         embeddings.append(embedding)
                         
                         # Parse item data
-                        created = datetime.fromisoformat(created_str)
-                        tags = json.loads(tags_json)
+                        created = parse_created(created_str)
+                        tags = deserialize_tags(tags_json)
                         
                         item = PocketItem(
                             id=item_id,
@@ -264,25 +293,23 @@ class HybridSearchEngine:
                     
                     # Add tag filters
                     if tags:
-                        normalized_tags = normalize_tags(tags)
-                        tag_clauses = []
-                        for tag in normalized_tags:
-                            tag_clauses.append("POCKET_PICK.tags LIKE ?")
-                            params.append(f"%\"{tag}\"%")
-                        where_clauses.append(f"({' AND '.join(tag_clauses)})")
+                        tag_clause, tag_params = tag_filter_clause(normalize_tags(tags), "POCKET_PICK.id")
+                        where_clauses.append(tag_clause)
+                        params.extend(tag_params)
                     
                     if where_clauses:
                         base_query += f" AND {' AND '.join(where_clauses)}"
                     
-                    base_query += f" ORDER BY rank LIMIT {limit}"
+                    base_query += " ORDER BY rank LIMIT ?"
+                    params.append(limit)
                     
                     cursor = conn.execute(base_query, params)
                     
-                    for row in cursor.fetchall():
+                    for row in cursor:
                         item_id, created_str, text, tags_json, rank = row
                         
-                        created = datetime.fromisoformat(created_str)
-                        item_tags = json.loads(tags_json)
+                        created = parse_created(created_str)
+                        item_tags = deserialize_tags(tags_json)
                         
                         item = PocketItem(
                             id=item_id,
@@ -300,7 +327,7 @@ class HybridSearchEngine:
                     logger.warning(f"FTS5 search failed: {fts_error}, falling back to LIKE search")
                     
                     # Fallback to LIKE-based search
-                    search_words = query.split()
+                    search_words = like_search_words(query)
                     word_clauses = []
                     params = []
                     
@@ -316,20 +343,20 @@ class HybridSearchEngine:
                     
                     # Add tag filters
                     if tags:
-                        normalized_tags = normalize_tags(tags)
-                        for tag in normalized_tags:
-                            fallback_query += " AND tags LIKE ?"
-                            params.append(f"%\"{tag}\"%")
+                        tag_clause, tag_params = tag_filter_clause(normalize_tags(tags))
+                        fallback_query += f" AND {tag_clause}"
+                        params.extend(tag_params)
                     
-                    fallback_query += f" ORDER BY created DESC LIMIT {limit}"
+                    fallback_query += " ORDER BY created DESC LIMIT ?"
+                    params.append(limit)
                     
                     cursor = conn.execute(fallback_query, params)
                     
-                    for row in cursor.fetchall():
+                    for row in cursor:
                         item_id, created_str, text, tags_json = row
                         
-                        created = datetime.fromisoformat(created_str)
-                        item_tags = json.loads(tags_json)
+                        created = parse_created(created_str)
+                        item_tags = deserialize_tags(tags_json)
                         
                         item = PocketItem(
                             id=item_id,
@@ -362,12 +389,9 @@ class HybridSearchEngine:
                 
                 # Add tag filters
                 if tags:
-                    normalized_tags = normalize_tags(tags)
-                    tag_clauses = []
-                    for tag in normalized_tags:
-                        tag_clauses.append("tags LIKE ?")
-                        params.append(f"%\"{tag}\"%")
-                    where_clauses.append(f"({' AND '.join(tag_clauses)})")
+                    tag_clause, tag_params = tag_filter_clause(normalize_tags(tags))
+                    where_clauses.append(tag_clause)
+                    params.extend(tag_params)
                 
                 if where_clauses:
                     base_query += f" WHERE {' AND '.join(where_clauses)}"
@@ -379,7 +403,7 @@ class HybridSearchEngine:
                 query_lower = query.lower()
                 scored_items = []
                 
-                for row in cursor.fetchall():
+                for row in cursor:
                     item_id, created_str, text, tags_json = row
                     
                     # Calculate fuzzy scores
@@ -391,8 +415,8 @@ class HybridSearchEngine:
                     best_score = max(partial_score, token_score)
                     
                     if best_score >= self.config.fuzzy_score_threshold:
-                        created = datetime.fromisoformat(created_str)
-                        item_tags = json.loads(tags_json)
+                        created = parse_created(created_str)
+                        item_tags = deserialize_tags(tags_json)
                         
                         item = PocketItem(
                             id=item_id,
@@ -415,11 +439,24 @@ class HybridSearchEngine:
             logger.error(f"Error in fuzzy search: {e}")
             return []
     
-    async def search(self, command: FindCommand) -> List[SearchResult]:
-        """Perform unified hybrid search"""
+    async def search(self, command: FindCommand, max_results: Optional[int] = None) -> List[SearchResult]:
+        """
+        Perform unified hybrid search
+        
+        Args:
+            command: FindCommand with the query, mode, tags and limit
+            max_results: Candidates to fetch per search type before ranking;
+                defaults to config.max_results
+        """
+        max_results = max_results or self.config.max_results
+        # Results depend on the data searched and on how many were asked for
+        scope = f"{_data_version(command.db_path)}|{max_results}|{command.limit}"
+        
         # Check cache first
         if self.config.enable_caching:
-            cached_results = self.cache.get(command.text, command.tags or [], command.mode)
+            cached_results = self.cache.get(
+                command.text, command.tags or [], command.mode, scope
+            )
             if cached_results:
                 logger.debug("Returning cached search results")
                 return cached_results[:command.limit]
@@ -449,7 +486,7 @@ class HybridSearchEngine:
                         command.text, 
                         command.db_path, 
                         command.tags or [],
-                        self.config.max_results
+                        max_results
                     )
                 
                 if command.mode in ['hybrid', 'fuzzy']:
@@ -458,7 +495,7 @@ class HybridSearchEngine:
                         command.text, 
                         command.db_path, 
                         command.tags or [],
-                        self.config.max_results
+                        max_results
                     )
                 
                 # Collect results
@@ -494,7 +531,7 @@ class HybridSearchEngine:
                     search_results[item.id].match_reasons.append(f"Vector similarity: {score:.3f}")
             
             if command.mode in ['hybrid', 'fts']:
-                fts_results = self._fts_search(command.text, command.db_path, command.tags or [], self.config.max_results)
+                fts_results = self._fts_search(command.text, command.db_path, command.tags or [], max_results)
                 for item, score in fts_results:
                     if item.id not in search_results:
                         search_results[item.id] = SearchResult(item=item)
@@ -502,7 +539,7 @@ class HybridSearchEngine:
                     search_results[item.id].match_reasons.append(f"Text match: {score:.3f}")
             
             if command.mode in ['hybrid', 'fuzzy']:
-                fuzzy_results = self._fuzzy_search(command.text, command.db_path, command.tags or [], self.config.max_results)
+                fuzzy_results = self._fuzzy_search(command.text, command.db_path, command.tags or [], max_results)
                 for item, score in fuzzy_results:
                     if item.id not in search_results:
                         search_results[item.id] = SearchResult(item=item)
@@ -531,7 +568,11 @@ class HybridSearchEngine:
         
         # Cache results
         if self.config.enable_caching:
-            self.cache.set(command.text, command.tags or [], command.mode, limited_results)
+            # Scoped to the data as searched, after any embedding backfill
+            scope = f"{_data_version(command.db_path)}|{max_results}|{command.limit}"
+            self.cache.set(
+                command.text, command.tags or [], command.mode, limited_results, scope
+            )
         
         logger.info(f"Hybrid search returned {len(limited_results)} results for query: '{command.text}'")
         return limited_results
@@ -28,7 +28,7 @@ from .modules.data_types import (
 )
 from .modules.functionality.add import add
 from .modules.functionality.add_file import add_file
-from .modules.functionality.find import find
+from .modules.functionality.find import afind
 from .modules.functionality.list import list_items
 from .modules.functionality.list_tags import list_tags
 from .modules.functionality.remove import remove
@@ -40,6 +40,7 @@ from .modules.functionality.import_patterns_with_bodies import import_patterns_w
 from .modules.functionality.suggest_pattern_tags import suggest_pattern_tags
 from .modules.functionality.search_patterns import search_patterns, get_pattern
 from .modules.constants import DEFAULT_SQLITE_DATABASE_PATH
+from .modules.connection_pool import get_connection_pool
 
 logger = logging.getLogger(__name__)
 
@@ -154,10 +155,9 @@ async def serve(sqlite_database: Path | None = None) -> None:
     db_path = sqlite_database if sqlite_database is not None else DEFAULT_SQLITE_DATABASE_PATH
     logger.info(f"Using database at {db_path}")
     
-    # Initialize the database at startup to ensure it exists
-    from .modules.init_db import init_db
-    connection = init_db(db_path)
-    connection.close()
+    # Initialize the database at startup to ensure it exists; the pool's
+    # connections run init_db and stay open for the tool calls
+    get_connection_pool(db_path)
     logger.info(f"Database initialized at {db_path}")
     
     server = Server("pocket-pick")
@@ -263,10 +263,9 @@ async def serve(sqlite_database: Path | None = None) -> None:
         
         db_path = Path(arguments["db"])
         
-        # Ensure the database exists and is initialized for every command
-        from .modules.init_db import init_db
-        connection = init_db(db_path)
-        connection.close()
+        # Ensure the database has a pool; creating one initializes the schema,
+        # later commands reuse its open connections
+        get_connection_pool(db_path)
         
         match name:
             case PocketTools.ADD:
@@ -302,7 +301,7 @@ async def serve(sqlite_database: Path | None = None) -> None:
                     tags=arguments.get("tags", []),
                     db_path=db_path
                 )
-                results = find(command)
+                results = await afind(command)
                 
                 if not results:
                     return [TextContent(
@@ -5,7 +5,7 @@ from pathlib import Path
 import json
 import sqlite3
 from ...modules.data_types import AddCommand, PocketItem
-from ...modules.functionality.add import add
+from ...modules.functionality.add import add, add_batch
 
 @pytest.fixture
 def temp_db_path():
@@ -77,4 +77,26 @@ def test_add_with_tag_normalization(temp_db_path):
     stored_tags = json.loads(row[0])
     assert stored_tags == ["tag", "with-space", "under-score"]
     
-    db.close()
\ No newline at end of file
+    db.close()
+
+def test_add_batch(temp_db_path):
+    commands = [
+        AddCommand(text=f"Batch item {i}", tags=["Batch", f"item_{i}"], db_path=temp_db_path)
+        for i in range(3)
+    ]
+    
+    results = add_batch(commands)
+    
+    assert [r.text for r in results] == ["Batch item 0", "Batch item 1", "Batch item 2"]
+    assert results[1].tags == ["batch", "item-1"]
+    assert len({r.id for r in results}) == 3
+    
+    db = sqlite3.connect(temp_db_path)
+    rows = db.execute("SELECT id, tags FROM POCKET_PICK ORDER BY created").fetchall()
+    db.close()
+    
+    assert [row[0] for row in rows] == [r.id for r in results]
+    assert json.loads(rows[2][1]) == ["batch", "item-2"]
+
+def test_add_batch_empty():
+    assert add_batch([]) == []
@@ -103,4 +103,32 @@ def test_add_file_nonexistent(temp_db_path):
     
     # Expect FileNotFoundError when adding
     with pytest.raises(FileNotFoundError):
-        add_file(command)
\ No newline at end of file
+        add_file(command)
+
+def test_add_file_invalid_utf8(temp_db_path, tmp_path):
+    file_path = tmp_path / "latin1.txt"
+    file_path.write_bytes("café".encode("latin-1"))
+    
+    command = AddFileCommand(
+        file_path=str(file_path),
+        tags=["encoding"],
+        db_path=temp_db_path
+    )
+    
+    result = add_file(command)
+    
+    assert result.text == "caf\ufffd"
+
+def test_add_file_translates_newlines(temp_db_path, tmp_path):
+    file_path = tmp_path / "windows.txt"
+    file_path.write_bytes(b"line one\r\nline two\rline three\n")
+    
+    command = AddFileCommand(
+        file_path=str(file_path),
+        tags=[],
+        db_path=temp_db_path
+    )
+    
+    result = add_file(command)
+    
+    assert result.text == "line one\nline two\nline three\n"
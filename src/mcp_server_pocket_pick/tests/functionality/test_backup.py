@@ -109,4 +109,18 @@ def test_backup_from_nonexistent_db(temp_db_path, temp_backup_path):
     
     # Should return True indicating success (empty database created and backed up)
     assert result is True
-    assert temp_backup_path.exists()
\ No newline at end of file
+    assert temp_backup_path.exists()
+
+def test_backup_from_missing_db(tmp_path, temp_backup_path):
+    # A database path that does not exist is not created just to be copied
+    missing = tmp_path / "missing.db"
+    command = BackupCommand(
+        backup_path=temp_backup_path,
+        db_path=missing
+    )
+    
+    result = backup(command)
+    
+    assert result is False
+    assert not missing.exists()
+    assert not temp_backup_path.exists()
@@ -9,10 +9,19 @@ from unittest.mock import patch, MagicMock
 
 from mcp_server_pocket_pick.modules.data_types import ImportPatternsCommand, SuggestPatternTagsCommand
 from mcp_server_pocket_pick.modules.functionality.import_patterns import import_patterns
-from mcp_server_pocket_pick.modules.functionality.suggest_pattern_tags import suggest_pattern_tags
+from mcp_server_pocket_pick.modules.functionality.suggest_pattern_tags import suggest_pattern_tags, TagSuggestionCache
 
 # ─── Fixtures ─────────────────────────────────────────────────────────────────
 
+@pytest.fixture(autouse=True)
+def tag_cache(tmp_path, monkeypatch):
+    # A cached AI answer from another test would bypass the mocked client
+    # and the error log lands in ./logs, so keep both out of the repo
+    monkeypatch.chdir(tmp_path)
+    cache = TagSuggestionCache(tmp_path / "tag_suggestions.sqlite")
+    with patch('mcp_server_pocket_pick.modules.functionality.suggest_pattern_tags._tag_cache', cache):
+        yield cache
+
 @pytest.fixture
 def sample_descriptions(tmp_path):
     data = {
@@ -141,6 +141,22 @@ def test_import_patterns_with_bodies(sample_descriptions, sample_extracts, patte
     
     conn.close()
 
+def test_import_patterns_with_bodies_without_returned_items(sample_descriptions, sample_extracts, patterns_root, temp_db):
+    command = ImportPatternsWithBodiesCommand(
+        patterns_root=patterns_root,
+        descriptions_path=sample_descriptions,
+        extracts_path=sample_extracts,
+        db_path=temp_db,
+        return_items=False
+    )
+    
+    # Nothing is handed back, but every row is still written
+    assert import_patterns_with_bodies(command) == []
+    
+    conn = sqlite3.connect(temp_db)
+    assert conn.execute("SELECT COUNT(*) FROM POCKET_PICK").fetchone()[0] == 2
+    conn.close()
+
 def test_import_patterns_with_non_existent_patterns_dir(sample_descriptions, sample_extracts, tmp_path, temp_db):
     non_existent_dir = tmp_path / "non_existent"
     
@@ -1,14 +1,17 @@
 import pytest
+import asyncio
 import tempfile
 import os
 from pathlib import Path
 import json
 import sqlite3
+import sys
 from datetime import datetime
 from ...modules.data_types import AddCommand, FindCommand, PocketItem
 from ...modules.functionality.add import add
-from ...modules.functionality.find import find
-from ...modules.init_db import init_db
+from ...modules.functionality import find as find_module
+from ...modules.functionality.find import find, afind, _SQL_CACHE, _find_sql
+from ...modules.init_db import init_db, compile_regex
 
 @pytest.fixture
 def temp_db_path():
@@ -75,6 +78,19 @@ def test_find_fts(populated_db):
     assert len(results) == 1
     assert "SQL databases are powerful" in [r.text for r in results]
     
+def test_find_fts_stemming(populated_db):
+    # The porter tokenizer matches other forms of the same word
+    command = FindCommand(
+        text="program",
+        mode="fts",
+        limit=10,
+        db_path=populated_db
+    )
+    
+    results = find(command)
+    
+    assert [r.text for r in results] == ["Python programming is fun"]
+    
 def test_find_fts_phrase(populated_db):
     # Test FTS with a phrase (multiple words in exact order)
     command = FindCommand(
@@ -180,6 +196,41 @@ def test_find_glob(populated_db):
     assert len(results) == 1
     assert "Testing code is important" in [r.text for r in results]
 
+@pytest.mark.parametrize("mode,text,expected", [
+    ("substr", "PROGRAMMING is", ["Python programming is fun"]),
+    ("substr", "is", ["Learning new technologies is exciting", "Testing code is important", "Python programming is fun"]),
+    ("glob", "*[Pp]rogramming is*", ["Python programming is fun"]),
+    ("glob", "*PROGRAMMING*", []),
+])
+def test_find_trigram_lookup_keeps_pattern_semantics(populated_db, mode, text, expected):
+    command = FindCommand(text=text, mode=mode, limit=10, db_path=populated_db)
+    
+    # Trigram hits are case-folded, so LIKE and GLOB still decide the match
+    assert [r.text for r in find(command)] == expected
+
+def test_substr_plan_starts_from_trigram_index(populated_db):
+    conn = sqlite3.connect(populated_db)
+    try:
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN " + _find_sql("substr", 0, 2), ('"program"', "%program%", 5)
+        ))
+    finally:
+        conn.close()
+    
+    assert "pocket_pick_trigram VIRTUAL TABLE" in plan
+    assert "SEARCH POCKET_PICK USING INTEGER PRIMARY KEY" in plan
+
+def test_find_substr_without_trigram_index(populated_db):
+    command = FindCommand(text="programming", mode="substr", limit=10, db_path=populated_db)
+    find(command)
+    
+    conn = sqlite3.connect(populated_db)
+    conn.execute("DROP TABLE pocket_pick_trigram")
+    conn.close()
+    
+    # An index dropped under a pooled connection falls back to a scan
+    assert [r.text for r in find(command)] == ["Python programming is fun"]
+
 def test_find_regex(populated_db):
     # Search for text containing "regular" (case insensitive)
     command = FindCommand(
@@ -195,6 +246,190 @@ def test_find_regex(populated_db):
     assert len(results) == 1
     assert "Regular expressions can be complex" in [r.text for r in results]
 
+def test_find_regex_applies_limit_after_matching(populated_db):
+    # The only match is the oldest item, so filtering must happen before LIMIT
+    command = FindCommand(
+        text="^python",
+        mode="regex",
+        limit=1,
+        db_path=populated_db
+    )
+    
+    results = find(command)
+    
+    assert [r.text for r in results] == ["Python programming is fun"]
+
+def test_find_invalid_regex(populated_db):
+    command = FindCommand(
+        text="[unclosed",
+        mode="regex",
+        limit=10,
+        db_path=populated_db
+    )
+    
+    assert find(command) == []
+
+def test_find_regex_reuses_compiled_pattern(populated_db):
+    command = FindCommand(
+        text="expressions?",
+        mode="regex",
+        limit=10,
+        db_path=populated_db
+    )
+    
+    find(command)
+    misses = compile_regex.cache_info().misses
+    results = find(command)
+    
+    # The second search compiles nothing, for validation or for REGEXP
+    assert compile_regex.cache_info().misses == misses
+    assert [r.text for r in results] == ["Regular expressions can be complex"]
+
+def test_find_regex_materializes_only_matches(populated_db, monkeypatch):
+    find_module = sys.modules[find.__module__]
+    decoded = []
+    real_deserialize = find_module.deserialize_tags
+    monkeypatch.setattr(
+        find_module, "deserialize_tags",
+        lambda tags_json: decoded.append(tags_json) or real_deserialize(tags_json)
+    )
+    
+    command = FindCommand(
+        text="(?:sql|python) \\w+",
+        mode="regex",
+        limit=10,
+        db_path=populated_db
+    )
+    results = find(command)
+    
+    # Non-matching rows are rejected by REGEXP inside SQLite
+    assert len(results) == 2
+    assert len(decoded) == 2
+
+def test_find_fts_with_multiple_tags(populated_db):
+    command = FindCommand(
+        text="fun OR exciting",
+        mode="fts",
+        limit=10,
+        tags=["fun", "python"],
+        db_path=populated_db
+    )
+    
+    results = find(command)
+    
+    assert [r.text for r in results] == ["Python programming is fun"]
+
+def test_find_reuses_sql_for_same_query_shape(populated_db):
+    first = FindCommand(text="python", mode="substr", tags=["fun"], limit=10, db_path=populated_db)
+    second = FindCommand(text="learning", mode="substr", tags=["fun"], limit=10, db_path=populated_db)
+    
+    find(first)
+    cached = len(_SQL_CACHE)
+    results = find(second)
+    
+    assert len(_SQL_CACHE) == cached
+    assert [r.text for r in results] == ["Learning new technologies is exciting"]
+
+def test_find_regex_literal_prefilter_keeps_matches(populated_db):
+    # "PROGRAMMING" becomes a case-insensitive LIKE prefilter alongside REGEXP
+    command = FindCommand(
+        text="PROGRAMMING is (fun|boring)",
+        mode="regex",
+        limit=10,
+        db_path=populated_db
+    )
+    
+    results = find(command)
+    
+    assert [r.text for r in results] == ["Python programming is fun"]
+
+def test_find_regex_prefilter_respects_unicode_case_folding(temp_db_path):
+    # IGNORECASE matches "k" against the Kelvin sign, which LIKE cannot fold
+    add(AddCommand(text="\u212aelvin scale", tags=[], db_path=temp_db_path))
+    command = FindCommand(
+        text="kelvin scale",
+        mode="regex",
+        limit=10,
+        db_path=temp_db_path
+    )
+    
+    assert [r.text for r in find(command)] == ["\u212aelvin scale"]
+
+@pytest.mark.parametrize("pattern", [r"\x41bcd", r"\101bcd"])
+def test_find_regex_prefilter_skips_numeric_escapes(temp_db_path, pattern):
+    # The escape digits spell "A"; they must not become part of a LIKE literal
+    add(AddCommand(text="Abcd", tags=[], db_path=temp_db_path))
+    command = FindCommand(
+        text=pattern,
+        mode="regex",
+        limit=10,
+        db_path=temp_db_path
+    )
+    
+    assert [r.text for r in find(command)] == ["Abcd"]
+
+def test_afind_matches_find(populated_db):
+    command = FindCommand(text="programming", mode="substr", limit=10, db_path=populated_db)
+    
+    assert asyncio.run(afind(command)) == find(command)
+
+def test_hybrid_find_cache_tracks_database_and_writes(tmp_path):
+    first_db = tmp_path / "first.db"
+    second_db = tmp_path / "second.db"
+    add(AddCommand(text="python tips", tags=[], db_path=first_db))
+    add(AddCommand(text="python tricks", tags=[], db_path=second_db))
+    
+    command = FindCommand(text="python", mode="hybrid", limit=5, db_path=first_db)
+    assert [r.text for r in find(command)] == ["python tips"]
+    
+    # The shared engine's cached results belong to the database searched
+    other = FindCommand(text="python", mode="hybrid", limit=5, db_path=second_db)
+    assert [r.text for r in find(other)] == ["python tricks"]
+    
+    # and are not served again once that database has changed
+    add(AddCommand(text="python recipes", tags=[], db_path=first_db))
+    assert sorted(r.text for r in find(command)) == ["python recipes", "python tips"]
+
+def test_hybrid_find_shares_one_engine_across_limits(tmp_path):
+    db_path = tmp_path / "limits.db"
+    for word in ("tips", "tricks", "recipes"):
+        add(AddCommand(text=f"python {word}", tags=[], db_path=db_path))
+    
+    small = FindCommand(text="python", mode="hybrid", limit=1, db_path=db_path)
+    large = FindCommand(text="python", mode="hybrid", limit=3, db_path=db_path)
+    
+    assert len(find(small)) == 1
+    engine = find_module._ENGINE
+    # A larger limit reuses the engine but not the smaller cached result
+    assert len(find(large)) == 3
+    assert find_module._ENGINE is engine
+
+def test_fork_reset_drops_shared_engine(monkeypatch):
+    monkeypatch.setattr(find_module, "_ENGINE", object())
+    monkeypatch.setattr(find_module, "_HYBRID_EXECUTOR", find_module._HYBRID_EXECUTOR)
+    executor = find_module._HYBRID_EXECUTOR
+    
+    find_module._reset_after_fork()
+    
+    assert find_module._ENGINE is None
+    assert find_module._HYBRID_EXECUTOR is not executor
+
+def test_tagged_fts_plan_starts_from_match(populated_db):
+    db = init_db(populated_db)
+    try:
+        query = _find_sql("fts", 2, 1)
+        plan = [row[-1] for row in db.execute(
+            f"EXPLAIN QUERY PLAN {query}", ["fun", "fun", "python", 2, 10]
+        )]
+        
+        # The FTS index produces the candidate rows, items are fetched by
+        # rowid and tags only filter them; POCKET_PICK is never scanned
+        assert any(step.startswith("SCAN pocket_pick_fts VIRTUAL TABLE INDEX") for step in plan)
+        assert "SEARCH POCKET_PICK USING INTEGER PRIMARY KEY (rowid=?)" in plan
+        assert "SCAN POCKET_PICK" not in plan
+    finally:
+        db.close()
+
 def test_find_exact(populated_db):
     # Search for exact match
     command = FindCommand(
@@ -2,9 +2,10 @@ import pytest
 import tempfile
 import os
 from pathlib import Path
-from ...modules.data_types import AddCommand, ListTagsCommand
+from ...modules.data_types import AddCommand, ListTagsCommand, RemoveCommand
 from ...modules.functionality.add import add
 from ...modules.functionality.list_tags import list_tags
+from ...modules.functionality.remove import remove
 
 @pytest.fixture
 def temp_db_path():
@@ -105,4 +106,14 @@ def test_list_tags_empty_db(temp_db_path):
     results = list_tags(command)
     
     # Should return empty list
-    assert len(results) == 0
\ No newline at end of file
+    assert len(results) == 0
+
+def test_list_tags_follows_removals(temp_db_path):
+    kept = add(AddCommand(text="Kept", tags=["shared", "kept"], db_path=temp_db_path))
+    removed = add(AddCommand(text="Removed", tags=["shared", "gone"], db_path=temp_db_path))
+    
+    remove(RemoveCommand(id=removed.id, db_path=temp_db_path))
+    
+    # Counts come from the trigger-maintained tag table
+    results = list_tags(ListTagsCommand(limit=10, db_path=temp_db_path))
+    assert results == [{"tag": "kept", "count": 1}, {"tag": "shared", "count": 1}]
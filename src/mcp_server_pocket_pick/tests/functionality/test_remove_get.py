@@ -3,10 +3,12 @@ import tempfile
 import os
 from pathlib import Path
 import sqlite3
-from ...modules.data_types import AddCommand, RemoveCommand, GetCommand
+from ...modules.data_types import AddCommand, RemoveCommand, RemoveManyCommand, GetCommand, GetManyCommand
 from ...modules.functionality.add import add
-from ...modules.functionality.remove import remove
-from ...modules.functionality.get import get
+from ...modules.functionality import remove as remove_module
+from ...modules.functionality.remove import remove, remove_many
+from ...modules.functionality import get as get_module
+from ...modules.functionality.get import get, get_many
 
 @pytest.fixture
 def temp_db_path():
@@ -102,4 +104,37 @@ def test_remove_nonexistent_item(temp_db_path):
     result = remove(command)
     
     # Should return False indicating failure
-    assert result is False
\ No newline at end of file
+    assert result is False
+
+def test_get_many_keeps_requested_order(temp_db_path, monkeypatch):
+    ids = [
+        add(AddCommand(text=f"Item {i}", tags=["batch"], db_path=temp_db_path)).id
+        for i in range(5)
+    ]
+    
+    # Force several chunks so the split path is exercised
+    monkeypatch.setattr(get_module, "MAX_IDS_PER_QUERY", 2)
+    
+    requested = [ids[3], "nonexistent-id", ids[0], ids[4], ids[1], ids[3]]
+    results = get_many(GetManyCommand(ids=requested, db_path=temp_db_path))
+    
+    assert [item.id for item in results] == [ids[3], ids[0], ids[4], ids[1], ids[3]]
+    assert results[1].text == "Item 0"
+    assert results[1].tags == ["batch"]
+    assert get_many(GetManyCommand(ids=[], db_path=temp_db_path)) == []
+
+def test_remove_many_counts_removed_items(temp_db_path, monkeypatch):
+    ids = [
+        add(AddCommand(text=f"Item {i}", tags=["batch"], db_path=temp_db_path)).id
+        for i in range(5)
+    ]
+    
+    # Force several chunks so the split path is exercised
+    monkeypatch.setattr(remove_module, "MAX_IDS_PER_QUERY", 2)
+    
+    removed = remove_many(RemoveManyCommand(ids=[ids[0], "nonexistent-id", ids[2], ids[4], ids[0]], db_path=temp_db_path))
+    
+    assert removed == 3
+    remaining = get_many(GetManyCommand(ids=ids, db_path=temp_db_path))
+    assert [item.id for item in remaining] == [ids[1], ids[3]]
+    assert remove_many(RemoveManyCommand(ids=[], db_path=temp_db_path)) == 0
@@ -1,10 +1,24 @@
 import pytest
 from pathlib import Path
 import sys
+import types
+import asyncio
+import threading
+import time
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from mcp_server_pocket_pick.modules.functionality.suggest_pattern_tags import suggest_pattern_tags, SuggestPatternTagsResponse
 from mcp_server_pocket_pick.modules.data_types import SuggestPatternTagsCommand
+import mcp_server_pocket_pick.modules.functionality.suggest_pattern_tags as spt
+
+@pytest.fixture(autouse=True)
+def tag_cache(tmp_path, monkeypatch):
+    # Keep cached AI answers out of the user's real cache and between tests,
+    # and the ./logs error log out of the repo
+    monkeypatch.chdir(tmp_path)
+    cache = spt.TagSuggestionCache(tmp_path / "tag_suggestions.sqlite")
+    monkeypatch.setattr(spt, '_tag_cache', cache)
+    return cache
 
 def test_file_not_found():
     cmd = SuggestPatternTagsCommand(pattern_path=Path('nonexistent.md'), num_tags=3)
@@ -25,6 +39,18 @@ def test_fallback_keywords(tmp_path):
     assert set(resp.tags) & {"consciousness", "emergence", "practice", "collective", "intelligence"}
     assert resp.source in ('fallback', 'ai')
 
+def test_fallback_keywords_match_substrings_in_keyword_order(monkeypatch, tmp_path):
+    def no_anthropic():
+        raise ImportError("No module named 'anthropic'")
+    monkeypatch.setattr(spt, 'import_anthropic', no_anthropic)
+    f = tmp_path / "pattern.md"
+    # "emergence" only appears overlapping the end of "intelligence"
+    f.write_text("RITUAL practices and SystemsThinking with intelligencemergence")
+    cmd = SuggestPatternTagsCommand(pattern_path=f, num_tags=10)
+    resp = spt.suggest_pattern_tags(cmd)
+    assert resp.tags == ["emergence", "intelligence", "systems", "thinking", "ritual", "practice"]
+    assert resp.source == 'fallback'
+
 def test_fallback_nltk(tmp_path):
     pattern = """
     This pattern is about learning, teaching, and the process of education and knowledge transfer.
@@ -58,3 +84,107 @@ def test_ai_path(monkeypatch, tmp_path):
     assert resp.tags == ["ai_tag1", "ai_tag2", "ai_tag3"]
     assert resp.source == 'ai'
     assert resp.confidence == [0.8, 0.8, 0.8]
+
+def test_ai_path_reuses_cached_response(monkeypatch, tmp_path, tag_cache):
+    calls = []
+    class DummyMessage:
+        def __init__(self, text):
+            self.content = [type('obj', (), {'text': text})]
+    class DummyAnthropic:
+        class messages:
+            @staticmethod
+            def create(**kwargs):
+                calls.append(kwargs)
+                return DummyMessage('["cached1", "cached2"]')
+    monkeypatch.setattr(spt, 'import_anthropic', lambda: type('obj', (), {'Anthropic': lambda: DummyAnthropic}))
+    f = tmp_path / "pattern.md"
+    f.write_text("Pattern body for the cache.")
+    cmd = SuggestPatternTagsCommand(pattern_path=f, num_tags=3)
+    
+    first = spt.suggest_pattern_tags(cmd)
+    second = spt.suggest_pattern_tags(cmd)
+    
+    assert len(calls) == 1
+    assert first.tags == second.tags == ["cached1", "cached2"]
+    assert second.source == 'ai'
+    
+    # A different request misses the cache
+    spt.suggest_pattern_tags(SuggestPatternTagsCommand(pattern_path=f, num_tags=5))
+    assert len(calls) == 2
+
+def test_tag_cache_expires_entries(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(spt.time, "time", lambda: clock[0])
+    
+    cache = spt.TagSuggestionCache(tmp_path / "ttl.sqlite", ttl_seconds=60)
+    key = spt.TagSuggestionCache.key("model", 10, "prompt")
+    cache.set(key, ["fresh"])
+    assert cache.get(key) == ["fresh"]
+    
+    clock[0] += 61
+    assert cache.get(key) is None
+
+def test_tag_cache_not_opened_without_anthropic(monkeypatch, tmp_path):
+    opened = []
+    monkeypatch.setattr(spt, '_tag_cache', None)
+    monkeypatch.setattr(spt, 'TagSuggestionCache', lambda *args: opened.append(args))
+    def no_anthropic():
+        raise ImportError("No module named 'anthropic'")
+    monkeypatch.setattr(spt, 'import_anthropic', no_anthropic)
+    f = tmp_path / "pattern.md"
+    f.write_text("A ritual practice pattern.")
+    
+    resp = spt.suggest_pattern_tags(SuggestPatternTagsCommand(pattern_path=f, num_tags=3))
+    
+    assert resp.source == 'fallback'
+    assert opened == []
+
+def test_tag_cache_failed_open_is_not_retried(monkeypatch):
+    attempts = []
+    def unwritable(*args):
+        attempts.append(args)
+        raise PermissionError("read-only home")
+    monkeypatch.setattr(spt, '_tag_cache', None)
+    monkeypatch.setattr(spt, '_tag_cache_failed', False)
+    monkeypatch.setattr(spt, 'TagSuggestionCache', unwritable)
+    
+    assert spt.get_tag_cache() is None
+    assert spt.get_tag_cache() is None
+    assert len(attempts) == 1
+
+def test_nltk_setup_runs_once(monkeypatch):
+    downloads = []
+    fake_nltk = types.ModuleType("nltk")
+    fake_nltk.download = lambda name, quiet=False: downloads.append(name)
+    fake_corpus = types.ModuleType("nltk.corpus")
+    fake_corpus.stopwords = type('obj', (), {'words': staticmethod(lambda lang: ["the", "and"])})
+    fake_nltk.corpus = fake_corpus
+    monkeypatch.setitem(sys.modules, "nltk", fake_nltk)
+    monkeypatch.setitem(sys.modules, "nltk.corpus", fake_corpus)
+    monkeypatch.setattr(spt, '_nltk_ready', False)
+    monkeypatch.setattr(spt, '_stop_words', None)
+    
+    assert spt._ensure_nltk() == frozenset({"the", "and"})
+    assert spt._ensure_nltk() is spt._ensure_nltk()
+    assert downloads == ['punkt', 'averaged_perceptron_tagger', 'stopwords']
+
+def test_suggest_many_overlaps_calls_and_keeps_order(monkeypatch):
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+    
+    def fake_suggest(command):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return SuggestPatternTagsResponse(tags=[command.pattern_path.name], source='fallback')
+    monkeypatch.setattr(spt, 'suggest_pattern_tags', fake_suggest)
+    
+    commands = [SuggestPatternTagsCommand(pattern_path=Path(f"p{i}.md")) for i in range(6)]
+    responses = asyncio.run(spt.asuggest_pattern_tags_many(commands, max_concurrency=3))
+    
+    assert [r.tags for r in responses] == [[f"p{i}.md"] for i in range(6)]
+    assert 1 < peak[0] <= 3
@@ -6,7 +6,7 @@ import json
 import sqlite3
 from ...modules.data_types import AddCommand, ToFileByIdCommand, PocketItem
 from ...modules.functionality.add import add
-from ...modules.functionality.to_file_by_id import to_file_by_id
+from ...modules.functionality.to_file_by_id import to_file_by_id, to_files_by_ids
 
 @pytest.fixture
 def temp_db_path():
@@ -150,4 +150,22 @@ def test_to_file_by_id_handles_errors(temp_db_path, sample_item, monkeypatch):
     finally:
         # Clean up the temp file if it was created
         if os.path.exists(output_path):
-            os.unlink(output_path)
\ No newline at end of file
+            os.unlink(output_path)
+
+def test_to_files_by_ids_writes_each_item(temp_db_path, tmp_path):
+    items = [
+        add(AddCommand(text=f"Exported item {i}", tags=["export"], db_path=temp_db_path))
+        for i in range(4)
+    ]
+    commands = [
+        ToFileByIdCommand(id=item.id, output_file_path_abs=tmp_path / "out" / f"{i}.txt", db_path=temp_db_path)
+        for i, item in enumerate(items)
+    ]
+    commands.insert(2, ToFileByIdCommand(id="nonexistent-id", output_file_path_abs=tmp_path / "missing.txt", db_path=temp_db_path))
+    
+    results = to_files_by_ids(commands)
+    
+    assert results == [True, True, False, True, True]
+    for i in range(4):
+        assert (tmp_path / "out" / f"{i}.txt").read_text(encoding="utf-8") == f"Exported item {i}"
+    assert not (tmp_path / "missing.txt").exists()
@@ -0,0 +1,314 @@
+"""
+Test cases for the caching layer
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from ..modules import cache_layer
+from ..modules.cache_layer import LRUCache, EmbeddingCache, SearchResultCache, PatternIndexCache, AppendLogCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache[int](max_size=3)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    # Touch "a" so "b" becomes the least recently used entry
+    assert cache.get("a") == 1
+
+    cache.set("d", 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.get("d") == 4
+    assert cache.size() == 3
+
+
+def test_lru_cache_overwrite_refreshes_entry():
+    cache = LRUCache[int](max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+    cache.set("c", 3)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_lru_cache_delete_and_clear():
+    cache = LRUCache[int](max_size=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.delete("a") is True
+    assert cache.delete("a") is False
+    assert cache.get("a") is None
+
+    cache.clear()
+    assert cache.size() == 0
+
+
+def test_lru_cache_sharded_capacity():
+    cache = LRUCache[int](max_size=1024)
+    assert cache.stats()['shards'] == LRUCache.SHARD_COUNT
+
+    for i in range(5000):
+        cache.set(f"key-{i}", i)
+
+    # Each shard is bounded, so the total never exceeds max_size
+    assert cache.size() <= 1024
+    assert cache.get("key-4999") == 4999
+
+
+def test_lru_cache_small_uses_single_shard():
+    cache = LRUCache[int](max_size=10)
+    assert cache.stats()['shards'] == 1
+
+
+def test_lru_cache_expires_entries(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_layer.time, "monotonic", lambda: clock[0])
+
+    cache = LRUCache[int](max_size=10, ttl_minutes=1)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    clock[0] += 61
+    assert cache.get("a") is None
+    assert cache.size() == 0
+
+
+def test_lru_cache_sweeps_unread_expired_entries(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_layer.time, "monotonic", lambda: clock[0])
+
+    cache = LRUCache[int](max_size=100, ttl_minutes=1)
+    for i in range(10):
+        cache.set(f"stale-{i}", i)
+
+    clock[0] += 61
+    for i in range(LRUCache.SWEEP_INTERVAL):
+        cache.set(f"fresh-{i % 5}", i)
+
+    # The sweep sample covers the whole cache, so no stale entry survives
+    assert cache.size() == 5
+
+
+def test_embedding_cache_disk_roundtrip(tmp_path):
+    embedding = np.arange(384, dtype=np.float32)
+
+    cache = EmbeddingCache(disk_cache_dir=tmp_path / "embeddings")
+    cache.set_embedding("hello world", "test-model", embedding)
+
+    # A fresh instance has an empty memory cache and must decode from disk
+    reloaded = EmbeddingCache(disk_cache_dir=tmp_path / "embeddings")
+    cached = reloaded.get_embedding("hello world", "test-model")
+
+    assert cached is not None
+    assert cached.dtype == np.float32
+    assert np.array_equal(cached, embedding)
+    assert reloaded.get_embedding("missing", "test-model") is None
+
+
+def test_embedding_cache_batch_set(tmp_path):
+    items = [
+        (f"text {i}", "test-model", np.full(8, i, dtype=np.float32))
+        for i in range(5)
+    ]
+
+    cache = EmbeddingCache(disk_cache_dir=tmp_path / "embeddings")
+    cache.set_embeddings_batch(items)
+
+    reloaded = EmbeddingCache(disk_cache_dir=tmp_path / "embeddings")
+    for text, model_name, embedding in items:
+        assert np.array_equal(reloaded.get_embedding(text, model_name), embedding)
+
+
+def test_search_result_cache_key_is_order_insensitive():
+    cache = SearchResultCache()
+    results = [{"id": "1"}]
+    cache.set_results("  Python ", ["b", "a"], "fts", results, limit=5)
+
+    assert cache.get_results("python", ["a", "b"], "fts", limit=5) == results
+    assert cache.get_results("python", ["a", "b"], "fts", limit=10) is None
+    assert cache.get_results("python", ["a"], "fts", limit=5) is None
+
+
+def test_embedding_cache_npy_backend(tmp_path):
+    embedding = np.linspace(0, 1, 16, dtype=np.float32)
+
+    cache = EmbeddingCache(disk_cache_dir=tmp_path / "npy", disk_backend="npy")
+    cache.set_embedding("hello", "test-model", embedding)
+
+    reloaded = EmbeddingCache(disk_cache_dir=tmp_path / "npy", disk_backend="npy")
+    cached = reloaded.get_embedding("hello", "test-model")
+
+    assert isinstance(cached, np.memmap)
+    assert np.array_equal(cached, embedding)
+    assert reloaded.stats()['disk_cache']['size'] == 1
+
+    reloaded.clear()
+    assert EmbeddingCache(disk_cache_dir=tmp_path / "npy", disk_backend="npy").get_embedding("hello", "test-model") is None
+
+
+def test_embedding_cache_appendlog_backend(tmp_path):
+    embedding = np.linspace(0, 1, 16, dtype=np.float32)
+
+    cache = EmbeddingCache(disk_cache_dir=tmp_path / "log", disk_backend="appendlog")
+    cache.set_embeddings_batch([("hello", "test-model", embedding), ("other", "test-model", embedding * 2)])
+
+    # A fresh instance rebuilds its index by scanning the log
+    reloaded = EmbeddingCache(disk_cache_dir=tmp_path / "log", disk_backend="appendlog")
+    cached = reloaded.get_embedding("hello", "test-model")
+
+    assert not cached.flags.writeable
+    assert np.array_equal(cached, embedding)
+    assert np.array_equal(reloaded.get_embedding("other", "test-model"), embedding * 2)
+    assert reloaded.stats()['disk_cache']['size'] == 2
+
+    reloaded.clear()
+    assert np.array_equal(cached, embedding)
+    assert EmbeddingCache(disk_cache_dir=tmp_path / "log", disk_backend="appendlog").get_embedding("hello", "test-model") is None
+
+
+def test_append_log_overwrite_delete_and_torn_tail(tmp_path):
+    log = AppendLogCache(tmp_path / "log")
+    log.set("a", np.arange(3, dtype=np.float32))
+    log.set("a", np.arange(6, dtype=np.float64).reshape(2, 3))
+    log.set("b", np.ones(4, dtype=np.float16))
+    assert log.delete("b") is True
+    assert log.delete("b") is False
+
+    # Simulate a crash in the middle of an append
+    with open(log.log_path, "ab") as f:
+        f.write(b"\x05\x00\x01")
+    size_before = log.log_path.stat().st_size
+
+    reopened = AppendLogCache(tmp_path / "log")
+    assert np.array_equal(reopened.get("a"), np.arange(6, dtype=np.float64).reshape(2, 3))
+    assert reopened.get("b") is None
+    assert reopened.log_path.stat().st_size == size_before - 3
+
+    # Appends after recovery are readable on the next open
+    reopened.set("c", np.full(2, 7, dtype=np.int8))
+    assert np.array_equal(AppendLogCache(tmp_path / "log").get("c"), np.full(2, 7, dtype=np.int8))
+
+
+
+def test_append_log_writers_share_one_log(tmp_path):
+    first = AppendLogCache(tmp_path / "log")
+    second = AppendLogCache(tmp_path / "log")
+
+    first.set("a", np.arange(4, dtype=np.float32))
+    # The second writer appends after the first one's record and indexes it
+    second.set("b", np.full(3, 2, dtype=np.int8))
+    first.set("c", np.ones(2, dtype=np.float64))
+
+    assert np.array_equal(second.get("a"), np.arange(4, dtype=np.float32))
+    assert np.array_equal(first.get("b"), np.full(3, 2, dtype=np.int8))
+    assert second.delete("c") is True
+
+    reopened = AppendLogCache(tmp_path / "log")
+    assert np.array_equal(reopened.get("a"), np.arange(4, dtype=np.float32))
+    assert np.array_equal(reopened.get("b"), np.full(3, 2, dtype=np.int8))
+    assert reopened.get("c") is None
+
+
+def test_append_log_recovers_from_partial_write(tmp_path, monkeypatch):
+    log = AppendLogCache(tmp_path / "log")
+    log.set("a", np.arange(4, dtype=np.float32))
+    size_before = log.log_path.stat().st_size
+
+    real_write = os.write
+
+    def write_half_then_fail(fd, data):
+        real_write(fd, bytes(data[:len(data) // 2]))
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(cache_layer.os, "write", write_half_then_fail)
+    log.set("b", np.ones(8, dtype=np.float32))
+    monkeypatch.undo()
+
+    assert log.get("b") is None
+    log.set("c", np.full(2, 3, dtype=np.float32))
+    assert log.log_path.stat().st_size > size_before
+
+    reopened = AppendLogCache(tmp_path / "log")
+    assert np.array_equal(reopened.get("a"), np.arange(4, dtype=np.float32))
+    assert reopened.get("b") is None
+    assert np.array_equal(reopened.get("c"), np.full(2, 3, dtype=np.float32))
+
+def test_embedding_cache_memory_tier_holds_bytes():
+    embedding = np.ones(4, dtype=np.float32)
+
+    cache = EmbeddingCache()
+    cache.set_embedding("hello", "test-model", embedding)
+
+    key = cache._hash_key("hello", "test-model")
+    assert isinstance(cache.memory_cache.get(key), bytes)
+    assert np.array_equal(cache.get_embedding("hello", "test-model"), embedding)
+
+
+@pytest.mark.parametrize("quantization,tolerance", [("fp16", 1e-3), ("int8", 1e-2)])
+def test_embedding_cache_quantization(tmp_path, quantization, tolerance):
+    rng = np.random.default_rng(0)
+    embedding = rng.standard_normal(384).astype(np.float32)
+    embedding /= np.linalg.norm(embedding)
+
+    cache = EmbeddingCache(disk_cache_dir=tmp_path / "q", quantization=quantization)
+    cache.set_embedding("hello", "test-model", embedding)
+
+    key = cache._hash_key("hello", "test-model")
+    assert len(cache.memory_cache.get(key)) < embedding.nbytes
+
+    reloaded = EmbeddingCache(disk_cache_dir=tmp_path / "q", quantization=quantization)
+    cached = reloaded.get_embedding("hello", "test-model")
+
+    assert cached.dtype == np.float32
+    assert np.allclose(cached, embedding, atol=tolerance)
+
+
+def test_embedding_cache_rejects_unknown_quantization():
+    with pytest.raises(ValueError):
+        EmbeddingCache(quantization="int4")
+
+
+def test_pattern_index_cache_shared_through_file(tmp_path):
+    index = {"summarize": {"slug": "summarize", "tags": ["writing"]}}
+
+    writer = PatternIndexCache(cache_dir=tmp_path / "index")
+    writer.set_index("./patterns", index)
+
+    # A second instance, as in another process, reads the written file
+    reader = PatternIndexCache(cache_dir=tmp_path / "index")
+    assert reader.get_index("./patterns") == index
+    assert reader.get_index("./other") is None
+
+    updated = {"extract": {"slug": "extract", "tags": []}}
+    writer.set_index("./patterns", updated)
+    path = writer._path("./patterns")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+    assert reader.get_index("./patterns") == updated
+
+    writer.invalidate_index("./patterns")
+    assert reader.get_index("./patterns") is None
+
+
+def test_lru_cache_overwrite_when_full_keeps_other_entries():
+    cache = LRUCache[int](max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("b", 20)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") == 20
+
+
+def test_cache_entry_has_no_instance_dict():
+    entry = cache_layer.CacheEntry(data=1, created_at=0.0, accessed_at=0.0)
+    assert not hasattr(entry, "__dict__")
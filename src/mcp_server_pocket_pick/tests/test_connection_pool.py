@@ -0,0 +1,194 @@
+"""
+Test cases for the SQLite connection pool
+"""
+
+import threading
+
+import pytest
+
+from ..modules.connection_pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(tmp_path / "pool.db", pool_size=3, max_connections=5)
+    yield pool
+    pool.close_all()
+
+
+def test_connection_roundtrip(pool):
+    with pool.get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
+            ("1", "2024-01-01T00:00:00", "pooled", "[]")
+        )
+        conn.commit()
+
+    with pool.get_db_connection() as conn:
+        row = conn.execute("SELECT text FROM POCKET_PICK WHERE id = ?", ("1",)).fetchone()
+
+    assert row == ("pooled",)
+
+
+def test_remove_stale_connections_keeps_fresh_ones(pool):
+    # Borrow every pooled connection so we can mark one as idle for too long
+    conns = [pool._borrow_connection() for _ in range(3)]
+    conns[0].last_used -= (pool.max_idle_minutes + 1) * 60
+    for conn in conns:
+        pool.return_connection(conn)
+
+    assert pool._remove_stale_connections() == 1
+
+    stats = pool.get_stats()
+    assert stats['pool_size'] == 2
+    assert stats['total_connections'] == 2
+
+
+def test_thread_reuses_its_connection(pool):
+    with pool.get_db_connection() as first:
+        pass
+    with pool.get_db_connection() as second:
+        pass
+
+    assert first is second
+    assert pool.get_stats()['borrowed'] == 1
+
+
+def test_thread_connection_returns_to_pool_on_exit(pool):
+    seen = []
+
+    def worker():
+        with pool.get_db_connection() as conn:
+            seen.append(conn)
+        # The connection stays with the thread after the block exits
+        seen.append(pool.get_stats()['pool_size'])
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    conn, pool_size_while_alive = seen
+    assert pool_size_while_alive == 2
+    assert not conn.closed
+    assert pool.get_stats()['pool_size'] == 3
+
+
+def test_pool_grows_to_max_connections(tmp_path):
+    pool = ConnectionPool(tmp_path / "grow.db", pool_size=1, max_connections=2, connection_timeout=0.01)
+    try:
+        first = pool._borrow_connection()
+        second = pool._borrow_connection()
+        third = pool._borrow_connection()
+
+        assert first is not None and second is not None
+        assert first is not second
+        assert third is None
+        assert pool.get_stats()['total_connections'] == 2
+    finally:
+        pool.close_all()
+
+
+def test_close_all_stops_cleanup_thread(tmp_path):
+    pool = ConnectionPool(tmp_path / "stop.db", pool_size=1)
+    pool.close_all()
+    pool._cleanup_thread.join(timeout=1)
+
+    assert not pool._cleanup_thread.is_alive()
+
+
+def test_failed_block_rolls_back(pool):
+    with pytest.raises(RuntimeError):
+        with pool.get_db_connection() as conn:
+            conn.execute(
+                "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
+                ("1", "2024-01-01T00:00:00", "uncommitted", "[]")
+            )
+            raise RuntimeError("boom")
+
+    with pool.get_db_connection() as conn:
+        assert not conn.connection.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM POCKET_PICK").fetchone() == (0,)
+
+
+def test_pooled_connections_are_tuned(pool):
+    with pool.get_db_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        assert conn.execute("PRAGMA cache_size").fetchone() == (-65536,)
+        assert conn.execute("PRAGMA threads").fetchone() == (4,)
+
+
+def test_more_threads_than_max_connections(tmp_path):
+    pool = ConnectionPool(tmp_path / "busy.db", pool_size=1, max_connections=2, connection_timeout=0.01)
+    done = threading.Event()
+    errors = []
+
+    def worker(ran):
+        try:
+            with pool.get_db_connection() as conn:
+                conn.execute("SELECT COUNT(*) FROM POCKET_PICK").fetchone()
+        except Exception as e:
+            errors.append(e)
+        ran.set()
+        # Stay alive and idle, keeping the thread-local connection
+        done.wait()
+
+    threads = []
+    try:
+        # Each thread queries in turn and outlives the next one's query
+        for _ in range(3):
+            ran = threading.Event()
+            thread = threading.Thread(target=worker, args=(ran,))
+            thread.start()
+            threads.append(thread)
+            ran.wait()
+
+        assert errors == []
+        assert pool.get_stats()['total_connections'] == 2
+    finally:
+        done.set()
+        for thread in threads:
+            thread.join()
+        pool.close_all()
+
+
+def test_nested_scope_keeps_connection_in_use(pool):
+    with pool.get_db_connection() as outer:
+        with pool.get_db_connection() as inner:
+            assert inner is outer
+        # The inner exit must not let another thread reclaim it mid-read
+        assert outer.in_use
+        assert pool._reclaim_idle_connection() is None
+
+    assert not outer.in_use
+
+
+def test_nested_failure_leaves_outer_transaction_alone(pool):
+    with pool.get_db_connection() as outer:
+        outer.execute(
+            "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
+            ("1", "2024-01-01T00:00:00", "outer write", "[]")
+        )
+        with pytest.raises(RuntimeError):
+            with pool.get_db_connection():
+                raise RuntimeError("inner")
+
+        assert outer.connection.in_transaction
+        outer.commit()
+
+    with pool.get_db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM POCKET_PICK").fetchone() == (1,)
+
+
+def test_leaked_transaction_is_rolled_back_on_release(pool, caplog):
+    with pool.get_db_connection() as conn:
+        conn.execute(
+            "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
+            ("1", "2024-01-01T00:00:00", "never committed", "[]")
+        )
+
+    assert "open transaction" in caplog.text
+
+    # The next user starts clean instead of inheriting, or committing, it
+    with pool.get_db_connection() as conn:
+        assert not conn.connection.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM POCKET_PICK").fetchone() == (0,)
@@ -3,7 +3,8 @@ import tempfile
 import os
 from pathlib import Path
 import sqlite3
-from ..modules.init_db import init_db, normalize_tag, normalize_tags
+from datetime import datetime
+from ..modules.init_db import init_db, normalize_tag, normalize_tags, serialize_tags, deserialize_tags, parse_created, tag_filter_clause, like_search_words, insert_items, INSERT_CHUNK_ROWS
 
 def test_init_db():
     # Create a temporary file path
@@ -52,8 +53,228 @@ def test_normalize_tag():
     # Test combined operations
     assert normalize_tag("  MY_TAG with SPACES  ") == "my-tag-with-spaces"
     
+    # Repeated tags come back from the cache as the same object
+    assert normalize_tag("Cached Tag") is normalize_tag("Cached Tag")
+    
 def test_normalize_tags():
     tags = ["TAG1", "  tag2  ", "my_tag3", "My Tag4"]
     normalized = normalize_tags(tags)
     
-    assert normalized == ["tag1", "tag2", "my-tag3", "my-tag4"]
\ No newline at end of file
+    assert normalized == ["tag1", "tag2", "my-tag3", "my-tag4"]
+
+
+def test_serialize_tags_roundtrip():
+    tags = ["python", "my-tag", "ünïcode"]
+    serialized = serialize_tags(tags)
+    
+    # Stored as compact JSON with non-ASCII characters kept as-is
+    assert serialized == '["python","my-tag","ünïcode"]'
+    assert deserialize_tags(serialized) == tags
+    assert deserialize_tags('["a", "b"]') == ["a", "b"]
+    assert deserialize_tags("[]") == []
+
+def test_deserialize_tags_returns_independent_lists():
+    first = deserialize_tags('["python","web"]')
+    first.append("mutated")
+    
+    # Decoded tag sets are cached, but each caller gets its own list
+    assert deserialize_tags('["python","web"]') == ["python", "web"]
+
+def test_like_search_words_longest_first():
+    assert like_search_words("a quick brown fox a") == ["quick", "brown", "fox", "a"]
+    assert like_search_words("   ") == []
+
+def test_parse_created_roundtrip():
+    created = datetime(2024, 5, 1, 12, 34, 56, 123456)
+    assert parse_created(created.isoformat()) == created
+
+@pytest.mark.parametrize("n_rows", [1, INSERT_CHUNK_ROWS, 2 * INSERT_CHUNK_ROWS + 7])
+def test_insert_items_in_chunks(tmp_path, n_rows):
+    db = init_db(tmp_path / "insert.db")
+    try:
+        rows = [(str(i), "2024-01-01T00:00:00", f"item {i}", '["bulk"]') for i in range(n_rows)]
+        insert_items(db, rows)
+        db.commit()
+        
+        assert db.execute("SELECT COUNT(*) FROM POCKET_PICK").fetchone() == (n_rows,)
+        assert db.execute("SELECT text FROM POCKET_PICK WHERE id = ?", (str(n_rows - 1),)).fetchone() == (f"item {n_rows - 1}",)
+        # Triggers still fire for every row of a multi-row statement
+        assert db.execute("SELECT COUNT(*) FROM POCKET_PICK_TAGS WHERE tag = 'bulk'").fetchone() == (n_rows,)
+    finally:
+        db.close()
+
+def test_tag_table_tracks_items(tmp_path):
+    db = init_db(tmp_path / "tags.db")
+    try:
+        db.execute(
+            "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
+            ("1", "2024-01-01T00:00:00", "first", '["python","web"]')
+        )
+        db.execute(
+            "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
+            ("2", "2024-01-02T00:00:00", "second", '["python"]')
+        )
+        
+        clause, params = tag_filter_clause(["python", "web", "python"])
+        rows = db.execute(f"SELECT id FROM POCKET_PICK WHERE {clause}", params).fetchall()
+        assert rows == [("1",)]
+        
+        db.execute("UPDATE POCKET_PICK SET tags = ? WHERE id = ?", ('["web"]', "2"))
+        db.execute("DELETE FROM POCKET_PICK WHERE id = ?", ("1",))
+        assert db.execute("SELECT item_id, tag FROM POCKET_PICK_TAGS").fetchall() == [("2", "web")]
+    finally:
+        db.close()
+
+def test_tag_filter_matches_escaped_and_raw_unicode(tmp_path):
+    db = init_db(tmp_path / "unicode.db")
+    try:
+        # Rows written before tags were stored unescaped must still match
+        db.execute(
+            "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
+            ("old", "2024-01-01T00:00:00", "escaped", '["caf\\u00e9"]')
+        )
+        db.execute(
+            "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
+            ("new", "2024-01-02T00:00:00", "raw", serialize_tags(["café"]))
+        )
+        
+        clause, params = tag_filter_clause(["café"])
+        rows = db.execute(f"SELECT id FROM POCKET_PICK WHERE {clause} ORDER BY id", params).fetchall()
+        assert rows == [("new",), ("old",)]
+    finally:
+        db.close()
+
+def test_tag_table_backfilled_for_existing_database(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    legacy = sqlite3.connect(str(db_path))
+    legacy.execute("CREATE TABLE POCKET_PICK (id TEXT PRIMARY KEY, created TIMESTAMP NOT NULL, text TEXT NOT NULL, tags TEXT NOT NULL)")
+    legacy.execute("INSERT INTO POCKET_PICK VALUES ('1', '2024-01-01T00:00:00', 'old', '[\"a\", \"b\"]')")
+    legacy.commit()
+    legacy.close()
+    
+    db = init_db(db_path)
+    try:
+        tags = db.execute("SELECT tag FROM POCKET_PICK_TAGS WHERE item_id = '1' ORDER BY tag").fetchall()
+        assert tags == [("a",), ("b",)]
+    finally:
+        db.close()
+
+def test_fts_index_upgraded_to_porter_tokenizer(tmp_path):
+    db_path = tmp_path / "legacy_fts.db"
+    db = init_db(db_path)
+    db.execute("DROP TABLE pocket_pick_fts")
+    db.execute("CREATE VIRTUAL TABLE pocket_pick_fts USING fts5(text, content='POCKET_PICK', content_rowid='rowid')")
+    db.execute(
+        "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
+        ("1", "2024-01-01T00:00:00", "running tests", "[]")
+    )
+    db.commit()
+    db.close()
+    
+    db = init_db(db_path)
+    try:
+        sql = db.execute("SELECT sql FROM sqlite_master WHERE name = 'pocket_pick_fts'").fetchone()[0]
+        assert "porter" in sql
+        rows = db.execute("SELECT rowid FROM pocket_pick_fts WHERE pocket_pick_fts MATCH 'run'").fetchall()
+        assert len(rows) == 1
+    finally:
+        db.close()
+
+def test_reopening_skips_fts_backfill_and_keeps_index_consistent(tmp_path):
+    db_path = tmp_path / "reopen.db"
+    db = init_db(db_path)
+    db.execute(
+        "INSERT INTO POCKET_PICK (id, created, text, tags) VALUES (?, ?, ?, ?)",
+        ("1", "2024-01-01T00:00:00", "hello world", "[]")
+    )
+    db.commit()
+    db.close()
+    
+    # Simulate a database from before the marker, with postings duplicated
+    # by the old row-by-row backfill
+    db = sqlite3.connect(db_path)
+    db.execute("INSERT OR IGNORE INTO pocket_pick_fts(rowid, text) SELECT rowid, text FROM POCKET_PICK")
+    db.execute("DELETE FROM POCKET_PICK_META")
+    db.commit()
+    db.close()
+    
+    for _ in range(2):
+        db = init_db(db_path)
+        try:
+            # Raises if the index disagrees with the content table
+            db.execute("INSERT INTO pocket_pick_fts(pocket_pick_fts, rank) VALUES('integrity-check', 1)")
+            assert db.execute("SELECT value FROM POCKET_PICK_META WHERE key = 'fts_built'").fetchone() == ("1",)
+            assert db.execute(
+                "SELECT COUNT(*) FROM pocket_pick_fts WHERE pocket_pick_fts MATCH 'hello'"
+            ).fetchone() == (1,)
+        finally:
+            db.close()
+
+def test_exact_lookup_upgrades_text_index_and_skips_sort(tmp_path):
+    db_path = tmp_path / "legacy_text.db"
+    db = init_db(db_path)
+    db.execute("DROP INDEX idx_pocket_pick_text")
+    db.execute("CREATE INDEX idx_pocket_pick_text ON POCKET_PICK(text)")
+    db.commit()
+    db.close()
+    
+    db = init_db(db_path)
+    try:
+        plan = " ".join(row[-1] for row in db.execute(
+            "EXPLAIN QUERY PLAN SELECT id, created, text, tags FROM POCKET_PICK "
+            "WHERE text = ? ORDER BY created DESC LIMIT ?", ("x", 5)
+        ))
+        
+        # Matching rows come off the index already ordered by created
+        assert "idx_pocket_pick_text (text=?)" in plan
+        assert "TEMP B-TREE" not in plan
+    finally:
+        db.close()
+
+def test_newest_first_queries_use_created_index(tmp_path):
+    db = init_db(tmp_path / "plan.db")
+    try:
+        plan = db.execute(
+            "EXPLAIN QUERY PLAN SELECT id, created, text, tags FROM POCKET_PICK "
+            "ORDER BY created DESC LIMIT 5"
+        ).fetchall()
+        details = " ".join(row[-1] for row in plan)
+        
+        # Rows are read in index order, with no separate sort step
+        assert "idx_pocket_pick_created" in details
+        assert "TEMP B-TREE" not in details
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("predicate", ["text LIKE ?", "text REGEXP ?"])
+def test_filtered_scans_walk_created_index(tmp_path, predicate):
+    db = init_db(tmp_path / "plan.db")
+    try:
+        plan = db.execute(
+            f"EXPLAIN QUERY PLAN SELECT id, created, text, tags FROM POCKET_PICK "
+            f"WHERE {predicate} ORDER BY created DESC LIMIT ?",
+            ("%x%", 5)
+        ).fetchall()
+        details = " ".join(row[-1] for row in plan)
+        
+        # Scan modes walk newest-first and stop once LIMIT rows match
+        assert "idx_pocket_pick_created" in details
+        assert "TEMP B-TREE" not in details
+    finally:
+        db.close()
+
+def test_tag_filter_plan_probes_tag_table(tmp_path):
+    db = init_db(tmp_path / "tag_plan.db")
+    try:
+        clause, params = tag_filter_clause(["python", "web"])
+        plan = db.execute(
+            f"EXPLAIN QUERY PLAN SELECT id FROM POCKET_PICK WHERE {clause}", params
+        ).fetchall()
+        details = " ".join(row[-1] for row in plan)
+        
+        # Each tag is a primary key seek and items are fetched by id; no
+        # step scans the JSON tags column
+        assert "SEARCH POCKET_PICK_TAGS USING PRIMARY KEY (tag=?)" in details
+        assert "SCAN POCKET_PICK" not in details
+    finally:
+        db.close()
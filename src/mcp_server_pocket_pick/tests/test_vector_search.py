@@ -8,7 +8,10 @@ import asyncio
 from pathlib import Path
 from datetime import datetime
 
-from ..modules.embeddings import EmbeddingGenerator, VectorSimilarity
+from ..modules.embeddings import (
+    EmbeddingBatcher, EmbeddingCache, EmbeddingGenerator, VectorSimilarity,
+    serialize_embedding_int8, deserialize_embedding_int8
+)
 from ..modules.search_engine import HybridSearchEngine, SearchConfig
 from ..modules.connection_pool import get_db_connection
 from ..modules.data_types import FindCommand, PocketItem, AddCommand
@@ -18,10 +21,10 @@ from ..modules.functionality.add import add
 class TestEmbeddingGenerator:
     """Test the embedding generation functionality"""
     
-    def test_embedding_generation(self):
+    def test_embedding_generation(self, tmp_path):
         """Test basic embedding generation"""
         try:
-            generator = EmbeddingGenerator()
+            generator = EmbeddingGenerator(cache_dir=tmp_path / "cache")
             text = "This is a test document about machine learning and AI"
             embedding = generator.generate_embedding(text)
             
@@ -36,10 +39,10 @@ class TestEmbeddingGenerator:
         except Exception as e:
             pytest.fail(f"Embedding generation failed: {e}")
     
-    def test_text_preprocessing(self):
+    def test_text_preprocessing(self, tmp_path):
         """Test text preprocessing functionality"""
         try:
-            generator = EmbeddingGenerator()
+            generator = EmbeddingGenerator(cache_dir=tmp_path / "cache")
             
             # Test text cleaning
             messy_text = "  This   is    a  messy   text  with   extra   spaces  "
@@ -56,11 +59,34 @@ class TestEmbeddingGenerator:
             print(f"✓ Text preprocessing works correctly")
         except ImportError:
             pytest.skip("sentence-transformers not available")
-    
-    def test_batch_embedding_generation(self):
+
+    def test_chunk_text_breaks_at_sentence_end(self):
+        """Chunks end after the last period near the boundary, by character offset"""
+        # chunk_text does not touch the model, so skip loading one
+        generator = EmbeddingGenerator.__new__(EmbeddingGenerator)
+        text = "é" * 150 + "." + "b" * 200
+
+        chunks = generator.chunk_text(text, chunk_size=200, overlap=20)
+
+        assert chunks == [text[:151], text[131:331], text[311:]]
+
+    def test_generators_share_loaded_model(self, monkeypatch):
+        """A model already loaded in the process is reused, and dropped on fork"""
+        from ..modules import embeddings
+
+        model = object()
+        monkeypatch.setitem(embeddings._models, "stub-model", model)
+
+        generator = EmbeddingGenerator("stub-model", cache_enabled=False)
+        assert generator.model is model
+
+        embeddings._reset_after_fork()
+        assert "stub-model" not in embeddings._models
+
+    def test_batch_embedding_generation(self, tmp_path):
         """Test batch embedding generation"""
         try:
-            generator = EmbeddingGenerator()
+            generator = EmbeddingGenerator(cache_dir=tmp_path / "cache")
             texts = [
                 "First document about Python programming",
                 "Second document about machine learning",
@@ -122,6 +148,157 @@ class TestVectorSimilarity:
         assert results[0][1] > results[1][1] > results[2][1]
         
         print(f"✓ Similarity search works correctly")
+    
+    def test_similarity_search_matches_pairwise_cosine(self):
+        """Vectorized search agrees with per-pair cosine and keeps original indices"""
+        import numpy as np
+        
+        rng = np.random.default_rng(0)
+        query = rng.standard_normal(16).astype(np.float32)
+        embeddings = [rng.standard_normal(16).astype(np.float32) for _ in range(50)]
+        embeddings[3] = None
+        embeddings[7] = np.zeros(16, dtype=np.float32)
+        embeddings[9] = np.ones(8, dtype=np.float32)
+        
+        results = VectorSimilarity.similarity_search(
+            query, embeddings, top_k=5, similarity_threshold=-1.0
+        )
+        
+        expected = sorted(
+            (
+                (i, VectorSimilarity.cosine_similarity(query, emb))
+                for i, emb in enumerate(embeddings)
+                if i not in (3, 7, 9)
+            ),
+            key=lambda x: x[1], reverse=True
+        )[:5]
+        
+        assert [i for i, _ in results] == [i for i, _ in expected]
+        assert np.allclose([score for _, score in results], [score for _, score in expected], atol=1e-5)
+    
+    def test_similarity_search_top_k_ties_keep_input_order(self):
+        """Equal scores at the top-k cutoff are returned in input order"""
+        import numpy as np
+        
+        query = np.array([1.0, 0.0], dtype=np.float32)
+        embeddings = [np.array([1.0, 1.0], dtype=np.float32) for _ in range(6)]
+        embeddings[4] = np.array([1.0, 0.0], dtype=np.float32)
+        
+        results = VectorSimilarity.similarity_search(query, embeddings, top_k=3)
+        
+        assert [i for i, _ in results] == [4, 0, 1]
+
+
+class TestEmbeddingCache:
+    """Test the on-disk embedding cache"""
+    
+    def test_roundtrip_across_instances(self, tmp_path):
+        """Cached vectors survive reopening the cache directory"""
+        import numpy as np
+        
+        cache = EmbeddingCache(tmp_path / "cache")
+        first = np.arange(384, dtype=np.float32)
+        second = np.linspace(0, 1, 768).astype(np.float32)
+        cache.set("first", "model-a", first)
+        cache.set("second", "model-b", second)
+        
+        assert np.array_equal(cache.get("first", "model-a"), first)
+        assert cache.get("first", "model-b") is None
+        
+        reopened = EmbeddingCache(tmp_path / "cache")
+        assert np.array_equal(reopened.get("first", "model-a"), first)
+        assert np.array_equal(reopened.get("second", "model-b"), second)
+        assert reopened.get("second", "model-b").dtype == np.float32
+    
+    def test_overwrite_returns_latest(self, tmp_path):
+        """Setting a key again replaces the cached vector"""
+        import numpy as np
+        
+        cache = EmbeddingCache(tmp_path / "cache")
+        cache.set("text", "model", np.zeros(4, dtype=np.float32))
+        cache.set("text", "model", np.ones(4, dtype=np.float32))
+        
+        assert np.array_equal(cache.get("text", "model"), np.ones(4))
+    
+    def test_concurrent_writers_share_directory(self, tmp_path):
+        """Instances appending to one directory index their own vectors"""
+        import numpy as np
+        import threading
+        
+        caches = [EmbeddingCache(tmp_path / "cache") for _ in range(2)]
+        
+        def fill(worker, cache):
+            for i in range(200):
+                cache.set(f"{worker}-{i}", "model", np.full(64, worker * 1000 + i, dtype=np.float32))
+        
+        threads = [threading.Thread(target=fill, args=(w, c)) for w, c in enumerate(caches)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        reopened = EmbeddingCache(tmp_path / "cache")
+        for worker in range(2):
+            for i in range(200):
+                assert reopened.get(f"{worker}-{i}", "model")[0] == worker * 1000 + i
+
+
+class TestEmbeddingSerialization:
+    """Test database (de)serialization of embeddings"""
+    
+    def test_int8_roundtrip_preserves_similarity(self):
+        """int8 storage is a quarter of float32 and keeps cosine similarity"""
+        import numpy as np
+        
+        rng = np.random.default_rng(0)
+        embedding = rng.standard_normal(384).astype(np.float32)
+        
+        data, scale = serialize_embedding_int8(embedding)
+        restored = deserialize_embedding_int8(data, scale)
+        
+        assert len(data) == 384
+        assert restored.dtype == np.float32
+        assert VectorSimilarity.cosine_similarity(embedding, restored) > 0.999
+    
+    def test_int8_zero_vector(self):
+        """A zero vector round-trips without dividing by zero"""
+        import numpy as np
+        
+        data, scale = serialize_embedding_int8(np.zeros(4, dtype=np.float32))
+        
+        assert scale == 0.0
+        assert not deserialize_embedding_int8(data, scale).any()
+
+
+class TestEmbeddingBatcher:
+    """Test coalescing of embedding requests"""
+    
+    class _RecordingGenerator:
+        """Generator stand-in that records each batch it is asked to encode"""
+        
+        def __init__(self):
+            import threading
+            self.batches = []
+            self.release = threading.Event()
+        
+        def generate_embeddings_batch(self, texts):
+            import numpy as np
+            self.release.wait(timeout=5)
+            self.batches.append(list(texts))
+            return [np.full(3, len(text), dtype=np.float32) for text in texts]
+    
+    def test_queued_requests_share_a_batch(self):
+        """Requests queued while the model is busy are encoded together"""
+        generator = self._RecordingGenerator()
+        batcher = EmbeddingBatcher(generator)
+        
+        futures = [batcher.submit(text) for text in ["a", "bb", "ccc"]]
+        generator.release.set()
+        results = [future.result(timeout=5) for future in futures]
+        
+        assert [int(result[0]) for result in results] == [1, 2, 3]
+        assert sum(len(batch) for batch in generator.batches) == 3
+        assert len(generator.batches) <= 2
 
 
 class TestHybridSearch:
@@ -312,6 +489,7 @@ def test_database_schema_migration(tmp_path):
     assert 'embedding' in columns
     assert 'embedding_model' in columns
     assert 'embedding_updated' in columns
+    assert 'embedding_scale' in columns
     
     migrated_db.close()
     
@@ -325,9 +503,10 @@ if __name__ == "__main__":
     try:
         # Test embedding generation
         test_gen = TestEmbeddingGenerator()
-        test_gen.test_embedding_generation()
-        test_gen.test_text_preprocessing()
-        test_gen.test_batch_embedding_generation()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test_gen.test_embedding_generation(Path(tmp_dir))
+            test_gen.test_text_preprocessing(Path(tmp_dir))
+            test_gen.test_batch_embedding_generation(Path(tmp_dir))
         
         # Test vector similarity
         test_sim = TestVectorSimilarity()